@@ -7,12 +7,29 @@ confidence score, and returns next-step recommendations that callers can act on.
 
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
+from functools import partial
 from math import log2
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 import numpy as np
 
+if __package__:
+    from .cache import FeatureCache, content_key
+    from .introspection import IntrospectiveState
+    from .sketches import ChunkedSequence, SketchConfig, StreamProfile
+    from .text_kernel import TextCounts, shared_kernel
+else:
+    from cache import FeatureCache, content_key
+    from introspection import IntrospectiveState
+    from sketches import ChunkedSequence, SketchConfig, StreamProfile
+    from text_kernel import TextCounts, shared_kernel
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+_BUFFER_TYPES = (np.ndarray, array, memoryview)
+
 
 @dataclass
 class AdaptationResult:
@@ -34,6 +51,20 @@ class AdaptationResult:
         }
 
 
+@dataclass
+class ContextFeatures:
+    """State-independent signals extracted from a single context.
+
+    ``details`` holds the diagnostic fields that precede ``novelty_score`` in
+    the final payload; ``signals`` keeps unrounded values that feed valence
+    and confidence once the live novelty score is known.
+    """
+
+    kind: str
+    details: Dict[str, Any]
+    signals: Dict[str, Any] = field(default_factory=dict)
+
+
 class AdaptiveLoop:
     """Compute a best-effort adaptation based on the latest context."""
 
@@ -57,89 +88,351 @@ class AdaptiveLoop:
         "worse",
     }
 
-    def __init__(self, state) -> None:
-        self.state = state
+    # Numeric sequences longer than this are profiled one at a time; stacking
+    # them would only add a copy without saving any per-call overhead.
+    BATCH_SEQUENCE_LIMIT = 1024
+
+    def __init__(
+        self,
+        state,
+        cache: Optional[FeatureCache] = None,
+        approximate: Optional[SketchConfig] = None,
+    ) -> None:
+        """Create a loop over ``state``.
 
-    def run(self) -> Optional[AdaptationResult]:
-        """Adapt to the latest observed context and update introspective state."""
+        With an ``approximate`` :class:`SketchConfig`, sequences and buffers
+        of at least ``approximate.min_length`` items are profiled with
+        bounded-memory sketches instead of exact statistics.
+        :class:`ChunkedSequence` contexts are always sketched.
+        """
+
+        self.state = state
+        self.cache = cache
+        self.approximate = approximate
+        # One vocabulary per process, not per agent (see ``text_kernel``).
+        self.text_kernel = shared_kernel(frozenset(self.POSITIVE_MARKERS), frozenset(self.NEGATIVE_MARKERS))
+
+    def run(
+        self, features: Optional[ContextFeatures] = None, *, reverse: bool = True
+    ) -> Optional[AdaptationResult]:
+        """Adapt to the latest observed context and update introspective state.
+
+        ``features`` may carry a precomputed :meth:`extract_features` result
+        for the latest context, in which case only the state-dependent part
+        of the adaptation is evaluated here.  ``reverse=False`` skips the
+        ``reversed`` copy of the input in the details.
+        """
 
         if not self.state.history:
             return None
 
-        last = self.state.history[-1]
-        result = self._adapt_context(last)
+        if features is None:
+            result = self._adapt_context(self.state.history[-1], reverse=reverse)
+        else:
+            result = self.finalize(features, self.state.meta_context["last_novelty_score"])
         self.state.update_valence(result.details.get("valence_delta", 0.0))
         self.state.record_adaptation(result.summary)
         return result
 
-    def _adapt_context(self, context: Any) -> AdaptationResult:
-        descriptor = self.state._describe_context(context)
-        novelty = self.state.meta_context.get("last_novelty_score", self.state.novelty_score(context))
-
+    def _adapt_context(self, context: Any, *, reverse: bool = True) -> AdaptationResult:
+        novelty = self.state.meta_context.get("last_novelty_score")
+        if novelty is None:
+            novelty = self.state.novelty_score(context)
+        return self.finalize(self.extract_features(context, reverse=reverse), novelty)
+
+    def extract_features(self, context: Any, *, reverse: bool = True) -> ContextFeatures:
+        """Compute the state-independent part of an adaptation for one context.
+
+        Extraction never reads ``self.state``, so it is safe to run on any
+        thread or in another process (see :func:`extract_features_chunk`).
+        With ``reverse=False`` the ``reversed`` detail field is left out.
+        When a :class:`FeatureCache` is attached, repeated contexts are served
+        from it by content hash.
+        """
+
+        if self.cache is None:
+            return self._compute_features(context, reverse)
+
+        key = content_key(context)
+        if key is None:
+            return self._compute_features(context, reverse)
+        cached = self.cache.get((reverse, key))
+        if cached is None:
+            features = self._compute_features(context, reverse)
+            # The details may be views of the caller's buffer (``reversed``),
+            # so the cache keeps its own copy.
+            self.cache.put((reverse, key), _detached(features))
+            return features
+        return _detached(cached)
+
+    def _compute_features(self, context: Any, reverse: bool) -> ContextFeatures:
         if isinstance(context, str):
-            return self._adapt_text(context, novelty)
+            return self._text_features(context, reverse=reverse)
+
+        if isinstance(context, ChunkedSequence):
+            return self._sketch_features(context.profile())
+
+        if self._sketched(context):
+            profile = StreamProfile(self.approximate).add_all(context)
+            return self._sketch_features(profile, context if reverse else None)
 
-        if isinstance(context, (list, tuple, set, np.ndarray)):
-            return self._adapt_sequence(context, novelty)
+        if isinstance(context, _BUFFER_TYPES) and getattr(context, "ndim", 1):
+            features = self._buffer_features(context, reverse=reverse)
+            if features is None:
+                rows = np.asarray(context) if isinstance(context, memoryview) else context
+                features = self._sequence_features(rows, reverse=reverse)
+            return features
+
+        if isinstance(context, (list, tuple, set)):
+            return self._sequence_features(context, reverse=reverse)
 
         if isinstance(context, dict):
-            return self._adapt_mapping(context, novelty)
+            return self._mapping_features(context)
 
         if isinstance(context, (int, float)) and not isinstance(context, bool):
-            return self._adapt_numeric(context, novelty)
+            return self._numeric_features(context)
+
+        return ContextFeatures(
+            kind="other",
+            details={
+                "descriptor": IntrospectiveState._describe_context(context),
+                "representation": repr(context),
+            },
+        )
 
-        summary = "Processed miscellaneous context"
-        details = {
-            "descriptor": descriptor,
-            "representation": repr(context),
-            "novelty_score": novelty,
-            "valence_delta": 0.004 + (0.002 * novelty),
-        }
+    def extract_batch(
+        self,
+        contexts: Sequence[Any],
+        *,
+        reverse: bool = True,
+        executor=None,
+        chunk_size: int = 256,
+    ) -> List[ContextFeatures]:
+        """Compute features for many contexts, vectorizing per-type work.
+
+        Contexts are grouped by type: numeric values are normalized with a
+        single NumPy call, and numeric sequences sharing a length and element
+        type have their mean and standard deviation computed as one 2-D
+        reduction.  With an ``executor``, ``chunk_size`` chunks are extracted
+        on that pool instead.  When a cache is attached, cached contexts and
+        repeats within the batch are extracted only once.  The output matches
+        calling :meth:`extract_features` item by item.
+        """
+
+        if self.cache is None:
+            return self._compute_batch(contexts, reverse, executor, chunk_size)
+
+        features: List[Optional[ContextFeatures]] = [None] * len(contexts)
+        pending: Dict[Any, List[int]] = {}
+        for position, context in enumerate(contexts):
+            key = content_key(context)
+            if key is None:
+                pending[("uncached", position)] = [position]
+                continue
+            key = (reverse, key)
+            if key in pending:
+                pending[key].append(position)
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                pending[key] = [position]
+            else:
+                features[position] = _detached(cached)
+
+        computed = self._compute_batch(
+            [contexts[positions[0]] for positions in pending.values()], reverse, executor, chunk_size
+        )
+        for (key, positions), extracted in zip(pending.items(), computed):
+            if key[0] != "uncached":
+                self.cache.put(key, _detached(extracted))
+            for position in positions:
+                features[position] = _detached(extracted)
+        return features
+
+    def _compute_batch(
+        self, contexts: Sequence[Any], reverse: bool, executor, chunk_size: int
+    ) -> List[ContextFeatures]:
+        if executor is not None:
+            # Memoryviews cannot be pickled for process pools (and their
+            # features hold views of them), so they are extracted here.
+            local = [position for position, context in enumerate(contexts) if isinstance(context, memoryview)]
+            if local:
+                shipped = [context for context in contexts if not isinstance(context, memoryview)]
+            else:
+                shipped = contexts
+            chunks = [shipped[start:start + chunk_size] for start in range(0, len(shipped), chunk_size)]
+            extract = partial(extract_features_chunk, reverse=reverse, approximate=self.approximate)
+            extracted = [item for chunk in executor.map(extract, chunks) for item in chunk]
+            if not local:
+                return extracted
+            features = [None] * len(contexts)
+            for position in local:
+                features[position] = self._compute_features(contexts[position], reverse)
+            remaining = iter(extracted)
+            return [feature if feature is not None else next(remaining) for feature in features]
+
+        features: List[Optional[ContextFeatures]] = [None] * len(contexts)
+        numeric_positions: List[int] = []
+        text_positions: List[int] = []
+        sequence_groups: Dict[tuple, List[int]] = {}
+
+        for position, context in enumerate(contexts):
+            if isinstance(context, str):
+                text_positions.append(position)
+                continue
+            if isinstance(context, (int, float)) and not isinstance(context, bool):
+                if isinstance(context, float) or _INT64_MIN <= context <= _INT64_MAX:
+                    numeric_positions.append(position)
+                    continue
+            elif (
+                isinstance(context, (list, tuple))
+                and 0 < len(context) <= self.BATCH_SEQUENCE_LIMIT
+                and not self._sketched(context)
+            ):
+                element_kind = self._numeric_sequence_kind(context)
+                if element_kind is not None:
+                    sequence_groups.setdefault((element_kind, len(context)), []).append(position)
+                    continue
+            features[position] = self._compute_features(context, reverse)
+
+        if text_positions:
+            texts = [contexts[position] for position in text_positions]
+            for position, text, counts in zip(text_positions, texts, self.text_kernel.count_batch(texts)):
+                features[position] = self._text_features(text, counts, reverse=reverse)
+
+        if numeric_positions:
+            values = np.array([contexts[position] for position in numeric_positions], dtype=np.float64)
+            normalized = (1 / (1 + np.exp(-values))).tolist()
+            for position, value in zip(numeric_positions, normalized):
+                features[position] = self._numeric_features(contexts[position], normalized=value)
+
+        for (element_kind, _), positions in sequence_groups.items():
+            dtype = np.int64 if element_kind == "int" else np.float64
+            try:
+                matrix = np.array([contexts[position] for position in positions], dtype=dtype)
+            except OverflowError:
+                for position in positions:
+                    features[position] = self._compute_features(contexts[position], reverse)
+                continue
+            means = matrix.mean(axis=1).tolist()
+            stds = matrix.std(axis=1).tolist()
+            for position, mean_value, std_value in zip(positions, means, stds):
+                features[position] = self._sequence_features(
+                    contexts[position], stats=(mean_value, std_value), reverse=reverse
+                )
+
+        return features
+
+    def finalize(self, features: ContextFeatures, novelty: float) -> AdaptationResult:
+        """Combine extracted features with the live novelty score."""
+
+        details = dict(features.details)
+        details["novelty_score"] = novelty
+        signals = features.signals
+
+        if features.kind == "text":
+            lexical_diversity = signals["lexical_diversity"]
+            details["valence_delta"] = (
+                0.012 + (0.015 * lexical_diversity) + (0.006 * details["sentiment_hint"])
+            )
+            return AdaptationResult(
+                summary="Processed textual context with lexical and sentiment signals",
+                details=details,
+                confidence=min(0.95, 0.45 + (0.3 * lexical_diversity) + (0.1 * novelty)),
+                recommendations=[
+                    "Keep text concise and specific for higher-confidence adaptation.",
+                    "Add structured fields when you need machine-readable follow-up actions.",
+                ],
+            )
+
+        if features.kind == "sequence":
+            details["valence_delta"] = 0.01 + (0.005 * min(signals["entropy"], 1.0))
+            recommendations = ["Normalize sequence lengths before comparing batches."]
+            if signals["numeric"]:
+                recommendations.append("Track mean and standard deviation drift over time.")
+            confidence = 0.7 if signals["numeric"] else 0.55
+            return AdaptationResult(
+                summary="Processed sequence context with distribution metrics",
+                details=details,
+                confidence=confidence + (0.05 * novelty),
+                recommendations=recommendations,
+            )
+
+        if features.kind == "mapping":
+            field_count = details["field_count"]
+            missing_count = len(details["missing_like_keys"])
+            details["valence_delta"] = 0.012 + (0.002 * field_count) - (0.003 * missing_count)
+            recommendations = ["Preserve stable key names so adaptation history stays comparable."]
+            if missing_count:
+                recommendations.append("Fill missing-like fields to improve downstream confidence.")
+            return AdaptationResult(
+                summary="Processed mapping context with schema diagnostics",
+                details=details,
+                confidence=min(0.92, 0.55 + (0.04 * field_count) + (0.04 * novelty)),
+                recommendations=recommendations,
+            )
+
+        if features.kind == "numeric":
+            details["valence_delta"] = 0.008 + (0.004 * novelty)
+            return AdaptationResult(
+                summary="Processed numeric context with normalization metrics",
+                details=details,
+                confidence=0.82,
+                recommendations=["Compare normalized values when inputs span different scales."],
+            )
+
+        details["valence_delta"] = 0.004 + (0.002 * novelty)
         return AdaptationResult(
-            summary=summary,
+            summary="Processed miscellaneous context",
             details=details,
             confidence=0.35,
             recommendations=["Provide a JSON-serializable structure for richer analysis."],
         )
 
     def _adapt_text(self, context: str, novelty: float) -> AdaptationResult:
-        tokens = context.split()
-        normalized_tokens = [token.strip(".,!?;:'\"").lower() for token in tokens]
-        normalized_tokens = [token for token in normalized_tokens if token]
-        unique_tokens = len(set(normalized_tokens)) if normalized_tokens else 0
-        lexical_diversity = unique_tokens / len(normalized_tokens) if normalized_tokens else 0.0
-        positive_hits = sum(token in self.POSITIVE_MARKERS for token in normalized_tokens)
-        negative_hits = sum(token in self.NEGATIVE_MARKERS for token in normalized_tokens)
-        sentiment_hint = positive_hits - negative_hits
+        return self.finalize(self._text_features(context), novelty)
+
+    def _adapt_sequence(self, context: Iterable[Any], novelty: float) -> AdaptationResult:
+        return self.finalize(self._sequence_features(context), novelty)
+
+    def _adapt_mapping(self, context: Dict[Any, Any], novelty: float) -> AdaptationResult:
+        return self.finalize(self._mapping_features(context), novelty)
+
+    def _adapt_numeric(self, context: float, novelty: float) -> AdaptationResult:
+        return self.finalize(self._numeric_features(context), novelty)
+
+    def _text_features(
+        self, context: str, counts: Optional[TextCounts] = None, *, reverse: bool = True
+    ) -> ContextFeatures:
+        if counts is None:
+            counts = self.text_kernel.count(context)
+        normalized_count = counts.normalized_count
+        lexical_diversity = counts.unique_tokens / normalized_count if normalized_count else 0.0
 
         details = {
             "descriptor": "text",
             "transformation": "tokenize/reverse/sentiment-hint",
-            "token_count": len(tokens),
-            "unique_tokens": unique_tokens,
+            "token_count": counts.token_count,
+            "unique_tokens": counts.unique_tokens,
             "lexical_diversity": round(lexical_diversity, 4),
-            "sentiment_hint": sentiment_hint,
-            "reversed": context[::-1],
-            "novelty_score": novelty,
-            "valence_delta": 0.012 + (0.015 * lexical_diversity) + (0.006 * sentiment_hint),
+            "sentiment_hint": counts.sentiment_hint,
         }
-        recommendations = [
-            "Keep text concise and specific for higher-confidence adaptation.",
-            "Add structured fields when you need machine-readable follow-up actions.",
-        ]
-        confidence = min(0.95, 0.45 + (0.3 * lexical_diversity) + (0.1 * novelty))
-        return AdaptationResult(
-            summary="Processed textual context with lexical and sentiment signals",
-            details=details,
-            confidence=confidence,
-            recommendations=recommendations,
+        if reverse:
+            details["reversed"] = context[::-1]
+        return ContextFeatures(
+            kind="text", details=details, signals={"lexical_diversity": lexical_diversity}
         )
 
-    def _adapt_sequence(self, context: Iterable[Any], novelty: float) -> AdaptationResult:
+    def _sequence_features(
+        self, context: Iterable[Any], stats: Optional[tuple] = None, *, reverse: bool = True
+    ) -> ContextFeatures:
         sequence = list(context)
         numeric = self._is_numeric_sequence(sequence)
-        mean_value = float(np.mean(sequence)) if sequence and numeric else None
-        std_value = float(np.std(sequence)) if sequence and numeric else None
+        if stats is not None:
+            mean_value, std_value = stats
+        else:
+            mean_value = float(np.mean(sequence)) if sequence and numeric else None
+            std_value = float(np.std(sequence)) if sequence and numeric else None
         entropy = self._sequence_entropy(sequence)
 
         details = {
@@ -149,67 +442,134 @@ class AdaptiveLoop:
             "mean": mean_value,
             "standard_deviation": std_value,
             "entropy": round(entropy, 4),
-            "reversed": list(reversed(sequence)),
-            "novelty_score": novelty,
-            "valence_delta": 0.01 + (0.005 * min(entropy, 1.0)),
         }
-        recommendations = ["Normalize sequence lengths before comparing batches."]
-        if numeric:
-            recommendations.append("Track mean and standard deviation drift over time.")
-        confidence = 0.7 if numeric else 0.55
-        return AdaptationResult(
-            summary="Processed sequence context with distribution metrics",
-            details=details,
-            confidence=confidence + (0.05 * novelty),
-            recommendations=recommendations,
+        if reverse:
+            details["reversed"] = list(reversed(sequence))
+        return ContextFeatures(
+            kind="sequence", details=details, signals={"entropy": entropy, "numeric": numeric}
         )
 
-    def _adapt_mapping(self, context: Dict[Any, Any], novelty: float) -> AdaptationResult:
-        keys = list(context.keys())
-        value_types = {str(key): type(value).__name__ for key, value in context.items()}
-        missing_like = [key for key, value in context.items() if value in (None, "")]
+    def _buffer_features(self, context: Any, *, reverse: bool = True) -> Optional[ContextFeatures]:
+        """Profile a 1-D numeric ndarray, ``array.array`` or memoryview in place.
+
+        Statistics and entropy run on the buffer itself and ``reversed`` is a
+        view for arrays and memoryviews (``array.array`` slices are C copies,
+        since a view would pin its buffer and block resizing).  Other shapes
+        and dtypes return ``None`` and take the generic sequence path.
+        """
+
+        values = np.asarray(context)
+        if values.ndim != 1 or values.dtype.kind not in "biuf":
+            return None
+        numeric = values.dtype.kind != "b"
+        if len(values) and numeric:
+            mean_value = float(values.mean())
+            std_value = float(values.std())
+        else:
+            mean_value = std_value = None
+        entropy = self._buffer_entropy(values)
 
         details = {
-            "descriptor": "mapping",
-            "transformation": "schema-profile",
-            "keys": keys,
-            "values": list(context.values()),
-            "value_types": value_types,
-            "missing_like_keys": missing_like,
-            "field_count": len(keys),
-            "novelty_score": novelty,
-            "valence_delta": 0.012 + (0.002 * len(keys)) - (0.003 * len(missing_like)),
+            "descriptor": "sequence",
+            "transformation": "profile/reverse/statistics",
+            "length": len(values),
+            "mean": mean_value,
+            "standard_deviation": std_value,
+            "entropy": round(entropy, 4),
         }
-        recommendations = ["Preserve stable key names so adaptation history stays comparable."]
-        if missing_like:
-            recommendations.append("Fill missing-like fields to improve downstream confidence.")
-        confidence = min(0.92, 0.55 + (0.04 * len(keys)) + (0.04 * novelty))
-        return AdaptationResult(
-            summary="Processed mapping context with schema diagnostics",
-            details=details,
-            confidence=confidence,
-            recommendations=recommendations,
+        if reverse:
+            details["reversed"] = context[::-1]
+        return ContextFeatures(
+            kind="sequence", details=details, signals={"entropy": entropy, "numeric": numeric}
         )
 
-    def _adapt_numeric(self, context: float, novelty: float) -> AdaptationResult:
-        normalized = self._normalize_numeric(context)
-        magnitude = abs(float(context))
+    def _sketched(self, context: Any) -> bool:
+        """Whether ``context`` is large enough to profile approximately."""
+
+        if self.approximate is None:
+            return False
+        if isinstance(context, (list, tuple)) or (
+            isinstance(context, _BUFFER_TYPES) and getattr(context, "ndim", 1) == 1
+        ):
+            return len(context) >= self.approximate.min_length
+        return False
+
+    def _sketch_features(self, profile: StreamProfile, context: Any = None) -> ContextFeatures:
+        """Sequence features from a :class:`StreamProfile` summary.
+
+        The payload carries the usual sequence fields plus ``approximate``,
+        ``distinct_estimate`` and ``quantiles``.  ``reversed`` is only added
+        when the in-memory ``context`` is passed.
+        """
+
+        summary = profile.summary()
         details = {
-            "descriptor": "numeric",
-            "value": context,
-            "normalized": normalized,
-            "magnitude": magnitude,
-            "sign": "positive" if context > 0 else "negative" if context < 0 else "zero",
-            "novelty_score": novelty,
-            "valence_delta": 0.008 + (0.004 * novelty),
+            "descriptor": "sequence",
+            "transformation": "sketch/statistics",
+            "length": summary["length"],
+            "mean": summary["mean"],
+            "standard_deviation": summary["standard_deviation"],
+            "entropy": round(summary["entropy"], 4),
+            "approximate": True,
+            "distinct_estimate": summary["distinct_estimate"],
+            "quantiles": summary["quantiles"],
         }
-        return AdaptationResult(
-            summary="Processed numeric context with normalization metrics",
+        if context is not None:
+            details["reversed"] = (
+                list(reversed(context)) if isinstance(context, (list, tuple)) else context[::-1]
+            )
+        return ContextFeatures(
+            kind="sequence",
             details=details,
-            confidence=0.82,
-            recommendations=["Compare normalized values when inputs span different scales."],
+            signals={"entropy": summary["entropy"], "numeric": profile.numeric},
+        )
+
+    def _mapping_features(self, context: Dict[Any, Any]) -> ContextFeatures:
+        keys = list(context.keys())
+        value_types = {str(key): type(value).__name__ for key, value in context.items()}
+        missing_like = [key for key, value in context.items() if value in (None, "")]
+
+        return ContextFeatures(
+            kind="mapping",
+            details={
+                "descriptor": "mapping",
+                "transformation": "schema-profile",
+                "keys": keys,
+                "values": list(context.values()),
+                "value_types": value_types,
+                "missing_like_keys": missing_like,
+                "field_count": len(keys),
+            },
         )
 
+    def _numeric_features(self, context: float, normalized: Optional[float] = None) -> ContextFeatures:
+        if normalized is None:
+            normalized = self._normalize_numeric(context)
+        return ContextFeatures(
+            kind="numeric",
+            details={
+                "descriptor": "numeric",
+                "value": context,
+                "normalized": normalized,
+                "magnitude": abs(float(context)),
+                "sign": "positive" if context > 0 else "negative" if context < 0 else "zero",
+            },
+        )
+
+    @staticmethod
+    def _numeric_sequence_kind(sequence: Sequence[Any]) -> Optional[str]:
+        """Return ``"int"``/``"float"`` for the NumPy dtype a numeric sequence maps to."""
+
+        has_float = False
+        for item in sequence:
+            if isinstance(item, bool):
+                return None
+            if isinstance(item, float):
+                has_float = True
+            elif not isinstance(item, int):
+                return None
+        return "float" if has_float else "int"
+
     @staticmethod
     def _is_numeric_sequence(sequence: Iterable[Any]) -> bool:
         return all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in sequence)
@@ -227,4 +587,47 @@ class AdaptiveLoop:
             key = repr(item)
             counts[key] = counts.get(key, 0) + 1
         total = len(sequence)
-        return -sum((count / total) * log2(count / total) for count in counts.values())
+        # ``+ 0.0`` turns the ``-0.0`` of a single-valued sequence into ``0.0``.
+        return -sum((count / total) * log2(count / total) for count in counts.values()) + 0.0
+
+    @staticmethod
+    def _buffer_entropy(values: np.ndarray) -> float:
+        """Entropy of a 1-D array's values, via ``np.unique`` counts.
+
+        Terms are summed in first-occurrence order like
+        :meth:`_sequence_entropy`, so a list holding the same values scores
+        the same, down to the sign of zero.
+        """
+
+        if not len(values):
+            return 0.0
+        _, first_seen, counts = np.unique(values, return_index=True, return_counts=True)
+        probabilities = counts[np.argsort(first_seen, kind="stable")] / len(values)
+        return -sum((probabilities * np.log2(probabilities)).tolist()) + 0.0
+
+
+def _detached(features: ContextFeatures) -> ContextFeatures:
+    """Copy the mutable detail containers so callers never alias cached data."""
+
+    details = {
+        key: list(value) if isinstance(value, list)
+        else dict(value) if isinstance(value, dict)
+        else value.copy() if isinstance(value, np.ndarray)
+        else value
+        for key, value in features.details.items()
+    }
+    return ContextFeatures(kind=features.kind, details=details, signals=features.signals)
+
+
+def extract_features_chunk(
+    contexts: Sequence[Any],
+    reverse: bool = True,
+    approximate: Optional[SketchConfig] = None,
+) -> List[ContextFeatures]:
+    """Extract features for a chunk of contexts without an agent state.
+
+    This is the picklable unit of work handed to thread or process pools by
+    :meth:`AdaptiveAgent.process_batch`.
+    """
+
+    return AdaptiveLoop(None, approximate=approximate).extract_batch(contexts, reverse=reverse)
@@ -0,0 +1,168 @@
+"""Asyncio front-end for :class:`AdaptiveAgent`.
+
+Concurrent callers ``await process(ctx)``; contexts are queued in arrival
+order and coalesced into micro-batches that run through
+:meth:`AdaptiveAgent.process_batch` on a worker thread.  A batch is flushed as
+soon as it reaches ``max_batch_size`` or ``max_latency`` seconds after its
+first context arrived, whichever comes first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+if __package__:
+    from .core import AdaptiveAgent
+else:
+    from core import AdaptiveAgent
+
+
+class AsyncAdaptiveAgent:
+    """Share one agent between many coroutines without serializing on a lock."""
+
+    def __init__(
+        self,
+        agent: Optional[AdaptiveAgent] = None,
+        *,
+        max_batch_size: int = 64,
+        max_latency: float = 0.002,
+        executor=None,
+        queue_gauges: bool = True,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be positive")
+        if max_latency < 0:
+            raise ValueError("max_latency must not be negative")
+
+        self.agent = agent or AdaptiveAgent()
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.executor = executor
+        self._pending: Deque[Tuple[Any, asyncio.Future]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+        self._agent_lock = asyncio.Lock()
+        self._batches = 0
+        self._processed = 0
+        self._largest_batch = 0
+        # Agents sharing one PipelineMetrics (see ``server.SessionManager``)
+        # pass ``queue_gauges=False`` and report queue totals through the owner.
+        if queue_gauges and self.agent.metrics is not None:
+            self.agent.metrics.register_gauges("async_queue", self.stats)
+
+    async def process(self, context: Any) -> Dict[str, Any]:
+        """Queue one context and wait for its cycle report."""
+
+        return await self.submit(context)
+
+    def submit(self, context: Any) -> asyncio.Future:
+        """Queue one context now and return a future for its cycle report.
+
+        Must be called from the event loop's thread.  Contexts are processed
+        in the order they were submitted, so a caller can queue a whole stream
+        before awaiting any of it.
+        """
+
+        if self._closing:
+            raise RuntimeError("AsyncAdaptiveAgent is closed")
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((context, future))
+        self._wakeup.set()
+        return future
+
+    async def run_exclusive(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run ``function(*args)`` on the executor while no batch is in flight.
+
+        Use this for reads of the wrapped agent (snapshots, metrics) that
+        must not interleave with :meth:`AdaptiveAgent.process_batch`.
+        """
+
+        async with self._agent_lock:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def process_batch(self, contexts: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Queue several contexts in order and wait for all of their reports."""
+
+        return list(await asyncio.gather(*(self.process(ctx) for ctx in contexts)))
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth and micro-batching counters."""
+
+        return {
+            "queued": len(self._pending),
+            "batches": self._batches,
+            "processed": self._processed,
+            "largest_batch": self._largest_batch,
+        }
+
+    async def close(self) -> None:
+        """Flush queued contexts and stop the batching worker."""
+
+        self._closing = True
+        if self._worker is not None:
+            self._wakeup.set()
+            await self._worker
+            self._worker = None
+
+    async def __aenter__(self) -> "AsyncAdaptiveAgent":
+        self._ensure_worker()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            deadline = loop.time() + self.max_latency
+            while len(self._pending) < self.max_batch_size and not self._closing:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = []
+            while self._pending and len(batch) < self.max_batch_size:
+                context, future = self._pending.popleft()
+                if not future.cancelled():
+                    batch.append((context, future))
+            if batch:
+                await self._run_batch(loop, batch)
+
+    async def _run_batch(self, loop, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        contexts = [context for context, _ in batch]
+        try:
+            async with self._agent_lock:
+                results = await loop.run_in_executor(self.executor, self.agent.process_batch, contexts)
+        except Exception as error:  # surface the failure to every waiting caller
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self._batches += 1
+        self._processed += len(batch)
+        self._largest_batch = max(self._largest_batch, len(batch))
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
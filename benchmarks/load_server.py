@@ -0,0 +1,90 @@
+"""Drive a running ``server.py`` over loopback and report throughput and latency.
+
+Usage::
+
+    python server.py --port 8000 &
+    python -m benchmarks.load_server --port 8000 --concurrency 32 --requests 2000
+
+Each client thread keeps one HTTP connection open and posts contexts from the
+mixed workload to ``/sessions/{session}/process``.  With ``--sessions 1``
+every client shares a session, which exercises server-side coalescing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+if __package__:
+    from . import workloads
+else:
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import workloads
+
+
+def run_load(host: str, port: int, *, concurrency: int, requests: int, sessions: int) -> dict:
+    contexts = [json.dumps(context) for context in workloads.mixed_stream(requests)]
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = []
+
+    def client(worker: int) -> None:
+        connection = http.client.HTTPConnection(host, port)
+        path = f"/sessions/load-{worker % sessions}/process"
+        try:
+            for body in contexts[worker::concurrency]:
+                started = time.perf_counter()
+                connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                latencies[worker].append(time.perf_counter() - started)
+                if response.status != 200:
+                    errors.append(response.status)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=client, args=(worker,)) for worker in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    merged = np.asarray([value for values in latencies for value in values])
+    return {
+        "requests": int(merged.size),
+        "errors": len(errors),
+        "requests_per_sec": round(merged.size / elapsed, 1),
+        "p50_ms": round(float(np.percentile(merged, 50)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(merged, 99)) * 1000, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test a running adaptive agent server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--requests", type=int, default=1000, help="Total process requests")
+    parser.add_argument("--sessions", type=int, default=1, help="Distinct sessions the clients spread over")
+    args = parser.parse_args(argv)
+    report = run_load(
+        args.host,
+        args.port,
+        concurrency=args.concurrency,
+        requests=args.requests,
+        sessions=args.sessions,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""Benchmark the cognitive cycle and compare the numbers against a baseline.
+
+Usage::
+
+    python -m benchmarks.run                     # print a results table
+    python -m benchmarks.run --check             # exit 1 if a metric regressed
+    python -m benchmarks.run --update-baseline   # store this machine's numbers
+
+Every case reports contexts per second, p50/p99 latency per call and the
+peak memory allocated while it runs.  Timings come from the fastest of
+several rounds to damp scheduler noise; memory is measured in a separate,
+``tracemalloc``-instrumented pass so tracing does not distort the timings.
+Baselines are stored per profile in ``benchmarks/baseline.json``; they are
+machine specific, so record them on the machine that runs ``--check``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import simulation  # noqa: E402
+from core import AdaptiveAgent  # noqa: E402
+
+if __package__:
+    from . import workloads
+else:
+    import workloads
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_TOLERANCE = 0.4
+DEFAULT_ROUNDS = 3
+# Latency differences below this are timer and scheduler noise, not regressions.
+LATENCY_FLOOR_MS = 0.25
+
+# Workload sizes per profile.  "quick" finishes in seconds and is what the
+# stored baseline and the tests use; "full" exercises million-element inputs.
+PROFILES: Dict[str, Dict[str, int]] = {
+    "quick": {"contexts": 500, "large_sequence": 100_000, "wide_mapping": 64, "state_history": 2_000, "repeat": 10},
+    "full": {"contexts": 5_000, "large_sequence": 2_000_000, "wide_mapping": 512, "state_history": 50_000, "repeat": 10},
+}
+
+# ``True`` when a larger value is better.
+METRICS = {"contexts_per_sec": True, "p50_ms": False, "p99_ms": False, "peak_kib": False}
+
+
+@dataclass
+class BenchmarkResult:
+    contexts_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    peak_kib: float
+
+
+@dataclass
+class _Timing:
+    contexts: int
+    latencies: List[float]
+
+
+def _timed_calls(calls: Iterable[Callable[[], object]], contexts_per_call: int) -> _Timing:
+    # Fixture setup (agents, warm state, files) happens before this point and
+    # is excluded from the memory peak as well as from the timings.
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    latencies = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    return _Timing(contexts=contexts_per_call * len(latencies), latencies=latencies)
+
+
+def _bench_process(contexts: List[object]) -> Callable[[], _Timing]:
+    def run() -> _Timing:
+        agent = AdaptiveAgent()
+        return _timed_calls([lambda context=context: agent.process(context) for context in contexts], 1)
+
+    return run
+
+
+def _bench_process_batch(contexts: List[object], batch_size: int = 128) -> Callable[[], _Timing]:
+    batches = [contexts[start:start + batch_size] for start in range(0, len(contexts), batch_size)]
+
+    def run() -> _Timing:
+        agent = AdaptiveAgent()
+        timing = _timed_calls([lambda batch=batch: agent.process_batch(batch) for batch in batches], 0)
+        timing.contexts = len(contexts)
+        return timing
+
+    return run
+
+
+def _bench_state_roundtrip(history: List[object], repeat: int, suffix: str, operation: str) -> Callable[[], _Timing]:
+    def run() -> _Timing:
+        agent = AdaptiveAgent()
+        agent.process_batch(history)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "state" + suffix)
+            agent.save_state(path)
+            if operation == "save":
+                calls = [lambda: agent.save_state(path)] * repeat
+            else:
+                calls = [lambda: AdaptiveAgent().load_state(path)] * repeat
+            return _timed_calls(calls, len(history))
+
+    return run
+
+
+def _bench_run_demo(contexts: List[object]) -> Callable[[], _Timing]:
+    def run() -> _Timing:
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            return _timed_calls([lambda: simulation.run_demo(contexts)], len(contexts))
+
+    return run
+
+
+def build_cases(profile: str) -> Dict[str, Callable[[], _Timing]]:
+    """Return the benchmark cases for ``profile`` keyed by name."""
+
+    sizes = PROFILES[profile]
+    count = sizes["contexts"]
+    mixed = workloads.mixed_stream(count)
+    history = workloads.mixed_stream(sizes["state_history"], seed=1)
+    large = workloads.large_sequence(sizes["large_sequence"])
+    return {
+        "process_text": _bench_process(workloads.text_contexts(count)),
+        "process_numeric_sequence": _bench_process(workloads.numeric_sequences(count)),
+        "process_large_sequence": _bench_process([large] * 3),
+        "process_wide_mapping": _bench_process(workloads.wide_mappings(count // 5 or 1, width=sizes["wide_mapping"])),
+        "process_mixed": _bench_process(mixed),
+        "process_batch_mixed": _bench_process_batch(mixed),
+        "save_state_json": _bench_state_roundtrip(history, sizes["repeat"], ".json", "save"),
+        "load_state_json": _bench_state_roundtrip(history, sizes["repeat"], ".json", "load"),
+        "save_state_binary": _bench_state_roundtrip(history, sizes["repeat"], ".snap", "save"),
+        "load_state_binary": _bench_state_roundtrip(history, sizes["repeat"], ".snap", "load"),
+        "run_demo": _bench_run_demo(mixed[: count // 5 or 1]),
+    }
+
+
+def measure(case: Callable[[], _Timing], rounds: int = DEFAULT_ROUNDS) -> BenchmarkResult:
+    """Time the fastest of ``rounds`` runs of ``case``, then trace one run for memory."""
+
+    timing = min((case() for _ in range(max(1, rounds))), key=lambda candidate: sum(candidate.latencies))
+    latencies = np.asarray(timing.latencies)
+    total = float(latencies.sum())
+
+    tracemalloc.start()
+    try:
+        case()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        contexts_per_sec=round(timing.contexts / total, 2) if total else 0.0,
+        p50_ms=round(float(np.percentile(latencies, 50)) * 1000, 4),
+        p99_ms=round(float(np.percentile(latencies, 99)) * 1000, 4),
+        peak_kib=round(peak / 1024, 1),
+    )
+
+
+def run_suite(
+    profile: str = "quick",
+    names: Optional[Iterable[str]] = None,
+    *,
+    rounds: int = DEFAULT_ROUNDS,
+) -> Dict[str, BenchmarkResult]:
+    """Measure the selected cases (all by default) of ``profile``."""
+
+    cases = build_cases(profile)
+    selected = list(names) if names else list(cases)
+    unknown = sorted(set(selected) - set(cases))
+    if unknown:
+        raise ValueError(f"Unknown benchmark case(s): {', '.join(unknown)}")
+    return {name: measure(cases[name], rounds) for name in selected}
+
+
+def compare(
+    results: Dict[str, BenchmarkResult],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """Return a description of every metric that is worse than ``baseline`` by more than ``tolerance``."""
+
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            expected = reference.get(metric)
+            if not expected:
+                continue
+            current = getattr(result, metric)
+            if higher_is_better:
+                regressed = current < expected * (1 - tolerance)
+            else:
+                regressed = current > expected * (1 + tolerance)
+                if metric.endswith("_ms"):
+                    regressed = regressed and current - expected > LATENCY_FLOOR_MS
+            if regressed:
+                change = (current - expected) / expected * 100
+                regressions.append(f"{name}.{metric}: {current:g} vs baseline {expected:g} ({change:+.1f}%)")
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def format_table(results: Dict[str, BenchmarkResult]) -> str:
+    header = f"{'case':<26}{'contexts/s':>14}{'p50 ms':>12}{'p99 ms':>12}{'peak KiB':>12}"
+    lines = [header, "-" * len(header)]
+    for name, result in results.items():
+        lines.append(
+            f"{name:<26}{result.contexts_per_sec:>14,.1f}{result.p50_ms:>12.3f}"
+            f"{result.p99_ms:>12.3f}{result.peak_kib:>12,.1f}"
+        )
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the adaptive cognitive framework.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick", help="Workload size")
+    parser.add_argument("--case", action="append", dest="cases", help="Run only this case (repeatable)")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if a metric regressed")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative slowdown before --check fails (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=DEFAULT_ROUNDS,
+        help="Timing rounds per case; the fastest is reported (default: %(default)s)",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline file location")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    results = run_suite(args.profile, args.cases, rounds=args.rounds)
+    print(format_table(results))
+
+    serialized = {name: asdict(result) for name, result in results.items()}
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as handle:
+            json.dump({"profile": args.profile, "results": serialized}, handle, indent=2)
+
+    baseline = load_baseline(args.baseline)
+    status = 0
+    if args.check:
+        stored = baseline.get("profiles", {}).get(args.profile)
+        if not stored:
+            print(f"No baseline for profile {args.profile!r}; run with --update-baseline first.")
+            return 1
+        regressions = compare(results, stored, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            status = 1
+        else:
+            print(f"\nNo regressions beyond {args.tolerance:.0%}.")
+
+    if args.update_baseline:
+        profiles = baseline.setdefault("profiles", {})
+        profiles.setdefault(args.profile, {}).update(serialized)
+        baseline["machine"] = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        }
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"Baseline for profile {args.profile!r} written to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Deterministic synthetic workloads for the benchmark suite."""
+
+from __future__ import annotations
+
+import random
+from typing import Any, List
+
+VOCABULARY = (
+    "signal stable clear error risk improve system output sensor value drift "
+    "better worse fail success useful broken great bad unstable excellent "
+    "latency queue batch window trend alpha beta gamma delta epsilon"
+).split()
+
+
+def text_contexts(count: int, *, min_words: int = 3, max_words: int = 60, seed: int = 0) -> List[str]:
+    """Sentences of varying length drawn from a small vocabulary."""
+
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(min_words, max_words))) + "."
+        for _ in range(count)
+    ]
+
+
+def numeric_sequences(count: int, *, length: int = 32, seed: int = 0) -> List[List[float]]:
+    """Lists of floats with a fixed length."""
+
+    rng = random.Random(seed)
+    return [[rng.uniform(-100.0, 100.0) for _ in range(length)] for _ in range(count)]
+
+
+def large_sequence(length: int, *, seed: int = 0) -> List[int]:
+    """One long integer sequence with moderate cardinality."""
+
+    rng = random.Random(seed)
+    return [rng.randrange(1024) for _ in range(length)]
+
+
+def wide_mappings(count: int, *, width: int = 64, seed: int = 0) -> List[dict]:
+    """Dicts with ``width`` keys and a few missing-like values."""
+
+    rng = random.Random(seed)
+    contexts = []
+    for _ in range(count):
+        contexts.append(
+            {
+                f"field_{index}": rng.choice([rng.randint(0, 1000), rng.random(), "ok", "", None])
+                for index in range(width)
+            }
+        )
+    return contexts
+
+
+def mixed_stream(count: int, *, seed: int = 0) -> List[Any]:
+    """Interleaved text, numbers, sequences and mappings with some repeats."""
+
+    rng = random.Random(seed)
+    texts = text_contexts(max(1, count // 8), seed=seed)
+    sequences = numeric_sequences(max(1, count // 8), length=16, seed=seed)
+    mappings = wide_mappings(max(1, count // 8), width=8, seed=seed)
+    contexts: List[Any] = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.35:
+            contexts.append(rng.choice(texts))
+        elif kind < 0.55:
+            contexts.append(rng.uniform(-50.0, 50.0))
+        elif kind < 0.8:
+            contexts.append(rng.choice(sequences))
+        else:
+            contexts.append(rng.choice(mappings))
+    return contexts
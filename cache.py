@@ -0,0 +1,134 @@
+"""Content-addressed memoization of state-independent adaptation features.
+
+Repeated contexts (the same status strings, the same config dicts) always
+produce the same :class:`adaptation.ContextFeatures`; only novelty, valence
+and the logs depend on live state.  :class:`FeatureCache` stores extracted
+features under a stable content hash so repeats skip tokenization, entropy
+and schema profiling.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+_PLAIN_SCALARS = (str, int, float, bool, type(None))
+_PLAIN_CONTAINERS = (list, tuple, dict)
+_PLAIN_TYPES = frozenset(_PLAIN_SCALARS + _PLAIN_CONTAINERS)
+_NUMERIC_DTYPES = {int: np.int64, float: np.float64}
+
+
+def content_key(context: Any) -> Optional[bytes]:
+    """Return a stable digest of ``context``'s content, or ``None`` if uncacheable.
+
+    Strings, numbers, ``None`` and (nested) lists, tuples and dicts built from
+    them are keyed by their type-tagged representation, which preserves dict
+    key order and distinguishes ``1``/``1.0``/``True`` and lists from tuples.
+    Homogeneous int or float sequences, ``array.array`` and non-object NumPy
+    arrays are keyed by their raw buffer instead of a per-element ``repr``.
+    Sets and arbitrary objects return ``None`` because their iteration order
+    or representation is not guaranteed to follow their content.
+    """
+
+    context_type = type(context)
+    if context_type is str:
+        payload = b"s" + context.encode("utf-8", "surrogatepass")
+    elif context_type in _PLAIN_SCALARS:
+        payload = b"v" + repr(context).encode("ascii")
+    elif context_type is list or context_type is tuple:
+        payload = _sequence_payload(context)
+    elif context_type is dict:
+        if not _is_plain(context):
+            return None
+        payload = b"c" + repr(context).encode("utf-8", "surrogatepass")
+    elif context_type is array:
+        payload = f"r{context.typecode}".encode("ascii") + context.tobytes()
+    elif context_type is np.ndarray and not context.dtype.hasobject:
+        header = f"a{context.dtype.str}{context.shape}".encode("ascii")
+        payload = header + np.ascontiguousarray(context).tobytes()
+    else:
+        return None
+    return None if payload is None else hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _sequence_payload(sequence) -> Optional[bytes]:
+    element_types = set(map(type, sequence))
+    if len(element_types) == 1:
+        (element_type,) = element_types
+        dtype = _NUMERIC_DTYPES.get(element_type)
+        if dtype is not None:
+            try:
+                buffer = np.array(sequence, dtype=dtype).tobytes()
+            except OverflowError:
+                pass
+            else:
+                return f"n{type(sequence).__name__}{element_type.__name__}".encode("ascii") + buffer
+    if not element_types <= _PLAIN_TYPES:
+        return None
+    if not all(_is_plain(item) for item in sequence if type(item) in _PLAIN_CONTAINERS):
+        return None
+    return b"c" + repr(sequence).encode("utf-8", "surrogatepass")
+
+
+def _is_plain(value: Any) -> bool:
+    value_type = type(value)
+    if value_type in _PLAIN_SCALARS:
+        return True
+    if value_type is dict:
+        return all(_is_plain(key) and _is_plain(item) for key, item in value.items())
+    if value_type in (list, tuple):
+        element_types = set(map(type, value))
+        if not element_types <= _PLAIN_TYPES:
+            return False
+        return all(_is_plain(item) for item in value if type(item) in _PLAIN_CONTAINERS)
+    return False
+
+
+class FeatureCache:
+    """LRU mapping from content keys to extracted features, with counters."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss/eviction counters."""
+
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,59 +1,392 @@
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import perf_counter
+
 if __package__:
     from .introspection import IntrospectiveState
     from .adaptation import AdaptiveLoop
     from .reflection import ReflectiveProcessor
+    from .cache import FeatureCache
+    from .sketches import SketchConfig
+    from .metrics import PipelineMetrics
+    from .persistence import StateJournal, encode_context
+    from .snapshot import SNAPSHOT_SUFFIXES, is_snapshot, read_snapshot, write_snapshot
+    from .timeline import CheckpointIndex
+    from .history import HistoryPrefix, PrefixedHistory, freeze_history
 else:
     from introspection import IntrospectiveState
     from adaptation import AdaptiveLoop
     from reflection import ReflectiveProcessor
+    from cache import FeatureCache
+    from sketches import SketchConfig
+    from metrics import PipelineMetrics
+    from persistence import StateJournal, encode_context
+    from snapshot import SNAPSHOT_SUFFIXES, is_snapshot, read_snapshot, write_snapshot
+    from timeline import CheckpointIndex
+    from history import HistoryPrefix, PrefixedHistory, freeze_history
 
 class AdaptiveAgent:
     """High-level orchestrator for observation, adaptation, and reflection."""
 
-    def __init__(self):
-        self.state = IntrospectiveState()
-        self.adaptive_loop = AdaptiveLoop(self.state)
+    RESULT_FIELDS = (
+        "processed_context",
+        "adaptation_summary",
+        "adaptation",
+        "reflection",
+        "meta_state",
+        "recommendations",
+    )
+    PROJECTABLE_FIELDS = frozenset(RESULT_FIELDS) | {"confidence"}
+
+    def __init__(
+        self,
+        state_factory=None,
+        *,
+        journal_dir=None,
+        checkpoint_interval=1000,
+        feature_cache_size=0,
+        collect_metrics=False,
+        metrics=None,
+        approximate_stats=None,
+        timeline_interval=None,
+    ):
+        """Create an agent.
+
+        ``state_factory`` builds the :class:`IntrospectiveState` used on start
+        and after :meth:`reset_state`, e.g. to plug in a custom history store.
+
+        ``journal_dir`` enables incremental persistence: every processed
+        context is appended to a :class:`StateJournal` in that directory and
+        the rolling windows are checkpointed every ``checkpoint_interval``
+        contexts.  If the directory already holds a journal, the agent
+        resumes from it.
+
+        ``feature_cache_size`` enables a :class:`FeatureCache` of that many
+        entries, so repeated contexts reuse their extracted features.
+
+        ``collect_metrics`` attaches a :class:`PipelineMetrics` that times
+        every stage of the cycle; see :meth:`get_metrics` and
+        :meth:`export_metrics`.  Without it no timers run at all.  Pass
+        ``metrics`` instead to record into a :class:`PipelineMetrics` shared
+        with other agents; its owner then reports the per-agent gauges.
+
+        ``approximate_stats`` (``True`` or a :class:`SketchConfig`) profiles
+        very long sequences with bounded-memory sketches; see
+        :mod:`sketches`.  Their details are then marked ``approximate``.
+
+        ``timeline_interval`` records a :class:`CheckpointIndex` checkpoint
+        every that many contexts, so :meth:`state_at` can restore any earlier
+        step by replaying at most one interval.
+        """
+
+        self._state_factory = state_factory or IntrospectiveState
+        self._lock = threading.RLock()
+        self._saver = None
+        self._pending_saves = set()
+        self.feature_cache = FeatureCache(feature_cache_size) if feature_cache_size else None
+        self.approximate_stats = SketchConfig() if approximate_stats is True else approximate_stats or None
+        self.state = self._state_factory()
+        self.adaptive_loop = AdaptiveLoop(self.state, self.feature_cache, self.approximate_stats)
         self.reflective_processor = ReflectiveProcessor(self.state)
+        self.metrics = metrics if metrics is not None else PipelineMetrics() if collect_metrics else None
+        if metrics is None and self.metrics is not None and self.feature_cache is not None:
+            self.metrics.register_gauges("feature_cache", self.feature_cache.stats)
+        self.journal = None
+        if journal_dir is not None:
+            self.journal = StateJournal(journal_dir, checkpoint_interval=checkpoint_interval)
+            if self.journal.has_data():
+                self.journal.restore(self.state)
+            else:
+                self.journal.rebase(self.state)
+        self.timeline = CheckpointIndex(timeline_interval) if timeline_interval else None
+        if self.timeline is not None:
+            self.timeline.rebase(self.state)
+
+    def process(self, input_context, *, fields=None):
+        """Process one context and return a structured cognitive cycle report.
 
-    def process(self, input_context):
-        """Process one context and return a structured cognitive cycle report."""
+        ``fields`` optionally restricts the result to a subset of
+        :attr:`RESULT_FIELDS` (plus ``"confidence"``, the rounded adaptation
+        confidence).  Sections nobody asked for are never built, so e.g.
+        ``fields=("confidence", "recommendations")`` skips report building,
+        reflection formatting and the reversed copy of the input.
+        """
 
+        wanted = self._resolve_fields(fields)
+        with self._lock:
+            journaled = self._encode_for_journal(input_context)
+            adaptation = self._observe_and_adapt(input_context, reverse=self._needs_details(wanted))
+            return self._complete_cycle(journaled, adaptation, wanted)
+
+    def process_batch(self, contexts, *, executor=None, chunk_size=256, fields=None):
+        """Process a sequence of contexts and return all results.
+
+        State-independent features are extracted for the whole batch up
+        front (vectorized per context type), then novelty, valence and logs
+        are folded in input order so every result matches :meth:`process`.
+
+        When ``executor`` (a ``concurrent.futures`` thread or process pool) is
+        given, extraction is split into ``chunk_size`` chunks that run on the
+        pool; only the sequential fold stays on the calling thread.
+        ``fields`` projects each result as in :meth:`process`.
+        """
+
+        wanted = self._resolve_fields(fields)
+        reverse = self._needs_details(wanted)
+        contexts = list(contexts)
+        with self._lock:
+            journaled = list(map(self._encode_for_journal, contexts))
+            started = perf_counter()
+            features = self.adaptive_loop.extract_batch(
+                contexts, reverse=reverse, executor=executor, chunk_size=chunk_size
+            )
+            if self.metrics is not None:
+                self.metrics.observe_stage("extract", perf_counter() - started)
+            results = []
+            for ctx, ctx_journaled, ctx_features in zip(contexts, journaled, features):
+                adaptation = self._observe_and_adapt(ctx, ctx_features)
+                results.append(self._complete_cycle(ctx_journaled, adaptation, wanted))
+            return results
+
+    def _encode_for_journal(self, input_context):
+        """Encode ``input_context`` for the journal before the state is touched.
+
+        A context the journal cannot store then fails before it is observed,
+        so the agent and its journal never diverge.
+        """
+        if self.journal is None:
+            return None
+        return encode_context(input_context)
+
+    def _observe_and_adapt(self, input_context, features=None, *, reverse=True):
+        metrics = self.metrics
+        if metrics is None:
+            self.state.observe(input_context)
+            return self.adaptive_loop.run(features, reverse=reverse)
+
+        started = perf_counter()
         self.state.observe(input_context)
-        adaptation = self.adaptive_loop.run()
-        reflection = self.reflective_processor.reflect(adaptation)
-        adaptation_payload = adaptation.to_dict() if adaptation else None
-        return {
-            "processed_context": adaptation.details if adaptation else None,
-            "adaptation_summary": adaptation.summary if adaptation else None,
-            "adaptation": adaptation_payload,
-            "reflection": reflection,
-            "meta_state": self.state.report(),
-            "recommendations": adaptation.recommendations if adaptation else [],
-        }
-
-    def process_batch(self, contexts):
-        """Process a sequence of contexts and return all results."""
-        return [self.process(ctx) for ctx in contexts]
+        observed = perf_counter()
+        adaptation = self.adaptive_loop.run(features, reverse=reverse)
+        metrics.observe_stage("observe", observed - started)
+        metrics.observe_stage("adapt", perf_counter() - observed)
+        metrics.count_context(self.state.meta_context["last_descriptor"])
+        return adaptation
+
+    def _complete_cycle(self, journaled, adaptation, wanted=RESULT_FIELDS):
+        metrics = self.metrics
+        if self.journal is not None:
+            started = perf_counter()
+            self.journal.record(self.state, journaled, adaptation)
+            if metrics is not None:
+                metrics.observe_stage("journal", perf_counter() - started)
+        if self.timeline is not None:
+            self.timeline.maybe_record(self.state)
+
+        result = {}
+        if "processed_context" in wanted:
+            result["processed_context"] = adaptation.details if adaptation else None
+        if "adaptation_summary" in wanted:
+            result["adaptation_summary"] = adaptation.summary if adaptation else None
+        if "adaptation" in wanted:
+            result["adaptation"] = adaptation.to_dict() if adaptation else None
+        report = None
+        if "meta_state" in wanted or "reflection" in wanted:
+            # One report serves both the reflection and the payload.
+            if metrics is None:
+                report = self.state.report()
+            else:
+                started = perf_counter()
+                report = self.state.report()
+                metrics.observe_stage("report", perf_counter() - started)
+        if "reflection" in wanted:
+            if metrics is None:
+                result["reflection"] = self.reflective_processor.reflect(adaptation, report)
+            else:
+                started = perf_counter()
+                result["reflection"] = self.reflective_processor.reflect(adaptation, report)
+                metrics.observe_stage("reflect", perf_counter() - started)
+        if "meta_state" in wanted:
+            result["meta_state"] = report
+        if "recommendations" in wanted:
+            result["recommendations"] = adaptation.recommendations if adaptation else []
+        if "confidence" in wanted:
+            result["confidence"] = round(adaptation.confidence, 4) if adaptation else None
+        return result
+
+    @classmethod
+    def _resolve_fields(cls, fields):
+        if fields is None:
+            return cls.RESULT_FIELDS
+        wanted = frozenset(fields)
+        unknown = wanted - cls.PROJECTABLE_FIELDS
+        if unknown:
+            raise ValueError(
+                f"Unknown result fields: {sorted(unknown)}; "
+                f"choose from {sorted(cls.PROJECTABLE_FIELDS)}"
+            )
+        return wanted
+
+    @staticmethod
+    def _needs_details(wanted) -> bool:
+        return "processed_context" in wanted or "adaptation" in wanted
 
     def reset_state(self) -> None:
         """Reset the agent to a fresh introspective state."""
-        self.state = IntrospectiveState()
-        self.adaptive_loop = AdaptiveLoop(self.state)
-        self.reflective_processor = ReflectiveProcessor(self.state)
+        with self._lock:
+            self.state = self._state_factory()
+            self.adaptive_loop = AdaptiveLoop(self.state, self.feature_cache, self.approximate_stats)
+            self.reflective_processor = ReflectiveProcessor(self.state)
+            self._rebase_journal()
+
+    def state_at(self, step: int) -> IntrospectiveState:
+        """Return a new state equal to this agent's state after ``step`` contexts.
+
+        The nearest :attr:`timeline` checkpoint at or before ``step`` is
+        restored and the contexts after it are replayed through a private
+        adaptive loop; without a timeline the replay starts from the empty
+        state.  Only freezing the history (see :func:`history.freeze_history`)
+        holds the agent lock.  The returned history is a
+        :class:`PrefixedHistory` over the frozen prefix, so the prefix is
+        never copied, decoded or interned and the cost stays proportional to
+        the checkpoint interval.
+        """
+        with self._lock:
+            history = self.state.history
+            if not 0 <= step <= len(history):
+                raise IndexError(f"step {step} is outside 0..{len(history)}")
+            base, data = self.timeline.nearest(step) if self.timeline is not None else (0, {})
+            frozen = freeze_history(history)
+            template = self.state.empty_like()
+
+        data["history"] = PrefixedHistory(HistoryPrefix(frozen, base))
+        template.load_from_dict(data)
+        loop = AdaptiveLoop(template, approximate=self.approximate_stats)
+        for context in HistoryPrefix(frozen, step)[base:]:
+            template.observe(context)
+            loop.run(reverse=False)
+        return template
+
+    def get_metrics(self) -> dict:
+        """Return per-stage latency, descriptor counts and gauges as plain data."""
+        return self._require_metrics().snapshot()
+
+    def export_metrics(self, prefix: str = "acf") -> str:
+        """Return the pipeline metrics in the Prometheus text format."""
+        return self._require_metrics().to_prometheus(prefix)
+
+    def _require_metrics(self) -> PipelineMetrics:
+        if self.metrics is None:
+            raise RuntimeError("Metrics are disabled; create the agent with collect_metrics=True")
+        return self.metrics
 
     def get_state_snapshot(self) -> dict:
-        """Return a serializable snapshot of the current internal state."""
-        return self.state.to_dict()
+        """Return a serializable snapshot of the current internal state.
+
+        Only freezing the state (O(window), see
+        :meth:`IntrospectiveState.freeze`) happens under the agent lock; the
+        copy is built afterwards, so concurrent :meth:`process` calls are not
+        held up while a monitoring thread takes a snapshot.
+        """
+        return self.freeze_state().to_dict()
 
-    def save_state(self, filepath: str) -> None:
-        """Save the agent's internal state to a file."""
-        import json
-        with open(filepath, 'w') as f:
-            json.dump(self.state.to_dict(), f, default=str, indent=2)
+    def freeze_state(self):
+        """Return a consistent read-only view of the state between cycles."""
+        with self._lock:
+            return self.state.freeze()
+
+    def save_state(self, filepath: str, format: str | None = None, *, background: bool = False):
+        """Save the agent's internal state to a file or journal directory.
+
+        ``format`` is ``"json"`` or ``"binary"``; by default files ending in
+        ``.snap`` use the binary snapshot format and others use JSON.  Saving
+        to the attached journal directory only flushes pending records; any
+        other existing directory receives a fresh checkpoint.
+
+        The state is frozen under the agent lock and written from the frozen
+        view.  With ``background=True`` the write runs on a dedicated thread
+        (saves complete in call order) and a ``Future`` is returned while
+        processing continues.
+        """
+        if format is None:
+            format = "binary" if str(filepath).endswith(SNAPSHOT_SUFFIXES) else "json"
+        if format not in ("binary", "json"):
+            raise ValueError(f"Unknown state format: {format!r}")
+
+        with self._lock:
+            if self._is_journal_dir(filepath):
+                self.journal.flush()
+                frozen = None
+            else:
+                frozen = self.state.freeze()
+        if not background:
+            if frozen is not None:
+                self._write_state(frozen, filepath, format)
+            return None
+
+        if frozen is None:
+            done = Future()
+            done.set_result(None)
+            return done
+        if self._saver is None:
+            self._saver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="acf-save")
+        future = self._saver.submit(self._write_state, frozen, filepath, format)
+        self._pending_saves.add(future)
+        future.add_done_callback(self._pending_saves.discard)
+        return future
+
+    @staticmethod
+    def _write_state(frozen, filepath: str, format: str) -> None:
+        if os.path.isdir(filepath):
+            StateJournal(filepath).checkpoint(frozen)
+        elif format == "binary":
+            write_snapshot(filepath, frozen)
+        else:
+            import json
+            with open(filepath, 'w') as f:
+                json.dump(frozen.to_dict(), f, default=str, indent=2)
+
+    def wait_for_saves(self) -> None:
+        """Block until every background :meth:`save_state` has finished."""
+        for future in list(self._pending_saves):
+            future.result()
 
     def load_state(self, filepath: str) -> None:
-        """Load the agent's internal state from a file."""
-        import json
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-            self.state.load_from_dict(data)
+        """Load the agent's internal state from a file or journal directory.
+
+        Binary snapshots are detected by their header; their history is
+        memory-mapped and decoded lazily on access.  Pending background saves
+        finish first, since loading may reuse the current history store.
+        """
+        self.wait_for_saves()
+        with self._lock:
+            if self._is_journal_dir(filepath):
+                self.journal.restore(self.state)
+                if self.timeline is not None:
+                    self.timeline.rebase(self.state)
+                return
+            if os.path.isdir(filepath):
+                StateJournal(filepath).restore(self.state)
+            elif is_snapshot(filepath):
+                self.state.load_from_dict(read_snapshot(filepath))
+            else:
+                import json
+                with open(filepath, 'r') as f:
+                    data = json.load(f)
+                    self.state.load_from_dict(data)
+            self._rebase_journal()
+
+    def _is_journal_dir(self, filepath: str) -> bool:
+        return self.journal is not None and os.path.abspath(filepath) == os.path.abspath(
+            self.journal.directory
+        )
+
+    def _rebase_journal(self) -> None:
+        """Checkpoint the journal and timeline after the state was replaced wholesale."""
+        if self.journal is not None:
+            self.journal.rebase(self.state)
+        if self.timeline is not None:
+            self.timeline.rebase(self.state)
@@ -0,0 +1,426 @@
+"""History storage backends for the introspective state.
+
+``IntrospectiveState.history`` defaults to a plain list.  Long-running agents
+can swap in :class:`SpillingHistory`, which keeps a bounded hot tail in memory
+and appends older contexts to segment files on disk, so resident memory stays
+flat no matter how many contexts have been observed.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import weakref
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Deque, Iterable, Iterator, List, Tuple
+
+
+class SpillingHistory(Sequence):
+    """Append-only history with an in-memory ring and a segmented disk log.
+
+    The newest ``hot_size`` contexts live in a deque.  Older ones are pickled
+    into ``segment-NNNNNN.log`` files holding ``segment_size`` records each,
+    with a companion ``.idx`` file of record offsets.  Reads of cold entries go
+    through memory maps, so indexing and iteration never load whole segments
+    into Python objects.
+
+    ``directory`` is owned by the store: stale segment files in it are removed
+    on start-up and :meth:`clear`.  When omitted, a temporary directory is
+    created and deleted again once the store is closed or garbage collected.
+    """
+
+    LOG_SUFFIX = ".log"
+    INDEX_SUFFIX = ".idx"
+    MAPPED_SEGMENTS = 4
+
+    def __init__(
+        self,
+        directory: str | os.PathLike | None = None,
+        *,
+        hot_size: int = 1024,
+        segment_size: int = 4096,
+    ) -> None:
+        if hot_size < 1 or segment_size < 1:
+            raise ValueError("hot_size and segment_size must be positive")
+
+        if directory is None:
+            self.directory = Path(tempfile.mkdtemp(prefix="acf-history-"))
+            self._finalizer = weakref.finalize(self, shutil.rmtree, str(self.directory), True)
+        else:
+            self.directory = Path(directory)
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._finalizer = None
+
+        self.hot_size = hot_size
+        self.segment_size = segment_size
+        self._hot: Deque[Any] = deque()
+        self._spilled = 0
+        self._writer = None
+        self._writer_offsets = array("Q")
+        self._writer_size = 0
+        self._mapped: "OrderedDict[int, Tuple[mmap.mmap, array, int]]" = OrderedDict()
+        # (log, index) maps of sealed segments, shared by frozen views.
+        self._sealed_maps: List[Tuple[mmap.mmap, mmap.mmap]] = []
+        self._remove_segments()
+
+    # -- sequence protocol -------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._hot)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("history index out of range")
+        if index >= self._spilled:
+            return self._hot[index - self._spilled]
+        return self._read_cold(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        spilled = self._spilled
+        for segment in range(-(-spilled // self.segment_size)):
+            view, offsets, _ = self._segment_view(segment)
+            first = segment * self.segment_size
+            count = min(self.segment_size, spilled - first)
+            for local in range(count):
+                yield self._decode(view, offsets, local)
+        yield from list(self._hot)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(len={len(self)}, hot={len(self._hot)}, "
+            f"directory={str(self.directory)!r})"
+        )
+
+    # -- mutation ------------------------------------------------------------
+
+    def append(self, context: Any) -> None:
+        self._hot.append(context)
+        if len(self._hot) > self.hot_size:
+            self._spill(self._hot.popleft())
+
+    def extend(self, contexts: Iterable[Any]) -> None:
+        for context in contexts:
+            self.append(context)
+
+    def clear(self) -> None:
+        self._hot.clear()
+        self._spilled = 0
+        self._remove_segments()
+
+    def freeze(self) -> "SpilledPrefix":
+        """Return a read-only view of the current entries.
+
+        Segment files are append-only, so the view maps them directly (the
+        open segment up to its current size, with a copy of its offsets) and
+        only the hot ring is copied.  The view can be read on another thread
+        while the store keeps appending, and stays readable after the store
+        is cleared.
+        """
+
+        sealed_segments = self._spilled // self.segment_size
+        for segment in range(len(self._sealed_maps), sealed_segments):
+            self._sealed_maps.append(
+                (self._map_file(segment, self.LOG_SUFFIX), self._map_file(segment, self.INDEX_SUFFIX))
+            )
+        segments = self._sealed_maps[:sealed_segments]
+        if self._writer is not None:
+            self._writer.flush()
+            segments.append((self._map_file(sealed_segments, self.LOG_SUFFIX), self._writer_offsets.tobytes()))
+        return SpilledPrefix(segments, self.segment_size, self._spilled, list(self._hot))
+
+    def _map_file(self, segment: int, suffix: str) -> mmap.mmap:
+        with open(self._segment_path(segment, suffix), "rb") as handle:
+            return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """Release file handles and, for temporary stores, delete the log."""
+
+        self._close_handles()
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __enter__(self) -> "SpillingHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # -- disk log ------------------------------------------------------------
+
+    def _segment_path(self, segment: int, suffix: str) -> Path:
+        return self.directory / f"segment-{segment:06d}{suffix}"
+
+    def _spill(self, context: Any) -> None:
+        segment, local = divmod(self._spilled, self.segment_size)
+        if local == 0:
+            self._writer = open(self._segment_path(segment, self.LOG_SUFFIX), "wb")
+            self._writer_offsets = array("Q")
+            self._writer_size = 0
+
+        payload = pickle.dumps(context, protocol=pickle.HIGHEST_PROTOCOL)
+        self._writer_offsets.append(self._writer_size)
+        self._writer.write(payload)
+        self._writer_size += len(payload)
+        self._spilled += 1
+
+        if local + 1 == self.segment_size:
+            self._seal_segment(segment)
+
+    def _seal_segment(self, segment: int) -> None:
+        self._writer.close()
+        self._writer = None
+        with open(self._segment_path(segment, self.INDEX_SUFFIX), "wb") as handle:
+            self._writer_offsets.tofile(handle)
+        self._unmap(segment)
+
+    def _read_cold(self, index: int) -> Any:
+        segment, local = divmod(index, self.segment_size)
+        view, offsets, _ = self._segment_view(segment)
+        return self._decode(view, offsets, local)
+
+    @staticmethod
+    def _decode(view: mmap.mmap, offsets: array, local: int) -> Any:
+        start = offsets[local]
+        end = offsets[local + 1] if local + 1 < len(offsets) else len(view)
+        return pickle.loads(view[start:end])
+
+    def _segment_view(self, segment: int) -> Tuple[mmap.mmap, array, int]:
+        active = self._writer is not None and segment == self._spilled // self.segment_size
+        cached = self._mapped.get(segment)
+        if cached is not None and (not active or cached[2] == self._writer_size):
+            self._mapped.move_to_end(segment)
+            return cached
+
+        self._unmap(segment)
+        if active:
+            self._writer.flush()
+            offsets = array("Q", self._writer_offsets)
+            size = self._writer_size
+        else:
+            offsets = array("Q")
+            with open(self._segment_path(segment, self.INDEX_SUFFIX), "rb") as handle:
+                offsets.frombytes(handle.read())
+            size = -1
+
+        with open(self._segment_path(segment, self.LOG_SUFFIX), "rb") as handle:
+            view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        entry = (view, offsets, size)
+        self._mapped[segment] = entry
+        while len(self._mapped) > self.MAPPED_SEGMENTS:
+            _, (stale, _, _) = self._mapped.popitem(last=False)
+            stale.close()
+        return entry
+
+    def _unmap(self, segment: int) -> None:
+        entry = self._mapped.pop(segment, None)
+        if entry is not None:
+            entry[0].close()
+
+    def _close_handles(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for view, _, _ in self._mapped.values():
+            view.close()
+        self._mapped.clear()
+
+    def _remove_segments(self) -> None:
+        self._close_handles()
+        # Frozen views may still read these maps; they close once unreferenced.
+        self._sealed_maps = []
+        for suffix in (self.LOG_SUFFIX, self.INDEX_SUFFIX):
+            for path in self.directory.glob(f"segment-*{suffix}"):
+                path.unlink()
+
+
+class SpilledPrefix(Sequence):
+    """Frozen view of a :class:`SpillingHistory`, from :meth:`SpillingHistory.freeze`."""
+
+    __slots__ = ("_segments", "_segment_size", "_stored", "_tail")
+
+    _OFFSET = struct.Struct("Q")  # native, as written by ``array("Q")``
+
+    def __init__(
+        self,
+        segments: List[Tuple[mmap.mmap, Any]],
+        segment_size: int,
+        stored: int,
+        tail: List[Any],
+    ) -> None:
+        self._segments = segments
+        self._segment_size = segment_size
+        self._stored = stored
+        self._tail = tail
+
+    def __len__(self) -> int:
+        return self._stored + len(self._tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        if index >= self._stored:
+            return self._tail[index - self._stored]
+
+        segment, local = divmod(index, self._segment_size)
+        view, offsets = self._segments[segment]
+        (start,) = self._OFFSET.unpack_from(offsets, local * self._OFFSET.size)
+        if (local + 1) * self._OFFSET.size < len(offsets):
+            (end,) = self._OFFSET.unpack_from(offsets, (local + 1) * self._OFFSET.size)
+        else:
+            end = len(view)
+        return pickle.loads(view[start:end])
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(self._stored):
+            yield self[index]
+        yield from self._tail
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(len={len(self)}, stored={self._stored})"
+
+    def materialize(self) -> list:
+        """Return the entries as a new list."""
+
+        return list(self)
+
+
+class HistoryPrefix(Sequence):
+    """Read-only view of the first ``length`` entries of a history store.
+
+    Only valid for stores whose existing entries never move while new ones
+    are appended (plain lists, and stores with ``STABLE_PREFIX = True``), so
+    the view can be read on another thread while the agent keeps appending.
+    """
+
+    __slots__ = ("_store", "_length")
+
+    def __init__(self, store: Any, length: int) -> None:
+        self._store = store
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store[position] for position in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("history index out of range")
+        return self._store[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        if isinstance(self._store, list):
+            return iter(self._store[:self._length])
+        return (self._store[index] for index in range(self._length))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(len={self._length}, store={type(self._store).__name__})"
+
+    def materialize(self) -> list:
+        """Return the entries as a new list."""
+
+        if isinstance(self._store, list):
+            return self._store[:self._length]
+        return list(self)
+
+
+class PrefixedHistory(Sequence):
+    """A read-only prefix followed by an in-memory tail.
+
+    Lets a state start from a frozen view of another history without copying
+    or decoding it (see :meth:`core.AdaptiveAgent.state_at`); contexts
+    observed afterwards go to the tail.
+    """
+
+    STABLE_PREFIX = True
+    ADOPTED = True
+
+    def __init__(self, prefix: Sequence) -> None:
+        self._prefix = prefix
+        self._tail: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._prefix) + len(self._tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        stored = len(self._prefix)
+        if index >= stored:
+            return self._tail[index - stored]
+        return self._prefix[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self._prefix
+        yield from list(self._tail)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(len={len(self)}, prefix={len(self._prefix)})"
+
+    def append(self, context: Any) -> None:
+        self._tail.append(context)
+
+    def extend(self, contexts: Iterable[Any]) -> None:
+        self._tail.extend(contexts)
+
+    def clear(self) -> None:
+        self._prefix = ()
+        self._tail.clear()
+
+
+def freeze_history(store: Any) -> Sequence:
+    """Return an immutable view of ``store``'s current entries.
+
+    Lists and stable-prefix stores get an O(1) :class:`HistoryPrefix`, stores
+    with a ``freeze`` method (such as :class:`SpillingHistory`) provide their
+    own view, and anything else is copied into a list.
+    """
+
+    if hasattr(store, "freeze"):
+        return store.freeze()
+    if isinstance(store, list) or getattr(store, "STABLE_PREFIX", False):
+        return HistoryPrefix(store, len(store))
+    if isinstance(store, HistoryPrefix):
+        return store
+    return list(store)
+
+
+def restore_history(store: Any, contexts: Iterable[Any]) -> Any:
+    """Load ``contexts`` into ``store``, or adopt them when the store is a list.
+
+    A list-backed state adopts any appendable sequence as-is (for example a
+    lazily decoded snapshot history); other iterables are materialized.  A
+    store that was itself adopted from an earlier load (``ADOPTED = True``,
+    such as :class:`snapshot.SnapshotHistory`) is replaced the same way
+    rather than refilled, so loading twice keeps the history lazy.
+    """
+
+    if isinstance(store, list) or getattr(store, "ADOPTED", False):
+        return contexts if hasattr(contexts, "append") else list(contexts)
+    store.clear()
+    store.extend(contexts)
+    return store
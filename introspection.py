@@ -2,16 +2,77 @@
 
 from __future__ import annotations
 
+import math
+from array import array
 from collections import deque
 from copy import deepcopy
 from statistics import mean
-from typing import Any, Deque, Dict, List
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+if __package__:
+    from .cache import FeatureCache, content_key
+    from .history import freeze_history, restore_history
+    from .novelty import NoveltyWindow
+    from .ring_buffer import ObservationLog, RingBuffer
+    from .sketches import ChunkedSequence
+else:
+    from cache import FeatureCache, content_key
+    from history import freeze_history, restore_history
+    from novelty import NoveltyWindow
+    from ring_buffer import ObservationLog, RingBuffer
+    from sketches import ChunkedSequence
+
+# Buffer-protocol containers profiled as sequences (when at least 1-D).
+_BUFFER_TYPES = (np.ndarray, array, memoryview)
+
+# Every finite float is an integer multiple of 2**-1074, so valences scaled by
+# 2**1074 sum exactly in Python ints.
+_VALENCE_SCALE_BITS = 1074
+
+
+def _scaled_valence(value: float) -> int:
+    numerator, denominator = value.as_integer_ratio()
+    return numerator * ((1 << _VALENCE_SCALE_BITS) // denominator)
 
 
 class IntrospectiveState:
-    """Tracks history, metrics, and rolling diagnostics for the agent."""
+    """Tracks history, metrics, and rolling diagnostics for the agent.
+
+    The valence trace and observation log are NumPy ring buffers (see
+    :mod:`ring_buffer`), and the class uses ``__slots__``, which keeps the
+    per-agent footprint small when many agents are hosted in one process.
+
+    With ``intern_contexts=True`` repeated contexts are stored once: each
+    observed context is looked up by its content key (see
+    :func:`cache.content_key`) and ``history``, ``recent_contexts`` and
+    ``meta_context["last"]`` reference the first stored object with the
+    same content.  Interned contexts should be treated as immutable, since
+    mutating one changes every entry that references it.
+    """
+
+    __slots__ = (
+        "window",
+        "history",
+        "recent_contexts",
+        "meta_context",
+        "emotional_valence",
+        "valence_trace",
+        "context_stats",
+        "adaptation_log",
+        "observation_log",
+        "novelty",
+        "_valence_sum",
+        "_irregular_valences",
+        "_dominant",
+        "interned",
+    )
 
     HISTORY_WINDOW = 5
+    # Distinct contexts remembered for interning; older ones are still
+    # shared by the entries that already reference them.
+    INTERN_CAPACITY = 1 << 16
     DEFAULT_CONTEXT_STATS = {
         "text": 0,
         "sequence": 0,
@@ -21,26 +82,70 @@ class IntrospectiveState:
         "other": 0,
     }
 
-    def __init__(self) -> None:
-        self.history: List[Any] = []
-        self.recent_contexts: Deque[Any] = deque(maxlen=self.HISTORY_WINDOW)
+    def __init__(
+        self,
+        history: Optional[Any] = None,
+        *,
+        window: Optional[int] = None,
+        novelty_window: Optional[int] = None,
+        novelty_mode: str = "descriptor",
+        intern_contexts: bool = False,
+    ) -> None:
+        """Create an empty state.
+
+        ``history`` may be any append-only sequence store (for example
+        :class:`history.SpillingHistory`); a plain list is used by default.
+
+        ``window`` sets the length of the rolling windows (recent contexts,
+        valence trace, adaptation and observation logs; default
+        :attr:`HISTORY_WINDOW`).  Novelty is scored against the last
+        ``novelty_window`` contexts (default ``window``) in constant time.  ``novelty_mode``
+        ``"content"`` compares SimHash sketches of the contexts' contents
+        instead of only their descriptors; see :mod:`novelty`.
+
+        ``intern_contexts`` enables content-addressed interning of observed
+        contexts, with the intern table (an LRU of
+        :attr:`INTERN_CAPACITY` content keys) kept in :attr:`interned`.
+        """
+
+        self.window = window or self.HISTORY_WINDOW
+        self.history: List[Any] = [] if history is None else history
+        self.recent_contexts: Deque[Any] = deque(maxlen=self.window)
         self.meta_context: Dict[str, Any] = {}
         self.emotional_valence: float = 0.0
-        self.valence_trace: Deque[float] = deque(maxlen=self.HISTORY_WINDOW)
+        self.valence_trace = RingBuffer(self.window)
         self.context_stats: Dict[str, int] = dict(self.DEFAULT_CONTEXT_STATS)
-        self.adaptation_log: Deque[str] = deque(maxlen=self.HISTORY_WINDOW)
-        self.observation_log: Deque[Dict[str, Any]] = deque(maxlen=self.HISTORY_WINDOW)
+        self.adaptation_log: Deque[str] = deque(maxlen=self.window)
+        self.observation_log = ObservationLog(self.window)
+        self.novelty = NoveltyWindow(novelty_window or self.window, mode=novelty_mode)
+        self.interned = FeatureCache(self.INTERN_CAPACITY) if intern_contexts else None
+        self._reset_aggregates()
+
+    def empty_like(self) -> "IntrospectiveState":
+        """Return an empty state with the same novelty and interning settings.
+
+        The new state always keeps its history in a plain list.
+        """
+
+        return type(self)(
+            window=self.window,
+            novelty_window=self.novelty.size,
+            novelty_mode=self.novelty.mode,
+            intern_contexts=self.interned is not None,
+        )
 
     def observe(self, context: Any) -> None:
         """Store the incoming context and update summary information."""
 
+        if self.interned is not None:
+            context = self.intern(context)
         descriptor = self._describe_context(context)
         size = self._estimate_size(context)
-        novelty = self.novelty_score(context)
+        novelty = self.novelty.observe(descriptor, context)
 
         self.history.append(context)
         self.recent_contexts.append(context)
-        self.context_stats[descriptor] = self.context_stats.get(descriptor, 0) + 1
+        self._count_descriptor(descriptor)
         observation = {
             "index": len(self.history),
             "descriptor": descriptor,
@@ -59,11 +164,31 @@ class IntrospectiveState:
             }
         )
 
+    def intern(self, context: Any) -> Any:
+        """Return the stored context with ``context``'s content, storing it if new.
+
+        Contexts without a content key (sets, arbitrary objects) are
+        returned unchanged.
+        """
+
+        key = content_key(context)
+        if key is None:
+            return context
+        stored = self.interned.get(key)
+        if stored is None:
+            self.interned.put(key, context)
+            return context
+        return stored
+
     def update_valence(self, delta: float) -> None:
         """Adjust the emotional valence and track the running average."""
 
         self.emotional_valence += delta
-        self.valence_trace.append(self.emotional_valence)
+        value = float(self.emotional_valence)  # the trace stores float64
+        evicted = self.valence_trace.push(value)
+        if evicted is not None:
+            self._forget_valence(evicted)
+        self._remember_valence(value)
 
     def record_adaptation(self, summary: str) -> None:
         """Add a short description of the latest adaptation."""
@@ -71,9 +196,12 @@ class IntrospectiveState:
         self.adaptation_log.append(summary)
 
     def report(self) -> Dict[str, Any]:
-        """Produce an introspection report consumed by downstream modules."""
+        """Produce an introspection report consumed by downstream modules.
+
+        The rolling average and dominant type are maintained as the state
+        changes, so building a report only copies the fixed-size windows.
+        """
 
-        rolling_average = mean(self.valence_trace) if self.valence_trace else 0.0
         return {
             "history_length": len(self.history),
             "recent_context": self.meta_context.get("last"),
@@ -81,9 +209,9 @@ class IntrospectiveState:
             "recent_context_size": self.meta_context.get("last_size"),
             "recent_context_novelty": round(self.meta_context.get("last_novelty_score", 0.0), 4),
             "emotional_valence": round(self.emotional_valence, 4),
-            "valence_trend": round(rolling_average, 4),
+            "valence_trend": round(self.valence_trend(), 4),
             "context_stats": dict(self.context_stats),
-            "dominant_context_type": self.dominant_context_type(),
+            "dominant_context_type": self._dominant,
             "recent_adaptations": list(self.adaptation_log),
             "observation_log": list(self.observation_log),
         }
@@ -101,64 +229,153 @@ class IntrospectiveState:
     def novelty_score(self, context: Any) -> float:
         """Estimate whether the context differs from the current rolling window."""
 
-        if not self.recent_contexts:
-            return 1.0
-        descriptor = self._describe_context(context)
-        descriptor_matches = sum(
-            1 for recent in self.recent_contexts if self._describe_context(recent) == descriptor
-        )
-        repetition_penalty = descriptor_matches / len(self.recent_contexts)
-        return round(max(0.0, 1.0 - repetition_penalty), 4)
+        return self.novelty.score(self._describe_context(context), context)
 
     def dominant_context_type(self) -> str | None:
         """Return the most frequently observed context descriptor."""
 
-        non_zero = {key: value for key, value in self.context_stats.items() if value > 0}
-        if not non_zero:
-            return None
-        return max(non_zero, key=non_zero.get)
+        return self._dominant
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Serialize the current state to a dictionary."""
+    def valence_trend(self) -> float:
+        """Return the mean of :attr:`valence_trace` (``0.0`` when empty).
 
-        return {
-            "history": deepcopy(self.history),
-            "recent_contexts": list(self.recent_contexts),
-            "meta_context": deepcopy(self.meta_context),
-            "emotional_valence": self.emotional_valence,
-            "valence_trace": list(self.valence_trace),
-            "context_stats": dict(self.context_stats),
-            "adaptation_log": list(self.adaptation_log),
-            "observation_log": list(self.observation_log),
-        }
+        Equal to ``statistics.mean(valence_trace)``: finite entries are summed
+        exactly as scaled integers, and a non-finite entry in the window falls
+        back to ``statistics.mean``.
+        """
+
+        if not self.valence_trace:
+            return 0.0
+        if self._irregular_valences:
+            return mean(self.valence_trace)
+        return self._valence_sum / (len(self.valence_trace) << _VALENCE_SCALE_BITS)
+
+    def to_dict(self, include_history: bool = True) -> Dict[str, Any]:
+        """Serialize the current state to a dictionary.
+
+        ``include_history=False`` skips the (potentially large) history copy
+        for writers that stream history entries themselves.  Array and
+        buffer contexts are shared with the live history rather than copied.
+        """
+
+        return self.freeze(include_history).to_dict(include_history)
+
+    def freeze(self, include_history: bool = True) -> "FrozenState":
+        """Capture a read-only view of the state in O(window) time.
+
+        The history is referenced up to its current length rather than
+        copied (see :func:`history.freeze_history`), and the fixed-size
+        windows are copied, so the view can be serialized on another thread
+        while this state keeps observing.  With ``include_history=False``
+        the history is not touched at all and the view's ``history`` is
+        ``None``, for writers that only need the windows.
+        """
+
+        return FrozenState(
+            history=freeze_history(self.history) if include_history else None,
+            recent_contexts=list(self.recent_contexts),
+            meta_context=dict(self.meta_context),
+            emotional_valence=self.emotional_valence,
+            valence_trace=list(self.valence_trace),
+            context_stats=dict(self.context_stats),
+            adaptation_log=list(self.adaptation_log),
+            observation_log=list(self.observation_log),
+        )
 
     def load_from_dict(self, data: Dict[str, Any]) -> None:
         """Restore the state from a dictionary."""
 
-        self.history = data.get("history", [])
+        self.history = restore_history(self.history, data.get("history", []))
         self.recent_contexts = deque(
-            data.get("recent_contexts", []), maxlen=self.HISTORY_WINDOW
+            data.get("recent_contexts", []), maxlen=self.window
         )
         self.meta_context = data.get("meta_context", {})
         self.emotional_valence = data.get("emotional_valence", 0.0)
-        self.valence_trace = deque(
-            data.get("valence_trace", []), maxlen=self.HISTORY_WINDOW
-        )
+        self.valence_trace = RingBuffer(self.window, data.get("valence_trace", []))
         self.context_stats = dict(self.DEFAULT_CONTEXT_STATS)
         self.context_stats.update(data.get("context_stats", {}))
         self.adaptation_log = deque(
-            data.get("adaptation_log", []), maxlen=self.HISTORY_WINDOW
-        )
-        self.observation_log = deque(
-            data.get("observation_log", []), maxlen=self.HISTORY_WINDOW
+            data.get("adaptation_log", []), maxlen=self.window
         )
+        self.observation_log = ObservationLog(self.window, data.get("observation_log", []))
+        if self.interned is not None:
+            self._intern_loaded()
+        self._reset_aggregates()
+        self._rebuild_novelty()
+
+    def _intern_loaded(self) -> None:
+        """Share equal contexts among the restored history and windows.
+
+        Lazily decoded stores (such as :class:`snapshot.SnapshotHistory`)
+        are left alone; their entries are not resident to begin with.
+        """
+
+        self.interned.clear()
+        if type(self.history) is list:
+            self.history[:] = map(self.intern, self.history)
+        self.recent_contexts = deque(map(self.intern, self.recent_contexts), maxlen=self.window)
+        if "last" in self.meta_context:
+            self.meta_context["last"] = self.intern(self.meta_context["last"])
+
+    def _rebuild_novelty(self) -> None:
+        """Refill the novelty window from the tail of the restored history."""
 
-    def _describe_context(self, context: Any) -> str:
+        size = self.novelty.size
+        if len(self.history) >= len(self.recent_contexts):
+            recent = self.history[max(0, len(self.history) - size):]
+        else:
+            recent = list(self.recent_contexts)[-size:]
+        self.novelty.rebuild((self._describe_context(context), context) for context in recent)
+
+    def _reset_aggregates(self) -> None:
+        """Recompute the running valence sum and dominant type from scratch."""
+
+        self._valence_sum = 0
+        self._irregular_valences = 0
+        for value in self.valence_trace:
+            self._remember_valence(value)
+
+        non_zero = {key: value for key, value in self.context_stats.items() if value > 0}
+        self._dominant = max(non_zero, key=non_zero.get) if non_zero else None
+
+    def _remember_valence(self, value: Any) -> None:
+        if type(value) is float and math.isfinite(value):
+            self._valence_sum += _scaled_valence(value)
+        else:
+            self._irregular_valences += 1
+
+    def _forget_valence(self, value: Any) -> None:
+        if type(value) is float and math.isfinite(value):
+            self._valence_sum -= _scaled_valence(value)
+        else:
+            self._irregular_valences -= 1
+
+    def _count_descriptor(self, descriptor: str) -> None:
+        count = self.context_stats.get(descriptor, 0) + 1
+        self.context_stats[descriptor] = count
+        dominant = self._dominant
+        if dominant is None or dominant == descriptor:
+            self._dominant = descriptor
+            return
+        leading = self.context_stats[dominant]
+        if count > leading:
+            self._dominant = descriptor
+        elif count == leading:
+            # Ties go to the descriptor listed first, as max() over the dict would.
+            for key in self.context_stats:
+                if key == descriptor or key == dominant:
+                    self._dominant = key
+                    break
+
+    @staticmethod
+    def _describe_context(context: Any) -> str:
         if isinstance(context, str):
             return "text"
         if isinstance(context, bool):
             return "boolean"
-        if isinstance(context, (list, tuple, set)):
+        if isinstance(context, (list, tuple, set, ChunkedSequence)):
+            return "sequence"
+        if isinstance(context, _BUFFER_TYPES) and getattr(context, "ndim", 1):
             return "sequence"
         if isinstance(context, dict):
             return "mapping"
@@ -166,11 +383,66 @@ class IntrospectiveState:
             return "numeric"
         return "other"
 
-    def _estimate_size(self, context: Any) -> int:
+    @staticmethod
+    def _estimate_size(context: Any) -> int:
         if isinstance(context, str):
             return len(context)
-        if isinstance(context, (list, tuple, set)):
+        if isinstance(context, (list, tuple, set, ChunkedSequence)):
+            return len(context)
+        if isinstance(context, _BUFFER_TYPES) and getattr(context, "ndim", 1):
             return len(context)
         if isinstance(context, dict):
             return len(context.keys())
         return 1
+
+
+def _shared_buffers(contexts) -> Dict[int, Any]:
+    """Return a ``deepcopy`` memo that keeps buffer contexts as references."""
+
+    return {id(context): context for context in contexts if isinstance(context, _BUFFER_TYPES)}
+
+
+class FrozenState:
+    """Point-in-time view of an :class:`IntrospectiveState`.
+
+    Produced by :meth:`IntrospectiveState.freeze`; exposes the same
+    ``history`` and ``to_dict`` used by the state writers, so snapshots,
+    JSON files and checkpoints can be written from it off the agent's thread.
+    """
+
+    __slots__ = (
+        "history",
+        "recent_contexts",
+        "meta_context",
+        "emotional_valence",
+        "valence_trace",
+        "context_stats",
+        "adaptation_log",
+        "observation_log",
+    )
+
+    def __init__(self, **fields: Any) -> None:
+        for name in self.__slots__:
+            setattr(self, name, fields[name])
+
+    def to_dict(self, include_history: bool = True) -> Dict[str, Any]:
+        """Serialize the view exactly like :meth:`IntrospectiveState.to_dict`."""
+
+        # One memo for every field, so contexts shared by several entries
+        # (see ``intern_contexts``) stay shared in the copy.
+        memo = _shared_buffers(self.meta_context.values())
+        data = {
+            "recent_contexts": list(self.recent_contexts),
+            "meta_context": deepcopy(self.meta_context, memo),
+            "emotional_valence": self.emotional_valence,
+            "valence_trace": list(self.valence_trace),
+            "context_stats": dict(self.context_stats),
+            "adaptation_log": list(self.adaptation_log),
+            "observation_log": list(self.observation_log),
+        }
+        if include_history:
+            history = self.history
+            history = history.materialize() if hasattr(history, "materialize") else list(history)
+            memo.update(_shared_buffers(history))
+            data = {"history": deepcopy(history, memo), **data}
+        return data
@@ -0,0 +1,147 @@
+"""Low-overhead pipeline metrics for :class:`core.AdaptiveAgent`.
+
+The agent times each stage of the cognitive cycle (``observe``, ``adapt``,
+``reflect``, ``report``, plus ``extract`` for batch feature extraction and
+``journal`` when persistence is attached) into fixed-bucket latency
+histograms, counts contexts per descriptor and samples registered gauge
+sources such as the feature cache or an async queue.  Agents created without
+metrics skip all of this.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+STAGES = ("observe", "extract", "adapt", "reflect", "report", "journal")
+
+# Upper bounds in seconds; the last, implicit bucket is +Inf.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile by interpolating inside its bucket."""
+
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class PipelineMetrics:
+    """Per-stage latency histograms, descriptor counts and gauge sources."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.stages: Dict[str, LatencyHistogram] = {stage: LatencyHistogram(buckets) for stage in STAGES}
+        self.descriptors: Counter = Counter()
+        self.cycles = 0
+        self._gauge_sources: Dict[str, Callable[[], Mapping[str, Any]]] = {}
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        self.stages[stage].observe(seconds)
+
+    def count_context(self, descriptor: str) -> None:
+        self.descriptors[descriptor] += 1
+        self.cycles += 1
+
+    def register_gauges(self, name: str, source: Callable[[], Mapping[str, Any]]) -> None:
+        """Sample ``source()`` (a mapping of numeric values) on every export."""
+
+        self._gauge_sources[name] = source
+
+    def unregister_gauges(self, name: str) -> None:
+        self._gauge_sources.pop(name, None)
+
+    def gauges(self) -> Dict[str, Dict[str, float]]:
+        sampled = {}
+        for name, source in self._gauge_sources.items():
+            sampled[name] = {
+                key: value
+                for key, value in source().items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            }
+        return sampled
+
+    def reset(self) -> None:
+        """Clear histograms and counters; gauge sources stay registered."""
+
+        for histogram in self.stages.values():
+            histogram.__init__(histogram.buckets)
+        self.descriptors.clear()
+        self.cycles = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current metrics as plain data."""
+
+        return {
+            "cycles": self.cycles,
+            "stages": {stage: histogram.snapshot() for stage, histogram in self.stages.items()},
+            "descriptors": dict(self.descriptors),
+            "gauges": self.gauges(),
+        }
+
+    def to_prometheus(self, prefix: str = "acf") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+
+        lines = [
+            f"# HELP {prefix}_stage_duration_seconds Time spent in each stage of the cognitive cycle.",
+            f"# TYPE {prefix}_stage_duration_seconds histogram",
+        ]
+        for stage, histogram in self.stages.items():
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{prefix}_stage_duration_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}'
+                )
+            lines.append(f'{prefix}_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{prefix}_stage_duration_seconds_sum{{stage="{stage}"}} {histogram.sum!r}')
+            lines.append(f'{prefix}_stage_duration_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+        lines.append(f"# HELP {prefix}_contexts_total Contexts processed, by descriptor.")
+        lines.append(f"# TYPE {prefix}_contexts_total counter")
+        for descriptor, count in sorted(self.descriptors.items()):
+            lines.append(f'{prefix}_contexts_total{{descriptor="{descriptor}"}} {count}')
+
+        for name, values in self.gauges().items():
+            for key, value in values.items():
+                metric = f"{prefix}_{name}_{key}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
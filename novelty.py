@@ -0,0 +1,158 @@
+"""Constant-time novelty scoring over a sliding window of recent contexts.
+
+:class:`NoveltyWindow` keeps one key tuple per windowed context together
+with running counts of every key, so scoring a new context costs one lookup
+per key no matter how long the window is.
+
+In ``"descriptor"`` mode the key is the context descriptor and the score is
+the share of the window with a different descriptor, exactly the original
+rule.  In ``"content"`` mode the key is a 64-bit SimHash of the context's
+tokens (words, sequence items, mapping entries), split into
+:data:`SIMHASH_BANDS` bands.  Similar contents agree on most bands and
+unrelated ones on almost none, so "same type, different content" scores as
+novel without pairwise comparisons.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Tuple
+
+import numpy as np
+
+if __package__:
+    from .sketches import mix64, token_hash
+else:
+    from sketches import mix64, token_hash
+
+NOVELTY_MODES = ("descriptor", "content")
+SIMHASH_BANDS = 8
+_BAND_BITS = 64 // SIMHASH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+_CHUNK_ROWS = 1 << 16
+_NUMERIC_VIEWS = {int: np.int64, float: np.float64}
+
+
+class NoveltyWindow:
+    """Sliding window of context keys with per-key counts."""
+
+    __slots__ = ("size", "mode", "_entries", "_counts")
+
+    def __init__(self, size: int, *, mode: str = "descriptor") -> None:
+        if size < 1:
+            raise ValueError("novelty window size must be positive")
+        if mode not in NOVELTY_MODES:
+            raise ValueError(f"Unknown novelty mode: {mode!r}; choose from {NOVELTY_MODES}")
+        self.size = size
+        self.mode = mode
+        self._entries: Deque[Tuple[Any, ...]] = deque()
+        self._counts: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def score(self, descriptor: str, context: Any) -> float:
+        """Return how novel ``context`` is relative to the window (1.0 when empty)."""
+
+        return self._score(self._keys(descriptor, context))
+
+    def observe(self, descriptor: str, context: Any) -> float:
+        """Score ``context``, then slide it into the window."""
+
+        keys = self._keys(descriptor, context)
+        novelty = self._score(keys)
+        self._push(keys)
+        return novelty
+
+    def rebuild(self, contexts: Iterable[Tuple[str, Any]]) -> None:
+        """Refill the window from ``(descriptor, context)`` pairs, oldest first."""
+
+        self.clear()
+        for descriptor, context in contexts:
+            self._push(self._keys(descriptor, context))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._counts.clear()
+
+    def _keys(self, descriptor: str, context: Any) -> Tuple[Any, ...]:
+        if self.mode == "descriptor":
+            return (descriptor,)
+        fingerprint = simhash(context) ^ token_hash(descriptor)
+        return tuple(
+            (band << _BAND_BITS) | ((fingerprint >> (band * _BAND_BITS)) & _BAND_MASK)
+            for band in range(SIMHASH_BANDS)
+        )
+
+    def _score(self, keys: Tuple[Any, ...]) -> float:
+        if not self._entries:
+            return 1.0
+        counts = self._counts
+        matches = sum(counts.get(key, 0) for key in keys)
+        return round(max(0.0, 1.0 - matches / (len(keys) * len(self._entries))), 4)
+
+    def _push(self, keys: Tuple[Any, ...]) -> None:
+        counts = self._counts
+        if len(self._entries) == self.size:
+            for key in self._entries.popleft():
+                remaining = counts[key] - 1
+                if remaining:
+                    counts[key] = remaining
+                else:
+                    del counts[key]
+        self._entries.append(keys)
+        for key in keys:
+            counts[key] = counts.get(key, 0) + 1
+
+
+def simhash(context: Any) -> int:
+    """Return a 64-bit SimHash of ``context``'s tokens.
+
+    Text is tokenized into lower-cased words, sequences into their items,
+    mappings into ``key=value`` entries; homogeneous int/float sequences and
+    numeric arrays are hashed in one vectorized pass.  Contexts sharing most
+    tokens get fingerprints differing in few bits.
+    """
+
+    return _fingerprint(_token_hashes(context))
+
+
+def _token_hashes(context: Any) -> np.ndarray:
+    if isinstance(context, str):
+        return _hash_tokens(context.lower().split())
+    if isinstance(context, (array, memoryview)):
+        context = np.asarray(context)
+    if isinstance(context, np.ndarray) and context.dtype.kind in "biuf":
+        return mix64(np.ascontiguousarray(context, dtype=np.float64).ravel().view(np.uint64))
+    if isinstance(context, (list, tuple, set)):
+        element_types = set(map(type, context))
+        if len(element_types) == 1:
+            dtype = _NUMERIC_VIEWS.get(next(iter(element_types)))
+            if dtype is not None:
+                try:
+                    values = np.array(list(context) if isinstance(context, set) else context, dtype=dtype)
+                except OverflowError:
+                    pass
+                else:
+                    return mix64(values.view(np.uint64) ^ np.uint64(dtype is np.float64))
+        return _hash_tokens(map(repr, context))
+    if isinstance(context, dict):
+        return _hash_tokens(f"{key!r}={value!r}" for key, value in context.items())
+    return _hash_tokens([repr(context)])
+
+
+def _hash_tokens(tokens: Iterable[str]) -> np.ndarray:
+    return np.fromiter(map(token_hash, tokens), dtype=np.uint64)
+
+
+def _fingerprint(hashes: np.ndarray) -> int:
+    if not hashes.size:
+        return 0
+    ones = np.zeros(64, dtype=np.int64)
+    for start in range(0, hashes.size, _CHUNK_ROWS):
+        chunk = np.ascontiguousarray(hashes[start:start + _CHUNK_ROWS], dtype="<u8")
+        bits = np.unpackbits(chunk.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+        ones += bits.sum(axis=0, dtype=np.int64)
+    majority = (2 * ones > hashes.size).astype(np.uint8)
+    return int.from_bytes(np.packbits(majority, bitorder="little").tobytes(), "little")
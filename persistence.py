@@ -0,0 +1,296 @@
+"""Incremental persistence for the introspective state.
+
+A :class:`StateJournal` directory holds three files:
+
+- ``base.json`` – a full :meth:`IntrospectiveState.to_dict` dump, written
+  only when the state is replaced wholesale (a new journal, ``load_state``,
+  ``reset_state``).
+- ``journal.ndjson`` – one record per context processed since the base,
+  holding just enough to replay the cycle (context, valence delta and
+  adaptation summary).  It is only ever appended to.
+- ``checkpoint.json`` – the rolling windows and counters (no history) plus
+  the history length they belong to, replaced atomically every
+  ``checkpoint_interval`` records.
+
+Saving therefore costs one small append per observation and a fixed-size
+checkpoint per interval, however long the history grows.  Restoring reads the
+base, takes the history up to the checkpoint from the journal and replays at
+most ``checkpoint_interval`` records.  All three files carry the generation
+of the base they extend, so files left over from an interrupted rebase are
+ignored rather than mixed.
+
+Contexts that JSON cannot represent faithfully (sets, tuples, bytes, NumPy
+values, dicts with non-string keys, ...) are stored as ``{"$pickle": <base64
+pickle>}``, so a restored state matches the live one; memoryviews are pickled
+as NumPy arrays, as in binary snapshots.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+if __package__:
+    from .snapshot import dumps
+else:
+    from snapshot import dumps
+
+
+class StateJournal:
+    """Append-only journal with periodic window checkpoints for one state."""
+
+    BASE_FILE = "base.json"
+    CHECKPOINT_FILE = "checkpoint.json"
+    JOURNAL_FILE = "journal.ndjson"
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        *,
+        checkpoint_interval: int = 1000,
+        fsync: bool = False,
+    ) -> None:
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be positive")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_interval = checkpoint_interval
+        self.fsync = fsync
+        self.pending = 0
+        self.generation: Optional[str] = None
+        self._handle = None
+
+    @property
+    def base_path(self) -> Path:
+        return self.directory / self.BASE_FILE
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.directory / self.CHECKPOINT_FILE
+
+    @property
+    def journal_path(self) -> Path:
+        return self.directory / self.JOURNAL_FILE
+
+    def has_data(self) -> bool:
+        """Return whether the directory already holds a journaled state."""
+
+        return self.base_path.exists()
+
+    def record(self, state, encoded_context: Any, adaptation) -> None:
+        """Append the cycle that just ran and checkpoint when one is due.
+
+        ``encoded_context`` is the context passed through
+        :func:`encode_context`; encode it before the cycle mutates the state,
+        so a context the journal cannot store is rejected up front.
+        """
+
+        entry = {
+            "i": len(state.history),
+            "c": encoded_context,
+            "v": adaptation.details.get("valence_delta", 0.0) if adaptation else 0.0,
+            "s": adaptation.summary if adaptation else None,
+        }
+        handle = self._journal_handle()
+        handle.write(json.dumps(entry, default=str, separators=(",", ":")) + "\n")
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+
+        self.pending += 1
+        if self.pending >= self.checkpoint_interval:
+            self.checkpoint(state)
+
+    def checkpoint(self, state) -> None:
+        """Atomically write the windows and counters of ``state``.
+
+        The history is not written: the journal already holds every context
+        since the base, so the checkpoint stays the same size as it grows.
+        """
+
+        self.flush()
+        data = _encode_windows(state.to_dict(include_history=False))
+        data["generation"] = self.generation
+        data["history_length"] = len(state.history)
+        self._write_json(self.checkpoint_path, data)
+        self.pending = 0
+
+    def rebase(self, state) -> None:
+        """Start a new generation from ``state``, which was replaced wholesale.
+
+        The base is replaced first, so an interruption leaves either the old
+        generation intact or the new base with an empty journal.
+        """
+
+        self.close()
+        self.generation = os.urandom(8).hex()
+        data = _encode_windows(state.to_dict())
+        data["history"] = list(map(encode_context, data["history"]))
+        data["generation"] = self.generation
+        self._write_json(self.base_path, data)
+        self._start_journal()
+        if self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+        self.pending = 0
+
+    def restore(self, state) -> None:
+        """Rebuild ``state`` from the base, the journal and the latest checkpoint.
+
+        Journal records up to the checkpoint only extend the history; later
+        ones are replayed.  A torn final record left behind by a crash is
+        discarded and truncated, and a checkpoint the journal does not reach
+        is ignored in favour of replaying from the base.
+        """
+
+        self.close()
+        base = self._read_json(self.base_path) or {}
+        self.generation = base.get("generation")
+        history = list(map(decode_context, base.get("history", [])))
+        checkpoint = self._read_json(self.checkpoint_path)
+        if checkpoint is None or checkpoint.get("generation") != self.generation:
+            checkpoint = None
+
+        records = []
+        valid_bytes = 0
+        if self.journal_path.exists():
+            current = False
+            with open(self.journal_path, "rb") as handle:
+                for raw_line in handle:
+                    entry = self._parse_entry(raw_line)
+                    if entry is None:
+                        break
+                    if "g" in entry:
+                        current = entry["g"] == self.generation
+                    if not current:
+                        records, valid_bytes = [], 0
+                        break
+                    valid_bytes += len(raw_line)
+                    if "i" in entry:
+                        records.append(entry)
+
+        reached = records[-1]["i"] if records else len(history)
+        if checkpoint is not None and checkpoint["history_length"] <= reached:
+            windows, split = _decode_windows(checkpoint), checkpoint["history_length"]
+        else:
+            windows, split = _decode_windows(base), len(history)
+        replay = []
+        for entry in records:
+            if entry["i"] <= len(history):
+                continue
+            if entry["i"] <= split:
+                history.append(decode_context(entry["c"]))
+            else:
+                replay.append(entry)
+        windows["history"] = history
+        state.load_from_dict(windows)
+
+        for entry in replay:
+            state.observe(decode_context(entry["c"]))
+            state.update_valence(entry["v"])
+            if entry["s"] is not None:
+                state.record_adaptation(entry["s"])
+        self.pending = len(replay)
+
+        if valid_bytes == 0:
+            self._start_journal()
+        elif valid_bytes != self.journal_path.stat().st_size:
+            os.truncate(self.journal_path, valid_bytes)
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _journal_handle(self):
+        if self._handle is None:
+            self._handle = open(self.journal_path, "a", encoding="utf-8")
+        return self._handle
+
+    def _start_journal(self) -> None:
+        """Replace the journal with one holding only the generation header."""
+
+        self.close()
+        self._write_json(self.journal_path, {"g": self.generation}, suffix="\n")
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any], suffix: str = "") -> None:
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, default=str, separators=(",", ":"))
+            handle.write(suffix)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+
+    @staticmethod
+    def _parse_entry(raw_line: bytes) -> Optional[dict]:
+        if not raw_line.endswith(b"\n"):
+            return None
+        try:
+            return json.loads(raw_line)
+        except json.JSONDecodeError:
+            return None
+
+
+def _encode_windows(data: Dict[str, Any]) -> Dict[str, Any]:
+    data["recent_contexts"] = list(map(encode_context, data["recent_contexts"]))
+    if "last" in data["meta_context"]:
+        data["meta_context"]["last"] = encode_context(data["meta_context"]["last"])
+    return data
+
+
+def _decode_windows(data: Dict[str, Any]) -> Dict[str, Any]:
+    data = {key: value for key, value in data.items() if key not in ("history", "generation", "history_length")}
+    data["recent_contexts"] = list(map(decode_context, data.get("recent_contexts", [])))
+    meta_context = data["meta_context"] = dict(data.get("meta_context", {}))
+    if "last" in meta_context:
+        meta_context["last"] = decode_context(meta_context["last"])
+    return data
+
+
+_PICKLED = "$pickle"
+
+
+def encode_context(context: Any) -> Any:
+    """Return ``context`` as is if JSON round-trips it, else a pickled wrapper."""
+
+    if _is_json_native(context) and not (type(context) is dict and _PICKLED in context):
+        return context
+    payload = dumps(context)
+    return {_PICKLED: base64.b64encode(payload).decode("ascii")}
+
+
+def decode_context(value: Any) -> Any:
+    """Invert :func:`encode_context`."""
+
+    if type(value) is dict and len(value) == 1 and _PICKLED in value:
+        return pickle.loads(base64.b64decode(value[_PICKLED]))
+    return value
+
+
+def _is_json_native(value: Any) -> bool:
+    kind = type(value)
+    if kind is str or kind is int or kind is float or kind is bool or value is None:
+        return True
+    if kind is list:
+        return all(map(_is_json_native, value))
+    if kind is dict:
+        return all(type(key) is str for key in value) and all(map(_is_json_native, value.values()))
+    return False
@@ -0,0 +1,208 @@
+"""Multi-process agent pool for independent context streams.
+
+Each stream key (a user, a sensor, ...) is hashed to one of ``workers`` shard
+processes.  A shard owns one :class:`AdaptiveAgent` per stream it has seen,
+so streams never share introspective state and shards never need to
+coordinate.  Submissions are grouped per shard and per stream and run through
+:meth:`AdaptiveAgent.process_batch`; results come back in submission order.
+Commands are pickled like snapshot records (:func:`snapshot.dumps`), so
+memoryview contexts reach the shards as NumPy arrays.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import pickle
+import zlib
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+if __package__:
+    from .core import AdaptiveAgent
+    from .snapshot import dumps
+else:
+    from core import AdaptiveAgent
+    from snapshot import dumps
+
+
+def _shard_main(connection, agent_factory: Callable[[], AdaptiveAgent]) -> None:
+    agents: Dict[Hashable, AdaptiveAgent] = {}
+
+    def agent_for(stream_key: Hashable) -> AdaptiveAgent:
+        agent = agents.get(stream_key)
+        if agent is None:
+            agent = agents[stream_key] = agent_factory()
+        return agent
+
+    while True:
+        try:
+            command, payload = pickle.loads(connection.recv_bytes())
+        except EOFError:
+            return
+        except Exception as error:  # e.g. a context that failed to unpickle
+            connection.send(("error", error))
+            continue
+        if command == "close":
+            connection.close()
+            return
+        try:
+            if command == "process":
+                positions_by_stream: Dict[Hashable, List[int]] = {}
+                for position, (stream_key, _) in enumerate(payload):
+                    positions_by_stream.setdefault(stream_key, []).append(position)
+                results: List[Any] = [None] * len(payload)
+                for stream_key, positions in positions_by_stream.items():
+                    contexts = [payload[position][1] for position in positions]
+                    for position, result in zip(positions, agent_for(stream_key).process_batch(contexts)):
+                        results[position] = result
+                reply = results
+            elif command == "report":
+                reply = {key: agent.state.report() for key, agent in agents.items()}
+            elif command == "snapshot":
+                reply = {key: agent.get_state_snapshot() for key, agent in agents.items()}
+            else:
+                raise ValueError(f"Unknown pool command: {command!r}")
+        except Exception as error:  # hand the failure back to the caller
+            connection.send(("error", error))
+        else:
+            connection.send(("ok", reply))
+
+
+def _send(connection, message: Tuple[str, Any]) -> None:
+    connection.send_bytes(dumps(message))
+
+
+class AgentPool:
+    """Route context streams to worker processes that each own their agents."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        *,
+        agent_factory: Callable[[], AdaptiveAgent] = AdaptiveAgent,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        if self.workers < 1:
+            raise ValueError("workers must be positive")
+
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self._connections = []
+        self._processes = []
+        for _ in range(self.workers):
+            parent_end, child_end = context.Pipe()
+            process = context.Process(target=_shard_main, args=(child_end, agent_factory), daemon=True)
+            process.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._processes.append(process)
+
+    def shard_for(self, stream_key: Hashable) -> int:
+        """Return the shard index for ``stream_key`` (stable across runs)."""
+
+        return zlib.crc32(repr(stream_key).encode("utf-8")) % self.workers
+
+    def process(self, stream_key: Hashable, context: Any) -> Dict[str, Any]:
+        """Process one context on its stream's agent."""
+
+        return self.process_many([(stream_key, context)])[0]
+
+    def process_many(self, items: Iterable[Tuple[Hashable, Any]]) -> List[Dict[str, Any]]:
+        """Process ``(stream_key, context)`` pairs and return results in order.
+
+        Every shard receives its share in one message and works on it in
+        parallel with the others; contexts of the same stream are applied in
+        the order they were submitted.
+        """
+
+        items = list(items)
+        positions_by_shard: Dict[int, List[int]] = {}
+        for position, (stream_key, _) in enumerate(items):
+            positions_by_shard.setdefault(self.shard_for(stream_key), []).append(position)
+
+        for shard, positions in positions_by_shard.items():
+            _send(self._connections[shard], ("process", [items[position] for position in positions]))
+
+        # Every shard's reply is read before an error is raised, so no stale
+        # reply is left in a pipe for the next call.
+        replies = self._receive_all(positions_by_shard)
+        results: List[Any] = [None] * len(items)
+        for shard, positions in positions_by_shard.items():
+            for position, result in zip(positions, replies[shard]):
+                results[position] = result
+        return results
+
+    def report(self) -> Dict[str, Any]:
+        """Aggregate ``IntrospectiveState.report()`` across every stream and shard."""
+
+        per_shard = self._broadcast("report")
+        context_stats: Counter = Counter()
+        history_length = 0
+        valences = []
+        shards = []
+        for shard, reports in enumerate(per_shard):
+            shard_history = 0
+            for report in reports.values():
+                context_stats.update(report["context_stats"])
+                shard_history += report["history_length"]
+                valences.append(report["emotional_valence"])
+            history_length += shard_history
+            shards.append({"shard": shard, "streams": len(reports), "history_length": shard_history})
+
+        non_zero = {key: value for key, value in context_stats.items() if value > 0}
+        return {
+            "shards": self.workers,
+            "streams": sum(entry["streams"] for entry in shards),
+            "history_length": history_length,
+            "context_stats": dict(context_stats),
+            "dominant_context_type": max(non_zero, key=non_zero.get) if non_zero else None,
+            "emotional_valence": round(sum(valences) / len(valences), 4) if valences else 0.0,
+            "per_shard": shards,
+        }
+
+    def snapshot(self) -> Dict[Hashable, Dict[str, Any]]:
+        """Return ``get_state_snapshot()`` for every stream, keyed by stream."""
+
+        merged: Dict[Hashable, Dict[str, Any]] = {}
+        for snapshots in self._broadcast("snapshot"):
+            merged.update(snapshots)
+        return merged
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                _send(connection, ("close", None))
+            process.join()
+            connection.close()
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self) -> "AgentPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _broadcast(self, command: str) -> List[Any]:
+        for connection in self._connections:
+            _send(connection, (command, None))
+        replies = self._receive_all(range(self.workers))
+        return [replies[shard] for shard in range(self.workers)]
+
+    def _receive_all(self, shards: Iterable[int]) -> Dict[int, Any]:
+        """Read one reply from each of ``shards``, then raise the first error."""
+
+        replies: Dict[int, Any] = {}
+        first_error = None
+        for shard in shards:
+            status, payload = self._connections[shard].recv()
+            if status == "error":
+                first_error = first_error or payload
+            else:
+                replies[shard] = payload
+        if first_error is not None:
+            raise first_error
+        return replies
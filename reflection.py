@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Dict, Optional
 
 if __package__:
     from .adaptation import AdaptationResult
@@ -16,11 +16,16 @@ class ReflectiveProcessor:
     def __init__(self, state):
         self.state = state
 
-    def reflect(self, adaptation: Optional[AdaptationResult]) -> str:
+    def reflect(
+        self, adaptation: Optional[AdaptationResult], report: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Summarize the state; ``report`` may pass an already built ``state.report()``."""
+
         if not self.state.history:
             return "No context to reflect on."
 
-        report = self.state.report()
+        if report is None:
+            report = self.state.report()
         summaries = ", ".join(self.state.summarize_recent_contexts())
         valence = self.state.emotional_valence
         trend = report["valence_trend"]
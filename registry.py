@@ -0,0 +1,244 @@
+"""Multi-tenant agent registry with LRU eviction to disk.
+
+:class:`AgentRegistry` maps keys (session ids, user ids, ...) to
+:class:`AdaptiveAgent` instances.  At most ``capacity`` agents stay resident;
+the least recently used one beyond that is written to a binary snapshot in
+the registry directory and dropped.  The next :meth:`AgentRegistry.get` for
+its key rebuilds the agent from ``agent_factory`` and loads the snapshot,
+whose history is memory-mapped and decoded lazily, so rehydration cost does
+not grow with the history length.
+
+Snapshots live under ``directory/<2 hex>/<digest>.snap``, named by a hash of
+``repr(key)``, so millions of keys never crowd one directory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+if __package__:
+    from .core import AdaptiveAgent
+    from .metrics import LatencyHistogram, PipelineMetrics
+else:
+    from core import AdaptiveAgent
+    from metrics import LatencyHistogram, PipelineMetrics
+
+
+class AgentRegistry:
+    """Keyed agents with a bounded resident set and on-disk spill.
+
+    Agents returned by :meth:`get` may be evicted by any later call that
+    brings another key into memory, so callers should not hold on to them
+    across registry calls; :meth:`process` and :meth:`process_batch` wrap
+    the usual look-up-then-process pattern.  Registry bookkeeping is
+    guarded by a lock, so threads may share one registry; processing itself
+    runs under each agent's own lock, so different keys are processed
+    concurrently.  An agent being processed is never evicted; the resident
+    set may briefly exceed ``capacity`` until it is released.
+    """
+
+    SUFFIX = ".snap"
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        agent_factory: Callable[[], AdaptiveAgent] = AdaptiveAgent,
+        *,
+        capacity: int = 1024,
+        metrics: Optional[PipelineMetrics] = None,
+    ) -> None:
+        """Create a registry spilling to ``directory`` (created if missing).
+
+        ``capacity`` bounds the resident agents.  With ``metrics``, the
+        registry's counters and eviction/rehydration latencies are exported
+        as the ``registry`` gauge group.
+        """
+
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.agent_factory = agent_factory
+        self.capacity = capacity
+        self.latency = {"evict": LatencyHistogram(), "rehydrate": LatencyHistogram()}
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.rehydrated = 0
+        self.evictions = 0
+        self._resident: "OrderedDict[Hashable, AdaptiveAgent]" = OrderedDict()
+        self._in_use: Counter = Counter()
+        self._lock = threading.RLock()
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.register_gauges("registry", self.stats)
+
+    def __len__(self) -> int:
+        return len(self._resident)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._resident or self.path_for(key).exists()
+
+    def __enter__(self) -> "AgentRegistry":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def path_for(self, key: Hashable) -> Path:
+        """Return the snapshot path used for ``key``."""
+
+        digest = hashlib.blake2b(repr(key).encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        return self.directory / digest[:2] / (digest + self.SUFFIX)
+
+    def get(self, key: Hashable) -> AdaptiveAgent:
+        """Return the agent for ``key``, rehydrating or creating it as needed."""
+
+        with self._lock:
+            agent = self._resident.get(key)
+            if agent is not None:
+                self._resident.move_to_end(key)
+                self.hits += 1
+                return agent
+
+            self.misses += 1
+            agent = self.agent_factory()
+            path = self.path_for(key)
+            if path.exists():
+                started = perf_counter()
+                agent.load_state(str(path))
+                self.latency["rehydrate"].observe(perf_counter() - started)
+                self.rehydrated += 1
+            else:
+                self.created += 1
+            self._resident[key] = agent
+            self._shrink()
+            return agent
+
+    def process(self, key: Hashable, context: Any, **kwargs) -> Dict[str, Any]:
+        """Run :meth:`AdaptiveAgent.process` on ``key``'s agent."""
+
+        agent = self._acquire(key)
+        try:
+            return agent.process(context, **kwargs)
+        finally:
+            self._release(key)
+
+    def process_batch(self, key: Hashable, contexts, **kwargs) -> List[Dict[str, Any]]:
+        """Run :meth:`AdaptiveAgent.process_batch` on ``key``'s agent."""
+
+        agent = self._acquire(key)
+        try:
+            return agent.process_batch(contexts, **kwargs)
+        finally:
+            self._release(key)
+
+    def evict(self, key: Hashable) -> bool:
+        """Write ``key``'s agent to disk and drop it.
+
+        Returns ``False`` if the agent is not resident or is being processed.
+        """
+
+        with self._lock:
+            if key in self._in_use:
+                return False
+            agent = self._resident.pop(key, None)
+            if agent is None:
+                return False
+            self._spill(key, agent)
+            return True
+
+    def discard(self, key: Hashable) -> bool:
+        """Forget ``key`` entirely, in memory and on disk."""
+
+        with self._lock:
+            found = self._resident.pop(key, None) is not None
+            path = self.path_for(key)
+            if path.exists():
+                path.unlink()
+                found = True
+            return found
+
+    def resident_keys(self) -> List[Hashable]:
+        """Resident keys, least recently used first."""
+
+        with self._lock:
+            return list(self._resident)
+
+    def flush(self) -> None:
+        """Write every resident agent to disk without evicting it."""
+
+        with self._lock:
+            for key, agent in self._resident.items():
+                self._write(key, agent)
+
+    def close(self) -> None:
+        """Spill every resident agent and empty the resident set."""
+
+        with self._lock:
+            while self._resident:
+                self._spill(*self._resident.popitem(last=False))
+            if self.metrics is not None:
+                self.metrics.unregister_gauges("registry")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters plus eviction and rehydration latency percentiles."""
+
+        stats: Dict[str, Any] = {
+            "resident": len(self._resident),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "created": self.created,
+            "rehydrated": self.rehydrated,
+            "evictions": self.evictions,
+        }
+        for name, histogram in self.latency.items():
+            stats[f"{name}_p50_seconds"] = histogram.quantile(0.5)
+            stats[f"{name}_p99_seconds"] = histogram.quantile(0.99)
+        return stats
+
+    def _acquire(self, key: Hashable) -> AdaptiveAgent:
+        """Return ``key``'s agent, pinned against eviction until released."""
+
+        with self._lock:
+            # Pin first, so the lookup's own eviction pass cannot spill ``key``.
+            self._in_use[key] += 1
+            try:
+                return self.get(key)
+            except BaseException:
+                self._release(key)
+                raise
+
+    def _release(self, key: Hashable) -> None:
+        with self._lock:
+            self._in_use[key] -= 1
+            if not self._in_use[key]:
+                del self._in_use[key]
+            self._shrink()
+
+    def _shrink(self) -> None:
+        """Spill least recently used agents that are not in use down to capacity."""
+
+        while len(self._resident) > self.capacity:
+            victim = next((key for key in self._resident if key not in self._in_use), None)
+            if victim is None:
+                return
+            self._spill(victim, self._resident.pop(victim))
+
+    def _spill(self, key: Hashable, agent: AdaptiveAgent) -> None:
+        started = perf_counter()
+        self._write(key, agent)
+        self.latency["evict"].observe(perf_counter() - started)
+        self.evictions += 1
+
+    def _write(self, key: Hashable, agent: AdaptiveAgent) -> None:
+        path = self.path_for(key)
+        path.parent.mkdir(exist_ok=True)
+        agent.save_state(str(path), format="binary")
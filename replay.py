@@ -0,0 +1,56 @@
+"""Restore a saved agent state at an earlier step.
+
+Loads a state saved by ``simulation.py --save-state`` (or
+:meth:`AdaptiveAgent.save_state`) and prints the introspective state after
+``--step`` contexts as JSON.  With ``--timeline`` (an index written by
+``simulation.py --timeline``) only the contexts after the nearest checkpoint
+are replayed; otherwise the replay starts from the first context.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+if __package__:
+    from .core import AdaptiveAgent
+    from .timeline import CheckpointIndex
+else:
+    ROOT = Path(__file__).resolve().parent
+    sys.path.append(str(ROOT))
+    from core import AdaptiveAgent
+    from timeline import CheckpointIndex
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Restore an adaptive agent state at a given step.")
+    parser.add_argument("state", help="Saved state (JSON file, binary snapshot or journal directory)")
+    parser.add_argument("--step", type=int, required=True, help="Number of processed contexts to restore")
+    parser.add_argument("--timeline", help="Checkpoint index recorded alongside the state")
+    parser.add_argument(
+        "--include-history",
+        action="store_true",
+        help="Include the history prefix in the printed state",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+
+    agent = AdaptiveAgent()
+    agent.load_state(args.state)
+    if args.timeline:
+        agent.timeline = CheckpointIndex.load(args.timeline)
+
+    try:
+        state = agent.state_at(args.step)
+    except IndexError as error:
+        raise SystemExit(f"error: {error}") from error
+    print(json.dumps(state.to_dict(include_history=args.include_history), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Fixed-capacity NumPy ring buffers for the introspective windows.
+
+:class:`RingBuffer` stores scalars (or records of a structured dtype) in a
+preallocated array and behaves like a ``deque`` with ``maxlen`` for the
+operations the state uses: ``append``, ``len``, indexing, iteration and
+``maxlen``.  :class:`ObservationLog` keeps observation records as
+``(index, descriptor code, size, novelty)`` rows and only builds the
+familiar dicts when they are read.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, Iterator, List
+
+import numpy as np
+
+
+class RingBuffer:
+    """A ``deque(maxlen=...)`` lookalike backed by one preallocated array."""
+
+    __slots__ = ("maxlen", "_data", "_start", "_size")
+
+    def __init__(self, maxlen: int, values: Iterable[Any] = (), *, dtype: Any = np.float64) -> None:
+        self.maxlen = maxlen
+        self._data = np.zeros(maxlen, dtype=dtype)
+        self._start = 0
+        self._size = 0
+        for value in values:
+            self.append(value)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def append(self, value: Any) -> None:
+        """Add ``value`` at the right end, dropping the oldest entry when full."""
+
+        maxlen = self.maxlen
+        if not maxlen:
+            return
+        if self._size < maxlen:
+            self._data[(self._start + self._size) % maxlen] = self._encode(value)
+            self._size += 1
+        else:
+            self._data[self._start] = self._encode(value)
+            self._start = (self._start + 1) % maxlen
+
+    def push(self, value: Any) -> Any:
+        """Append ``value`` and return the entry it evicted (``None`` if not full)."""
+
+        maxlen = self.maxlen
+        if self._size < maxlen or not maxlen:
+            self.append(value)
+            return None
+        start = self._start
+        evicted = self._decode(self._data.item(start))
+        self._data[start] = self._encode(value)
+        self._start = (start + 1) % maxlen
+        return evicted
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+
+    def ordered(self) -> np.ndarray:
+        """Return the entries oldest first as a NumPy array (a copy)."""
+
+        end = self._start + self._size
+        if end <= self.maxlen:
+            return self._data[self._start:end].copy()
+        return self._data.take(np.arange(self._start, end) % self.maxlen)
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return self._decode(self._data.item((self._start + index) % self.maxlen))
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self._decode, self._rows())
+
+    def _rows(self) -> List[Any]:
+        """Entries oldest first as Python values (tuples for structured dtypes)."""
+
+        rows = self._data.tolist()
+        end = self._start + self._size
+        if end > self.maxlen:
+            return rows[self._start:] + rows[:end - self.maxlen]
+        return rows[self._start:end]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r}, maxlen={self.maxlen})"
+
+    def __reduce__(self):
+        return (type(self), (self.maxlen, list(self)))
+
+    def _encode(self, value: Any) -> Any:
+        return value
+
+    def _decode(self, value: Any) -> Any:
+        return value
+
+
+_DESCRIPTOR_NAMES: List[str] = []
+_DESCRIPTOR_CODES: Dict[str, int] = {}
+_DESCRIPTOR_LOCK = threading.Lock()
+
+
+def descriptor_code(descriptor: str) -> int:
+    """Return the process-wide small integer standing for ``descriptor``."""
+
+    code = _DESCRIPTOR_CODES.get(descriptor)
+    if code is None:
+        with _DESCRIPTOR_LOCK:
+            code = _DESCRIPTOR_CODES.get(descriptor)
+            if code is None:
+                code = _DESCRIPTOR_CODES[descriptor] = len(_DESCRIPTOR_NAMES)
+                _DESCRIPTOR_NAMES.append(descriptor)
+    return code
+
+
+class ObservationLog(RingBuffer):
+    """Ring buffer of observation records, read back as dicts.
+
+    Descriptors are stored as codes from a process-wide table, so pickling
+    goes through the materialized dicts (see :meth:`RingBuffer.__reduce__`).
+    """
+
+    __slots__ = ()
+
+    DTYPE = np.dtype(
+        [("index", np.int64), ("descriptor", np.uint16), ("size", np.int64), ("novelty_score", np.float64)]
+    )
+
+    def __init__(self, maxlen: int, values: Iterable[Dict[str, Any]] = ()) -> None:
+        super().__init__(maxlen, values, dtype=self.DTYPE)
+
+    def _encode(self, observation: Dict[str, Any]) -> tuple:
+        return (
+            observation["index"],
+            descriptor_code(observation["descriptor"]),
+            observation["size"],
+            observation["novelty_score"],
+        )
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = _DESCRIPTOR_NAMES
+        return iter([
+            {"index": index, "descriptor": names[code], "size": size, "novelty_score": novelty}
+            for index, code, size, novelty in self._rows()
+        ])
+
+    def _decode(self, record: tuple) -> Dict[str, Any]:
+        index, code, size, novelty = record
+        return {"index": index, "descriptor": _DESCRIPTOR_NAMES[code], "size": size, "novelty_score": novelty}
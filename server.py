@@ -0,0 +1,295 @@
+"""HTTP serving mode for the adaptive agent.
+
+Run with ``python server.py --port 8000`` (requires the optional ``fastapi``
+and ``uvicorn`` dependencies).  Every session id gets its own
+:class:`AdaptiveAgent` behind an :class:`AsyncAdaptiveAgent`, so concurrent
+requests for the same session are coalesced into ``process_batch`` calls.
+
+Endpoints::
+
+    POST   /sessions/{session}/process    JSON context -> JSON cycle report
+    POST   /sessions/{session}/batch      NDJSON contexts -> streamed NDJSON reports
+    GET    /sessions/{session}/snapshot   serialized introspective state
+    DELETE /sessions/{session}            drop the session's agent
+    GET    /sessions                      active session ids
+    GET    /metrics                       Prometheus text format
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+if __package__:
+    from .async_agent import AsyncAdaptiveAgent
+    from .core import AdaptiveAgent
+    from .metrics import PipelineMetrics
+else:
+    ROOT = Path(__file__).resolve().parent
+    sys.path.append(str(ROOT))
+    from async_agent import AsyncAdaptiveAgent
+    from core import AdaptiveAgent
+    from metrics import PipelineMetrics
+
+try:
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.responses import PlainTextResponse, Response
+except ImportError:  # optional dependency; create_app() reports it
+    FastAPI = None
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(payload, default=str).encode("utf-8")
+
+
+class SessionManager:
+    """Create, look up and close the per-session async agents.
+
+    All sessions share one single-threaded executor: agent work is CPU bound
+    and holds the GIL, so one thread loses no throughput while keeping the
+    shared :class:`PipelineMetrics` free of cross-thread updates.
+    ``agent_factory`` is called with ``metrics=`` that shared instance.
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable[..., AdaptiveAgent] = AdaptiveAgent,
+        *,
+        max_batch_size: int = 64,
+        max_latency: float = 0.002,
+    ) -> None:
+        self.agent_factory = agent_factory
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.metrics = PipelineMetrics()
+        self.metrics.register_gauges("server", self.stats)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="acf-agent")
+        self._sessions: Dict[str, AsyncAdaptiveAgent] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def ids(self):
+        return list(self._sessions)
+
+    def get(self, session: str) -> AsyncAdaptiveAgent:
+        front = self._sessions.get(session)
+        if front is None:
+            front = AsyncAdaptiveAgent(
+                self.agent_factory(metrics=self.metrics),
+                max_batch_size=self.max_batch_size,
+                max_latency=self.max_latency,
+                executor=self.executor,
+                queue_gauges=False,
+            )
+            self._sessions[session] = front
+        return front
+
+    async def drop(self, session: str) -> bool:
+        front = self._sessions.pop(session, None)
+        if front is None:
+            return False
+        await front.close()
+        return True
+
+    async def close(self) -> None:
+        for session in list(self._sessions):
+            await self.drop(session)
+        self.executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        totals = {"sessions": len(self._sessions), "queued": 0, "batches": 0, "processed": 0}
+        for front in self._sessions.values():
+            front_stats = front.stats()
+            for key in ("queued", "batches", "processed"):
+                totals[key] += front_stats[key]
+            cache = front.agent.feature_cache
+            if cache is not None:
+                totals["feature_cache_hits"] = totals.get("feature_cache_hits", 0) + cache.hits
+                totals["feature_cache_misses"] = totals.get("feature_cache_misses", 0) + cache.misses
+        return totals
+
+
+async def _iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Decode one JSON value per non-blank line of a streamed body."""
+
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+def create_app(
+    agent_factory: Callable[..., AdaptiveAgent] = AdaptiveAgent,
+    *,
+    max_batch_size: int = 64,
+    max_latency: float = 0.002,
+    max_in_flight: Optional[int] = None,
+):
+    """Build the FastAPI application.
+
+    ``max_in_flight`` bounds how many contexts of one streamed batch request
+    are queued before their results are written back (default: two
+    micro-batches), so large uploads are processed with bounded memory.
+    """
+
+    if FastAPI is None:
+        raise RuntimeError("The HTTP server requires the optional 'fastapi' package")
+
+    sessions = SessionManager(agent_factory, max_batch_size=max_batch_size, max_latency=max_latency)
+    in_flight_limit = max_in_flight or 2 * max_batch_size
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await sessions.close()
+
+    app = FastAPI(title="Adaptive Cognitive Framework", lifespan=lifespan)
+    app.state.sessions = sessions
+
+    def json_response(payload: Any) -> Response:
+        return Response(_encode(payload), media_type="application/json")
+
+    def existing(session: str) -> AsyncAdaptiveAgent:
+        if session not in sessions.ids():
+            raise HTTPException(status_code=404, detail=f"Unknown session: {session}")
+        return sessions.get(session)
+
+    @app.post("/sessions/{session}/process")
+    async def process(session: str, request: Request):
+        try:
+            context = json.loads(await request.body())
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {error}") from error
+        return json_response(await sessions.get(session).process(context))
+
+    class BatchStream(Response):
+        """Duplex NDJSON response: contexts are read and answered as they arrive.
+
+        ``StreamingResponse`` cannot be used because it listens for client
+        disconnects on the same ``receive`` channel the request body is
+        still being read from.
+        """
+
+        media_type = "application/x-ndjson"
+
+        def __init__(self, front: AsyncAdaptiveAgent) -> None:
+            self.front = front
+            self.status_code = 200
+            self.background = None
+            self.init_headers()
+
+        async def __call__(self, scope, receive, send) -> None:
+            async def body() -> AsyncIterator[bytes]:
+                while True:
+                    message = await receive()
+                    if message["type"] == "http.disconnect":
+                        return
+                    yield message.get("body", b"")
+                    if not message.get("more_body", False):
+                        return
+
+            async def write(payload: Any) -> None:
+                await send({"type": "http.response.body", "body": _encode(payload) + b"\n", "more_body": True})
+
+            async def answer(future: asyncio.Future) -> None:
+                # The status line is already sent, so a failed context is
+                # reported in-band and the stream carries on.
+                try:
+                    result = await future
+                except Exception as error:
+                    result = {"error": f"{type(error).__name__}: {error}"}
+                await write(result)
+
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            pending: deque = deque()
+            try:
+                async for context in _iter_ndjson(body()):
+                    pending.append(self.front.submit(context))
+                    while len(pending) >= in_flight_limit:
+                        await answer(pending.popleft())
+                while pending:
+                    await answer(pending.popleft())
+            except ValueError as error:
+                while pending:
+                    await answer(pending.popleft())
+                await write({"error": f"Invalid NDJSON line: {error}"})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    @app.post("/sessions/{session}/batch")
+    async def batch(session: str):
+        return BatchStream(sessions.get(session))
+
+    @app.get("/sessions/{session}/snapshot")
+    async def snapshot(session: str):
+        front = existing(session)
+        # Agents freeze their state under their own lock, so the copy can be
+        # built on a worker thread while the session keeps processing.
+        return json_response(await asyncio.to_thread(front.agent.get_state_snapshot))
+
+    @app.delete("/sessions/{session}")
+    async def drop(session: str):
+        if not await sessions.drop(session):
+            raise HTTPException(status_code=404, detail=f"Unknown session: {session}")
+        return json_response({"dropped": session})
+
+    @app.get("/sessions")
+    async def list_sessions():
+        return json_response({"sessions": sessions.ids()})
+
+    @app.get("/metrics")
+    async def metrics():
+        text = await asyncio.get_running_loop().run_in_executor(sessions.executor, sessions.metrics.to_prometheus)
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+    return app
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve the adaptive cognitive framework over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: loopback)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--max-batch-size", type=int, default=64, help="Largest coalesced batch per session")
+    parser.add_argument(
+        "--max-latency",
+        type=float,
+        default=0.002,
+        help="Seconds to wait for more requests before running a batch",
+    )
+    parser.add_argument(
+        "--feature-cache-size",
+        type=int,
+        default=0,
+        help="Per-session feature cache entries (0 disables the cache)",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError as error:  # pragma: no cover - depends on optional deps
+        raise SystemExit("The HTTP server requires the optional 'uvicorn' package") from error
+
+    def agent_factory(**options) -> AdaptiveAgent:
+        return AdaptiveAgent(feature_cache_size=args.feature_cache_size, **options)
+
+    app = create_app(agent_factory, max_batch_size=args.max_batch_size, max_latency=args.max_latency)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,69 +3,301 @@
 from __future__ import annotations
 
 import argparse
+import codecs
 import json
+import mmap
+import re
 import sys
+from collections.abc import Hashable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, List
+from time import perf_counter
+from typing import BinaryIO, Dict, Iterable, Iterator, List, TextIO, Tuple
 
 if __package__:
     from .core import AdaptiveAgent
+    from .pool import AgentPool
+    from .writers import WRITERS, open_writer
 else:
     ROOT = Path(__file__).resolve().parent
     sys.path.append(str(ROOT))
     from core import AdaptiveAgent
+    from pool import AgentPool
+    from writers import WRITERS, open_writer
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Characters that may continue a JSON number; a top-level number followed by
+# one of them at the end of the buffer may still be cut off by the read.
+_NUMBER_CONTINUATION = frozenset("0123456789.eE+-")
+# Contexts handed to the workers at a time by ``run_demo(workers=...)``.
+PARALLEL_BATCH_SIZE = 4096
+
+
+def run_demo(
+    inputs: Iterable[object],
+    *,
+    save_state: str | None = None,
+    timeline: str | None = None,
+    timeline_interval: int = 1000,
+    workers: int | None = None,
+    stream_key: str | None = None,
+    progress: bool = False,
+    batch_size: int = PARALLEL_BATCH_SIZE,
+    output: str | None = None,
+    output_format: str | None = None,
+    quiet: bool = False,
+) -> dict:
+    """Process ``inputs``, print every step and return the run summary.
+
+    ``workers`` > 1 extracts features for batches of ``batch_size`` contexts
+    on a process pool while the state is still folded in input order, so the
+    printed steps and the saved state match a serial run.  With
+    ``stream_key``, mapping contexts are routed by that field to independent
+    per-stream agents (an :class:`AgentPool` when ``workers`` > 1); steps are
+    still printed in input order and ``save_state`` writes one JSON document
+    listing every stream's key and snapshot.  ``progress`` reports throughput on
+    stderr.
+
+    With ``output`` the steps go to a buffered structured writer instead of
+    stdout (see :func:`writers.open_writer`), and ``quiet`` drops the
+    per-step output altogether; either way the summary is printed at the end
+    and only the result fields it needs are computed.  Steps are summarized
+    as they stream by, so no results are retained.
+    """
 
+    if stream_key is not None and timeline:
+        raise ValueError("--timeline needs a single stream; drop --stream-key")
 
-def run_demo(inputs: Iterable[object], *, save_state: str | None = None) -> None:
-    agent = AdaptiveAgent()
+    meter = ProgressMeter() if progress else None
+    summarizer = ResultSummarizer()
+    with ExitStack() as stack:
+        writer = stack.enter_context(open_writer(output, output_format)) if output else None
+        if writer is not None:
+            fields = None if writer.FIELDS is None else ResultSummarizer.FIELDS | writer.FIELDS
+        else:
+            fields = ResultSummarizer.FIELDS if quiet else None
+
+        if stream_key is None:
+            agent = AdaptiveAgent(timeline_interval=timeline_interval if timeline else None)
+            steps = _process_single(agent, inputs, workers, batch_size, stack, fields)
+        else:
+            streams = _StreamAgents(workers, stack)
+            steps = streams.process(inputs, stream_key, batch_size, fields)
+
+        for index, (ctx, result) in enumerate(steps, start=1):
+            summarizer.add(result)
+            if writer is not None:
+                writer.write(index, ctx, result)
+            elif not quiet:
+                _print_step(index, ctx, result)
+            if meter is not None:
+                meter.update(index)
+        if meter is not None:
+            meter.finish()
+
+        if save_state:
+            if stream_key is None:
+                agent.save_state(save_state)
+            else:
+                streams.save_state(save_state)
+            print(f"State saved to {save_state}")
+    if timeline:
+        agent.timeline.save(timeline)
+        print(f"Checkpoint index saved to {timeline}")
+
+    summary = summarizer.summary()
+    if writer is not None or quiet:
+        if writer is not None:
+            print(f"Results written to {output}")
+        print(json.dumps(summary, indent=2))
+    return summary
+
+
+def _print_step(index: int, ctx: object, result: dict) -> None:
+    print(f"Step {index}")
+    print("Input:", ctx)
+    print("Adaptation Summary:", result["adaptation_summary"])
+    print("Adaptation Confidence:", result.get("adaptation", {}).get("confidence"))
+    print("Recommendations:")
+    print(json.dumps(result.get("recommendations", []), indent=2, default=str))
+    print("Processed Context:")
+    print(json.dumps(result["processed_context"], indent=2, default=str))
+    print("Reflection:", result["reflection"])
+    print("Meta-state:")
+    print(json.dumps(result["meta_state"], indent=2, default=str))
+    print("---")
+
+
+def _batches(inputs: Iterable[object], batch_size: int) -> Iterator[List[object]]:
+    iterator = iter(inputs)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _process_single(
+    agent: AdaptiveAgent,
+    inputs: Iterable[object],
+    workers: int | None,
+    batch_size: int,
+    stack: ExitStack,
+    fields: frozenset | None = None,
+) -> Iterator[Tuple[object, dict]]:
+    if not workers or workers < 2:
+        for ctx in inputs:
+            yield ctx, agent.process(ctx, fields=fields)
+        return
+
+    executor = stack.enter_context(ProcessPoolExecutor(workers))
+    for batch in _batches(inputs, batch_size):
+        chunk_size = -(-len(batch) // workers)
+        results = agent.process_batch(batch, executor=executor, chunk_size=chunk_size, fields=fields)
+        yield from zip(batch, results)
+
+
+class _StreamAgents:
+    """Per-stream agents, in this process or spread over an :class:`AgentPool`."""
+
+    def __init__(self, workers: int | None, stack: ExitStack) -> None:
+        self.pool = stack.enter_context(AgentPool(workers)) if workers and workers > 1 else None
+        self.agents: Dict[object, AdaptiveAgent] = {}
+
+    def process(
+        self,
+        inputs: Iterable[object],
+        stream_key: str,
+        batch_size: int,
+        fields: frozenset | None = None,
+    ) -> Iterator[Tuple[object, dict]]:
+        """Yield ``(context, result)`` in input order.
+
+        ``fields`` projects the results of in-process agents; pool workers
+        always return full results.
+        """
+
+        for batch in _batches(inputs, batch_size):
+            items = [(_stream_of(ctx, stream_key), ctx) for ctx in batch]
+            if self.pool is not None:
+                results = self.pool.process_many(items)
+            else:
+                results = [self._agent(key).process(ctx, fields=fields) for key, ctx in items]
+            yield from zip(batch, results)
+
+    def save_state(self, filepath: str) -> None:
+        if self.pool is not None:
+            snapshots = self.pool.snapshot()
+        else:
+            snapshots = {key: agent.get_state_snapshot() for key, agent in self.agents.items()}
+        # Key/state pairs rather than a mapping: JSON object keys are strings,
+        # so e.g. ``1`` and ``"1"`` or ``None`` and ``"None"`` would collide.
+        streams = [{"key": key, "state": snapshots[key]} for key in sorted(snapshots, key=repr)]
+        with open(filepath, "w") as handle:
+            json.dump({"streams": streams}, handle, default=str, indent=2)
+
+    def _agent(self, key: object) -> AdaptiveAgent:
+        agent = self.agents.get(key)
+        if agent is None:
+            agent = self.agents[key] = AdaptiveAgent()
+        return agent
+
+
+def _stream_of(ctx: object, stream_key: str) -> object:
+    """Stream of ``ctx``: its ``stream_key`` field, or ``None`` without one."""
+
+    if isinstance(ctx, dict):
+        key = ctx.get(stream_key)
+        return key if isinstance(key, Hashable) else repr(key)
+    return None
+
+
+class ProgressMeter:
+    """Throughput readout on stderr, refreshed at most every ``interval`` seconds."""
+
+    def __init__(self, stream: TextIO | None = None, interval: float = 0.5) -> None:
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.count = 0
+        self._started = self._shown = perf_counter()
+
+    def update(self, count: int) -> None:
+        self.count = count
+        now = perf_counter()
+        if now - self._shown >= self.interval:
+            self._shown = now
+            self._write("\r")
+
+    def finish(self) -> None:
+        self._write("\r")
+        self.stream.write("\n")
+        self.stream.flush()
+
+    def _write(self, prefix: str) -> None:
+        elapsed = perf_counter() - self._started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        self.stream.write(f"{prefix}{self.count:,} contexts in {elapsed:.1f}s ({rate:,.0f} ctx/s)")
+        self.stream.flush()
+
+
+class ResultSummarizer:
+    """Incrementally build the :func:`summarize_results` summary.
+
+    Only running totals and the latest result's summary fields are kept, so
+    a run of any length is summarized in constant memory.  Results may be
+    full or projected to :attr:`FIELDS`.
+    """
+
+    # Result fields (see ``AdaptiveAgent.process(fields=...)``) the summary reads.
+    FIELDS = frozenset({"adaptation_summary", "confidence", "meta_state"})
+
+    def __init__(self) -> None:
+        self.total_steps = 0
+        self.last_adaptation_summary = None
+        self.final_history_length = 0
+        self._confidence_sum = 0.0
+        self._confidence_count = 0
+
+    def add(self, result: dict) -> None:
+        """Fold one process result into the running summary."""
+
+        self.total_steps += 1
+        self.last_adaptation_summary = result.get("adaptation_summary")
+        self.final_history_length = result.get("meta_state", {}).get("history_length", 0)
+        if "adaptation" in result:
+            confidence = result["adaptation"].get("confidence", 0.0) if result["adaptation"] else None
+        else:
+            confidence = result.get("confidence")
+        if confidence is not None:
+            self._confidence_sum += confidence
+            self._confidence_count += 1
+
+    @property
+    def average_confidence(self) -> float:
+        if not self._confidence_count:
+            return 0.0
+        return self._confidence_sum / self._confidence_count
+
+    def summary(self) -> dict:
+        """Return the summary of every result added so far."""
 
-    for index, ctx in enumerate(inputs, start=1):
-        result = agent.process(ctx)
-        print(f"Step {index}")
-        print("Input:", ctx)
-        print("Adaptation Summary:", result["adaptation_summary"])
-        print("Adaptation Confidence:", result.get("adaptation", {}).get("confidence"))
-        print("Recommendations:")
-        print(json.dumps(result.get("recommendations", []), indent=2, default=str))
-        print("Processed Context:")
-        print(json.dumps(result["processed_context"], indent=2, default=str))
-        print("Reflection:", result["reflection"])
-        print("Meta-state:")
-        print(json.dumps(result["meta_state"], indent=2, default=str))
-        print("---")
-
-    if save_state:
-        agent.save_state(save_state)
-        print(f"State saved to {save_state}")
-
-
-def summarize_results(results: List[dict]) -> dict:
-    """Build a compact summary from a list of process results."""
-
-    if not results:
         return {
-            "total_steps": 0,
-            "last_adaptation_summary": None,
-            "final_history_length": 0,
-            "average_confidence": 0.0,
+            "total_steps": self.total_steps,
+            "last_adaptation_summary": self.last_adaptation_summary,
+            "final_history_length": self.final_history_length,
+            "average_confidence": round(self.average_confidence, 4),
         }
 
-    last = results[-1]
-    confidence_values = [
-        item.get("adaptation", {}).get("confidence", 0.0)
-        for item in results
-        if item.get("adaptation")
-    ]
-    average_confidence = (
-        sum(confidence_values) / len(confidence_values) if confidence_values else 0.0
-    )
 
-    return {
-        "total_steps": len(results),
-        "last_adaptation_summary": last.get("adaptation_summary"),
-        "final_history_length": last.get("meta_state", {}).get("history_length", 0),
-        "average_confidence": round(average_confidence, 4),
-    }
+def summarize_results(results: Iterable[dict]) -> dict:
+    """Build a compact summary from process results (any iterable)."""
+
+    summarizer = ResultSummarizer()
+    for result in results:
+        summarizer.add(result)
+    return summarizer.summary()
 
 
 def parse_context(raw_value: str) -> object:
@@ -102,6 +334,185 @@ def load_inputs_from_file(filepath: str) -> List[object]:
     raise ValueError("Input file must contain a JSON array or newline-delimited entries.")
 
 
+def iter_inputs_from_file(
+    filepath: str, *, chunk_size: int = 1 << 16, use_mmap: bool = False
+) -> Iterator[object]:
+    """Lazily yield contexts from a JSON array or newline-delimited file.
+
+    Unlike :func:`load_inputs_from_file`, nothing is materialized up front:
+    newline-delimited files are parsed one line at a time and JSON arrays are
+    decoded incrementally from ``chunk_size`` reads, so memory stays bounded
+    and the first context is available as soon as it has been read.  A lone
+    JSON value on a single line is treated as one newline-delimited entry,
+    and a first line that only looks like an array (``[INFO] started``)
+    means the file is newline-delimited, as in the eager loader.
+    """
+
+    with _open_input(filepath, use_mmap) as reader:
+        lines = _iter_lines(reader)
+        first = next(lines, None)
+        if first is None:
+            return
+
+        stripped = first.strip()
+        if stripped.startswith("["):
+            try:
+                parsed = json.loads(stripped)
+            except json.JSONDecodeError:
+                try:
+                    yield from _iter_json_array(first, reader, chunk_size)
+                except _NotAJSONArray:
+                    # Nothing was yielded yet: read the file as lines instead.
+                    reader.seek(0)
+                    for line in _iter_lines(reader):
+                        yield parse_context(line)
+                return
+            following = next(lines, None)
+            if following is None:
+                yield from parsed
+                return
+            yield parsed
+            yield parse_context(following)
+        elif stripped.startswith("{") and not _is_json(stripped):
+            raise ValueError("Input file must contain a JSON array or newline-delimited entries.")
+        else:
+            yield parse_context(first)
+
+        for line in lines:
+            yield parse_context(line)
+
+
+@contextmanager
+def _open_input(filepath: str, use_mmap: bool) -> Iterator[BinaryIO]:
+    with open(filepath, "rb") as handle:
+        if not use_mmap or Path(filepath).stat().st_size == 0:
+            yield handle
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _iter_lines(reader: BinaryIO) -> Iterator[str]:
+    """Yield non-blank lines without their line terminator."""
+
+    for raw_line in iter(reader.readline, b""):
+        line = raw_line.decode("utf-8").rstrip("\r\n")
+        if line.strip():
+            yield line
+
+
+def _is_json(raw_value: str) -> bool:
+    try:
+        json.loads(raw_value)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+class _NotAJSONArray(ValueError):
+    """The first line starts with ``[`` but is not the start of a JSON array."""
+
+
+def _iter_json_array(prefix: str, reader: BinaryIO, chunk_size: int) -> Iterator[object]:
+    """Incrementally decode the elements of a JSON array split across reads.
+
+    JSON strings and scalars cannot span a newline, so a syntax error on the
+    first line is never a matter of not having read enough; it means the
+    line merely looks like an array (``[INFO] started``).  Values parsed on
+    the first line are therefore held back until the parser moves past it,
+    and such an error raises :class:`_NotAJSONArray` before anything is
+    yielded.
+    """
+
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = prefix.lstrip()[1:] + "\n"
+    first_line_end = len(buffer) - 1
+    base = 0  # offset of buffer[0] from the start of the array body
+    position = 0
+    exhausted = False
+    expecting_value = True
+    held: List[object] = []
+    released = False
+
+    def refill() -> bool:
+        nonlocal buffer, position, exhausted, base
+        if exhausted:
+            return False
+        chunk = reader.read(chunk_size)
+        base += position
+        if not chunk:
+            exhausted = True
+            buffer = buffer[position:] + text_decoder.decode(b"", final=True)
+        else:
+            buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+        return True
+
+    def skip_whitespace() -> str | None:
+        nonlocal position
+        while True:
+            position = _JSON_WHITESPACE.match(buffer, position).end()
+            if position < len(buffer):
+                return buffer[position]
+            if not refill():
+                return None
+
+    def fail(message: str, at: int) -> ValueError:
+        if not released and base + at < first_line_end:
+            return _NotAJSONArray(message)
+        return ValueError(message)
+
+    yielded = False
+    while True:
+        token = skip_whitespace()
+        if token is None:
+            raise ValueError("Unterminated JSON array in input file.")
+        if token == "]" and not (expecting_value and yielded):
+            position += 1
+            break
+        if token == ",":
+            if expecting_value:
+                raise fail("Invalid JSON array in input file: unexpected ','", position)
+            position += 1
+            expecting_value = True
+            continue
+        if not expecting_value:
+            raise fail("Invalid JSON array in input file: expected ',' or ']'", position)
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            if base + error.pos < first_line_end:
+                raise fail(f"Invalid JSON array in input file: {error.msg}", error.pos) from error
+            if refill():
+                continue
+            raise ValueError(f"Invalid JSON array in input file: {error.msg}") from error
+        if (
+            end == len(buffer)
+            or (
+                type(value) in (int, float)
+                and buffer[end] in _NUMBER_CONTINUATION
+                and not exhausted
+            )
+        ) and refill():
+            continue
+        position = end
+        expecting_value = False
+        yielded = True
+        if not released and base + position <= first_line_end:
+            held.append(value)
+            continue
+        released = True
+        yield from held
+        held.clear()
+        yield value
+
+    if skip_whitespace() is not None:
+        raise fail("Unexpected data after JSON array in input file.", position)
+    yield from held
+
+
 def run_interactive() -> None:
     agent = AdaptiveAgent()
     print("Interactive Mode. Type input or commands (/save <file>, /load <file>, /quit)")
@@ -155,23 +566,78 @@ def build_parser() -> argparse.ArgumentParser:
         "--input-file",
         help="Path to a file containing demo contexts (JSON array or newline-delimited entries)",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read --input-file lazily instead of loading it fully before processing",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Stream --input-file through a memory map (implies --stream)",
+    )
     parser.add_argument(
         "--save-state",
         help="Optional path to save final state after demo mode completes",
     )
+    parser.add_argument(
+        "--timeline",
+        help="Optional path to save a checkpoint index for replay.py after demo mode completes",
+    )
+    parser.add_argument(
+        "--timeline-interval",
+        type=int,
+        default=1000,
+        help="Contexts between checkpoints recorded for --timeline (default: 1000)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes; output and saved state match the serial run",
+    )
+    parser.add_argument(
+        "--stream-key",
+        help="Route mapping contexts to independent per-stream agents by this field",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Report progress and throughput on stderr",
+    )
+    parser.add_argument(
+        "--output",
+        help="Write per-step results to this file (.ndjson, .csv) or .npy column directory",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=sorted(WRITERS),
+        help="Format for --output (default: inferred from the path)",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Print only the final summary instead of every step",
+    )
     return parser
 
 
 def main(argv: list[str] | None = None) -> None:
     parser = build_parser()
     args = parser.parse_args(argv)
+    if args.stream_key is not None and args.timeline:
+        parser.error("--timeline cannot be combined with --stream-key")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be positive")
 
     if args.interactive:
         run_interactive()
         return
 
     if args.input_file:
-        demo_inputs = load_inputs_from_file(args.input_file)
+        if args.stream or args.mmap:
+            demo_inputs = iter_inputs_from_file(args.input_file, use_mmap=args.mmap)
+        else:
+            demo_inputs = load_inputs_from_file(args.input_file)
     else:
         demo_inputs = [
             "First context",
@@ -180,7 +646,18 @@ def main(argv: list[str] | None = None) -> None:
             {"signal": 42, "status": "stable"},
             7,
         ]
-    run_demo(demo_inputs, save_state=args.save_state)
+    run_demo(
+        demo_inputs,
+        save_state=args.save_state,
+        timeline=args.timeline,
+        timeline_interval=args.timeline_interval,
+        workers=args.workers,
+        stream_key=args.stream_key,
+        progress=args.progress,
+        output=args.output,
+        output_format=args.output_format,
+        quiet=args.quiet,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,430 @@
+"""Bounded-memory streaming summaries for very large sequences.
+
+A :class:`StreamProfile` consumes a sequence chunk by chunk and keeps
+
+* :class:`RunningMoments` -- count, mean and standard deviation (Welford,
+  merged per chunk with Chan's update),
+* :class:`HyperLogLog` -- distinct-value estimate,
+* :class:`FrequencySketch` -- exact value counts up to a capacity, then
+  count-min heavy hitters plus a bottom-k value sample for entropy,
+* :class:`QuantileDigest` -- a merging t-digest-style quantile summary.
+
+Every structure is vectorized over chunks, so memory is bounded by
+:class:`SketchConfig` rather than by the sequence length.
+:class:`ChunkedSequence` wraps an iterator of chunks (for example, one read
+from disk) as a context the agent profiles in a single pass.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+_NUMERIC_KINDS = "biuf"
+
+
+@lru_cache(maxsize=65536)
+def token_hash(token: str) -> int:
+    """Stable 64-bit hash of a string (independent of ``PYTHONHASHSEED``)."""
+
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+
+
+def mix64(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer: spread each 64-bit value over all output bits."""
+
+    mixed = values.astype(np.uint64, copy=True)
+    mixed ^= mixed >> np.uint64(30)
+    mixed *= np.uint64(0xBF58476D1CE4E5B9)
+    mixed ^= mixed >> np.uint64(27)
+    mixed *= np.uint64(0x94D049BB133111EB)
+    mixed ^= mixed >> np.uint64(31)
+    return mixed
+
+
+@dataclass(frozen=True)
+class SketchConfig:
+    """Error bounds and memory caps for approximate sequence statistics.
+
+    ``distinct_error`` is the relative standard error of the distinct count
+    (HyperLogLog with ``2**p`` one-byte registers).  Values are counted
+    exactly until ``capacity`` distinct values have been seen; beyond that a
+    count-min sketch over-counts any value by at most ``frequency_error``
+    times the total with probability ``frequency_confidence``, and the
+    ``capacity`` most frequent values are tracked as heavy hitters.
+    ``compression`` bounds the quantile digest to about ``compression / 2``
+    centroids.  In-memory sequences are only sketched from ``min_length``
+    elements up, and are fed ``chunk_size`` elements at a time.
+    """
+
+    distinct_error: float = 0.01
+    frequency_error: float = 0.0005
+    frequency_confidence: float = 0.99
+    capacity: int = 16384
+    compression: int = 200
+    min_length: int = 1 << 18
+    chunk_size: int = 1 << 16
+
+    def __post_init__(self) -> None:
+        if not 0 < self.distinct_error < 1 or not 0 < self.frequency_error < 1:
+            raise ValueError("error bounds must be between 0 and 1")
+        if not 0 < self.frequency_confidence < 1:
+            raise ValueError("frequency_confidence must be between 0 and 1")
+        if self.capacity < 1 or self.compression < 10 or self.chunk_size < 1 or self.min_length < 1:
+            raise ValueError("capacity, compression, chunk_size and min_length must be positive")
+
+
+class RunningMoments:
+    """Single-pass count, mean and population standard deviation."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, values: np.ndarray) -> None:
+        size = values.size
+        if not size:
+            return
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(np.square(values - chunk_mean).sum())
+        total = self.count + size
+        delta = chunk_mean - self.mean
+        self.mean += delta * size / total
+        self._m2 += chunk_m2 + delta * delta * self.count * size / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / self.count) if self.count else 0.0
+
+
+class HyperLogLog:
+    """Distinct-count estimate from 64-bit hashes."""
+
+    def __init__(self, relative_error: float = 0.01) -> None:
+        self.precision = min(18, max(4, math.ceil(math.log2((1.04 / relative_error) ** 2))))
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray) -> None:
+        if not hashes.size:
+            return
+        precision = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - precision)).astype(np.intp)
+        # The sentinel bit caps the rank at 64 - p + 1 and keeps the word non-zero.
+        rest = (hashes << precision) | (np.uint64(1) << (precision - np.uint64(1)))
+        np.maximum.at(self.registers, index, (_leading_zeros(rest) + 1).astype(np.uint8))
+
+    def estimate(self) -> float:
+        registers = self.registers
+        size = registers.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        raw = alpha * size * size / float(np.ldexp(1.0, -registers.astype(np.int64)).sum())
+        zeros = int(np.count_nonzero(registers == 0))
+        if raw <= 2.5 * size and zeros:
+            return size * math.log(size / zeros)
+        return raw
+
+
+class FrequencySketch:
+    """Value frequencies for entropy: exact up to ``capacity`` values, then sketched.
+
+    Two structures share the work once more than ``capacity`` distinct values
+    have been seen:
+
+    * a count-min sketch finds the heavy hitters (values holding more than
+      ``epsilon`` of the stream) and estimates their counts, debiased by each
+      row's expected collision noise (count-mean-min);
+    * a bottom-``capacity`` sample keeps the values with the smallest hashes,
+      a uniform sample of the distinct values.  The cut-off only ever falls,
+      so every sampled value has been counted exactly since it first appeared.
+
+    The heavy hitters contribute their own entropy terms; the remaining mass
+    uses the sample's average ``count * log(count)`` per occurrence.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 16384,
+        *,
+        epsilon: float = 0.0005,
+        confidence: float = 0.99,
+    ) -> None:
+        self.capacity = capacity
+        self.epsilon = epsilon
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / (1 - confidence)))
+        self.total = 0
+        self._sample_keys = np.empty(0, dtype=np.uint64)
+        self._sample_counts = np.empty(0, dtype=np.int64)
+        self._heavy = np.empty(0, dtype=np.uint64)
+        self._table: Optional[np.ndarray] = None
+        self._seeds = mix64(np.arange(1, self.depth + 1, dtype=np.uint64))
+
+    @property
+    def exact(self) -> bool:
+        """Whether every distinct value seen so far is counted exactly."""
+
+        return self._table is None
+
+    @property
+    def sampled(self) -> int:
+        return int(self._sample_keys.size)
+
+    def add(self, hashes: np.ndarray) -> None:
+        if not hashes.size:
+            return
+        keys, counts = np.unique(hashes, return_counts=True)
+        self.total += int(hashes.size)
+        self._sample(keys, counts)
+        if self._table is not None:
+            columns = self._columns(keys)
+            self._table_add(columns, counts)
+            self._track_heavy(keys, columns)
+
+    def entropy(self) -> float:
+        """Shannon entropy of the value distribution, in bits."""
+
+        if not self.total:
+            return 0.0
+        keys, counts = self._sample_keys, self._sample_counts.astype(np.float64)
+        if self._table is None:
+            return _entropy_bits(counts, self.total)
+
+        heavy_counts = self._estimate(self._columns(self._heavy))
+        heavy = heavy_counts > self.epsilon * self.total
+        heavy_keys, heavy_counts = self._heavy[heavy], heavy_counts[heavy]
+        plogp = float((heavy_counts * np.log2(heavy_counts)).sum())
+        tail_mass = max(0.0, self.total - float(heavy_counts.sum()))
+        tail = counts[~np.isin(keys, heavy_keys, assume_unique=True)]
+        if tail_mass and tail.size:
+            plogp += tail_mass * float((tail * np.log2(tail)).sum() / tail.sum())
+        return max(0.0, math.log2(self.total) - plogp / self.total)
+
+    def _sample(self, keys: np.ndarray, counts: np.ndarray) -> None:
+        if self._table is not None:
+            # Values above the cut-off can never enter the sample again.
+            kept = keys <= self._sample_keys[-1]
+            keys, counts = keys[kept], counts[kept]
+        merged = np.concatenate([self._sample_keys, keys])
+        order = np.argsort(merged, kind="stable")
+        merged = merged[order]
+        starts = np.flatnonzero(np.concatenate([[True], merged[1:] != merged[:-1]]))
+        weights = np.add.reduceat(np.concatenate([self._sample_counts, counts])[order], starts)
+        merged = merged[starts]
+        if merged.size > self.capacity:
+            if self._table is None:
+                self._spill()
+            merged, weights = merged[:self.capacity], weights[:self.capacity]
+        self._sample_keys, self._sample_counts = merged, weights
+
+    def _spill(self) -> None:
+        # Switch to sketching: everything counted so far seeds the count-min table.
+        self._table = np.zeros((self.depth, self.width), dtype=np.int64)
+        keys, counts = self._sample_keys, self._sample_counts
+        self._table_add(self._columns(keys), counts)
+        self._heavy = keys[counts > self.epsilon * self.total]
+
+    def _columns(self, keys: np.ndarray) -> np.ndarray:
+        return (mix64(keys[None, :] ^ self._seeds[:, None]) % np.uint64(self.width)).astype(np.intp)
+
+    def _table_add(self, columns: np.ndarray, counts: np.ndarray) -> None:
+        for row, row_columns in enumerate(columns):
+            self._table[row] += np.bincount(row_columns, weights=counts, minlength=self.width).astype(np.int64)
+
+    def _estimate(self, columns: np.ndarray) -> np.ndarray:
+        raw = self._table[np.arange(self.depth)[:, None], columns].astype(np.float64)
+        debiased = np.median(raw - (self.total - raw) / (self.width - 1), axis=0)
+        return np.clip(debiased, 0.0, raw.min(axis=0))
+
+    def _track_heavy(self, keys: np.ndarray, columns: np.ndarray) -> None:
+        threshold = self.epsilon * self.total
+        upper = self._table[np.arange(self.depth)[:, None], columns].min(axis=0)
+        candidates = np.union1d(self._heavy, keys[upper > threshold])
+        if candidates.size > 2 * self.width:
+            # At most 1 / epsilon values can truly exceed the threshold; drop the rest.
+            candidates = candidates[self._estimate(self._columns(candidates)) > threshold]
+        self._heavy = candidates
+
+
+class QuantileDigest:
+    """Merging digest of centroids, finer towards both tails (t-digest ``k1`` scale)."""
+
+    def __init__(self, compression: int = 200) -> None:
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return
+        self.count += int(values.size)
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        # Both inputs are sorted runs, which the stable sort merges in linear time.
+        means = np.concatenate([self.means, np.sort(values)])
+        weights = np.concatenate([self.weights, np.ones(values.size)])
+        order = np.argsort(means, kind="stable")
+        self.means, self.weights = self._compress(means[order], weights[order])
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        cumulative = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], cumulative, [float(self.count)]])
+        means = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        return float(np.interp(q * self.count, positions, means))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        total = weights.sum()
+        midpoints = (np.cumsum(weights) - weights / 2) / total
+        scale = self.compression / (2 * math.pi)
+        clusters = np.floor(scale * (np.arcsin(2 * midpoints - 1) + math.pi / 2)).astype(np.int64)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(clusters)) + 1])
+        merged_weights = np.add.reduceat(weights, starts)
+        merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+        return merged_means, merged_weights
+
+
+class StreamProfile:
+    """Approximate sequence statistics accumulated chunk by chunk."""
+
+    QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+
+    def __init__(self, config: Optional[SketchConfig] = None) -> None:
+        self.config = config or SketchConfig()
+        self.length = 0
+        self.numeric = True
+        self.moments = RunningMoments()
+        self.distinct = HyperLogLog(self.config.distinct_error)
+        self.frequencies = FrequencySketch(
+            self.config.capacity,
+            epsilon=self.config.frequency_error,
+            confidence=self.config.frequency_confidence,
+        )
+        self.digest = QuantileDigest(self.config.compression)
+
+    def add(self, chunk: Any) -> None:
+        """Fold one chunk (ndarray, buffer or iterable of items) into the profile."""
+
+        values = _numeric_values(chunk)
+        if values is None:
+            items = list(chunk)
+            self.numeric = False
+            hashes = np.fromiter((token_hash(repr(item)) for item in items), dtype=np.uint64, count=len(items))
+        else:
+            if self.numeric:
+                self.moments.add(values)
+                self.digest.add(values)
+            hashes = mix64(values.view(np.uint64))
+        self.length += int(hashes.size)
+        self.distinct.add(hashes)
+        self.frequencies.add(hashes)
+
+    def add_all(self, sequence: Any) -> "StreamProfile":
+        """Feed an in-memory sequence in ``config.chunk_size`` slices."""
+
+        size = self.config.chunk_size
+        if isinstance(sequence, np.ndarray) or hasattr(sequence, "__getitem__"):
+            for start in range(0, len(sequence), size):
+                self.add(sequence[start:start + size])
+        else:
+            iterator = iter(sequence)
+            while True:
+                chunk = list(islice(iterator, size))
+                if not chunk:
+                    break
+                self.add(chunk)
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        distinct = self.distinct_estimate()
+        numeric = self.numeric and self.length > 0
+        return {
+            "length": self.length,
+            "mean": self.moments.mean if numeric else None,
+            "standard_deviation": self.moments.std if numeric else None,
+            "entropy": self.frequencies.entropy(),
+            "distinct_estimate": distinct,
+            "quantiles": {
+                f"p{round(q * 100):02d}": self.digest.quantile(q) for q in self.QUANTILES
+            } if numeric else None,
+        }
+
+    def distinct_estimate(self) -> int:
+        if self.frequencies.exact:
+            return self.frequencies.sampled
+        return int(round(self.distinct.estimate()))
+
+
+class ChunkedSequence:
+    """A sequence delivered as an iterator of chunks and profiled in one pass.
+
+    The chunks are consumed the first time the profile (or the length) is
+    needed and are not retained, so the sequence may be far larger than
+    memory.  Afterwards the object only holds its :class:`StreamProfile`,
+    which is what gets pickled into snapshots.
+    """
+
+    def __init__(self, chunks: Iterable[Any], config: Optional[SketchConfig] = None) -> None:
+        self._chunks: Optional[Iterator[Any]] = iter(chunks)
+        self._profile = StreamProfile(config)
+
+    def profile(self) -> StreamProfile:
+        if self._chunks is not None:
+            for chunk in self._chunks:
+                self._profile.add(chunk)
+            self._chunks = None
+        return self._profile
+
+    def __len__(self) -> int:
+        return self.profile().length
+
+    def __repr__(self) -> str:
+        if self._chunks is not None:
+            return f"{type(self).__name__}(pending)"
+        return f"{type(self).__name__}(length={self._profile.length}, distinct~{self._profile.distinct_estimate()})"
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_chunks": None, "_profile": self.profile()}
+
+
+def _numeric_values(chunk: Any) -> Optional[np.ndarray]:
+    """Return ``chunk`` as a float64 array, or ``None`` if it is not numeric."""
+
+    if isinstance(chunk, (list, tuple)):
+        element_types = set(map(type, chunk))
+        if not element_types <= {int, float}:
+            return None
+    elif not isinstance(chunk, (np.ndarray, memoryview)) and not hasattr(chunk, "typecode"):
+        return None
+    values = np.asarray(chunk)
+    if values.dtype.kind not in _NUMERIC_KINDS or values.dtype.kind == "b":
+        return None
+    return np.ascontiguousarray(values, dtype=np.float64).ravel()
+
+
+def _leading_zeros(words: np.ndarray) -> np.ndarray:
+    """Count leading zero bits of non-zero uint64 values."""
+
+    high = (words >> np.uint64(32)).astype(np.float64)
+    low = (words & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    with np.errstate(divide="ignore"):
+        high_bits = np.floor(np.log2(high))
+        low_bits = np.floor(np.log2(low))
+    return np.where(high > 0, 31 - high_bits, 63 - low_bits).astype(np.int64)
+
+
+def _entropy_bits(counts: np.ndarray, total: int) -> float:
+    probabilities = counts / total
+    return float(-(probabilities * np.log2(probabilities)).sum())
@@ -0,0 +1,298 @@
+"""Compact binary snapshots of the introspective state.
+
+Layout (little-endian; record lengths are ``uint32``, all else ``uint64``)::
+
+    MAGIC | eager_length | eager pickle
+          | (record_length | tag | payload) * count
+          | offsets[count] | count | offsets_position
+
+The eager section holds every rolling-window field of
+:meth:`IntrospectiveState.to_dict` and is decoded on load.  History entries
+are stored as individual length-prefixed records: strings as UTF-8, arrays and
+homogeneous int/float lists as raw buffers (ints in the narrowest width that
+fits), anything else pickled.  An entry whose content (by
+:func:`cache.content_key`) matches an earlier one is written as a reference
+record holding that record's index, so repeated contexts are stored once.
+Loading memory-maps the file and wraps the records in
+:class:`SnapshotHistory`, which decodes an entry only when it is accessed.
+Every map holds a file descriptor, so at most :data:`MAX_OPEN_MAPS` stay
+open: beyond that the least recently loaded history copies its records into
+memory and drops its map.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import mmap
+import os
+import pickle
+import struct
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+import numpy as np
+
+if __package__:
+    from .cache import content_key
+else:
+    from cache import content_key
+
+MAGIC = b"ACFSNAP\x01"
+SNAPSHOT_SUFFIXES = (".snap",)
+
+_U64 = struct.Struct("<Q")
+_RECORD_LENGTH = struct.Struct("<I")
+_FOOTER = struct.Struct("<QQ")
+_TAG_TEXT = b"S"
+_TAG_ARRAY = b"A"
+_TAG_INT_LIST = b"I"
+_TAG_FLOAT_LIST = b"F"
+_TAG_PICKLE = b"P"
+_TAG_REFERENCE = b"R"
+
+# Snapshot histories allowed to keep their file mapped at the same time.
+MAX_OPEN_MAPS = 64
+_open_maps: "OrderedDict[int, weakref.ref]" = OrderedDict()
+_open_maps_lock = threading.Lock()
+_map_ids = itertools.count()
+
+
+def is_snapshot(filepath: str | os.PathLike) -> bool:
+    """Return whether ``filepath`` starts with the binary snapshot magic."""
+
+    try:
+        with open(filepath, "rb") as handle:
+            return handle.read(len(MAGIC)) == MAGIC
+    except (IsADirectoryError, FileNotFoundError):
+        return False
+
+
+def write_snapshot(filepath: str | os.PathLike, state) -> None:
+    """Write ``state`` to ``filepath`` atomically.
+
+    The file is written next to the target and moved into place, so a
+    snapshot that is currently memory-mapped (for example the one the state
+    was loaded from) stays readable while it is being replaced.
+    """
+
+    target = Path(filepath)
+    temporary = target.with_name(target.name + ".tmp")
+    eager = dumps(state.to_dict(include_history=False))
+
+    offsets: List[int] = []
+    first_records: Dict[bytes, int] = {}
+    with open(temporary, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(_U64.pack(len(eager)))
+        handle.write(eager)
+        position = len(MAGIC) + _U64.size + len(eager)
+        for index, context in enumerate(state.history):
+            key = content_key(context)
+            first = first_records.setdefault(key, index) if key is not None else index
+            if first != index:
+                tag, payload = _TAG_REFERENCE, _U64.pack(first)
+            else:
+                tag, payload = _encode(context)
+            offsets.append(position)
+            handle.write(_RECORD_LENGTH.pack(len(payload) + 1))
+            handle.write(tag)
+            handle.write(payload)
+            position += _RECORD_LENGTH.size + 1 + len(payload)
+        handle.write(np.asarray(offsets, dtype="<u8").tobytes())
+        handle.write(_FOOTER.pack(len(offsets), position))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, target)
+
+
+def read_snapshot(filepath: str | os.PathLike) -> Dict[str, Any]:
+    """Map ``filepath`` and return a state dict with a lazy ``history``."""
+
+    with open(filepath, "rb") as handle:
+        view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if view[: len(MAGIC)] != MAGIC:
+        view.close()
+        raise ValueError(f"{filepath} is not an adaptive agent snapshot")
+
+    (eager_length,) = _U64.unpack_from(view, len(MAGIC))
+    eager_start = len(MAGIC) + _U64.size
+    data = pickle.loads(view[eager_start:eager_start + eager_length])
+    count, offsets_position = _FOOTER.unpack_from(view, len(view) - _FOOTER.size)
+    offsets = np.frombuffer(view, dtype="<u8", count=count, offset=offsets_position)
+    history = SnapshotHistory(view, offsets)
+    _track_map(history)
+    data["history"] = history
+    return data
+
+
+def _track_map(history: "SnapshotHistory") -> None:
+    """Register a newly mapped history, detaching the oldest beyond the limit."""
+
+    map_id = next(_map_ids)
+    with _open_maps_lock:
+        _open_maps[map_id] = weakref.ref(history, lambda _, map_id=map_id: _open_maps.pop(map_id, None))
+        evicted = []
+        while len(_open_maps) > MAX_OPEN_MAPS:
+            evicted.append(_open_maps.popitem(last=False)[1]())
+    for oldest in evicted:
+        if oldest is not None:
+            oldest.detach()
+
+
+class SnapshotHistory(Sequence):
+    """History backed by snapshot records, decoded on access.
+
+    Contexts observed after loading are kept in an in-memory tail, so the
+    object can serve as the live ``IntrospectiveState.history``.
+    """
+
+    # Stored records and tail entries never move, so frozen views of a
+    # prefix stay valid while the agent appends (see ``history.HistoryPrefix``).
+    STABLE_PREFIX = True
+    # Loaded rather than owned: the next load replaces it (see ``history.restore_history``).
+    ADOPTED = True
+
+    def __init__(self, view: mmap.mmap | bytes, offsets: np.ndarray) -> None:
+        self._view = view
+        self._offsets = offsets
+        self._tail: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._offsets) + len(self._tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+
+        stored = len(self._offsets)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        if index >= stored:
+            return self._tail[index - stored]
+
+        view = self._view
+        start = int(self._offsets[index])
+        (length,) = _RECORD_LENGTH.unpack_from(view, start)
+        body = start + _RECORD_LENGTH.size
+        tag = view[body:body + 1]
+        if tag == _TAG_REFERENCE:
+            (first,) = _U64.unpack_from(view, body + 1)
+            return self[first]
+        return _decode(tag, view, body + 1, length - 1)
+
+    def detach(self) -> None:
+        """Copy the records into memory and release the file map.
+
+        Decoding works on the copy exactly as on the map.  The map itself is
+        closed once no reader holds it any more, which frees its descriptor.
+        """
+
+        view = self._view
+        if not isinstance(view, mmap.mmap):
+            return
+        self._view = bytes(view)
+        self._offsets = self._offsets.copy()
+
+    def distinct_records(self) -> int:
+        """Number of stored records holding a payload rather than a reference."""
+
+        view = self._view
+        tags = (view[int(offset) + _RECORD_LENGTH.size] for offset in self._offsets)
+        return sum(tag != _TAG_REFERENCE[0] for tag in tags)
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self._offsets)):
+            yield self[index]
+        yield from list(self._tail)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(len={len(self)})"
+
+    def append(self, context: Any) -> None:
+        self._tail.append(context)
+
+    def extend(self, contexts: Iterable[Any]) -> None:
+        self._tail.extend(contexts)
+
+    def clear(self) -> None:
+        self._offsets = self._offsets[:0]
+        self._tail.clear()
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Pickler that stores memoryviews (which cannot be pickled) as arrays."""
+
+    def reducer_override(self, obj):
+        if type(obj) is memoryview:
+            return np.array(obj).__reduce__()
+        return NotImplemented
+
+
+def dumps(value: Any) -> bytes:
+    """Pickle ``value``, storing memoryviews (which cannot be pickled) as arrays."""
+
+    buffer = io.BytesIO()
+    _SnapshotPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+    return buffer.getvalue()
+
+
+def _encode(context: Any) -> tuple:
+    if type(context) is str:
+        return _TAG_TEXT, context.encode("utf-8", "surrogatepass")
+
+    if type(context) is memoryview:
+        context = np.asarray(context)
+
+    if isinstance(context, np.ndarray) and context.dtype.kind in "biufc":
+        array = np.ascontiguousarray(context)
+        dtype = array.dtype.str.encode("ascii")
+        header = struct.pack(f"<B{len(dtype)}sB{array.ndim}Q", len(dtype), dtype, array.ndim, *array.shape)
+        return _TAG_ARRAY, header + array.tobytes()
+
+    if type(context) is list and context:
+        if all(type(item) is float for item in context):
+            return _TAG_FLOAT_LIST, np.asarray(context, dtype="<f8").tobytes()
+        if all(type(item) is int for item in context):
+            try:
+                values = np.asarray(context, dtype="<i8")
+            except OverflowError:
+                values = None
+            if values is not None:
+                low, high = int(values.min()), int(values.max())
+                for dtype in ("<i1", "<i2", "<i4", "<i8"):
+                    limits = np.iinfo(dtype)
+                    if limits.min <= low and high <= limits.max:
+                        break
+                width = np.dtype(dtype).itemsize
+                return _TAG_INT_LIST, bytes([width]) + values.astype(dtype).tobytes()
+
+    return _TAG_PICKLE, dumps(context)
+
+
+def _decode(tag: bytes, view: mmap.mmap | bytes, start: int, length: int) -> Any:
+    if tag == _TAG_TEXT:
+        return view[start:start + length].decode("utf-8", "surrogatepass")
+    if tag == _TAG_FLOAT_LIST:
+        return np.frombuffer(view, dtype="<f8", count=length // 8, offset=start).tolist()
+    if tag == _TAG_INT_LIST:
+        width = view[start]
+        dtype = f"<i{width}"
+        return np.frombuffer(view, dtype=dtype, count=(length - 1) // width, offset=start + 1).tolist()
+    if tag == _TAG_ARRAY:
+        dtype_length = view[start]
+        dtype = view[start + 1:start + 1 + dtype_length].decode("ascii")
+        ndim = view[start + 1 + dtype_length]
+        shape_start = start + 2 + dtype_length
+        shape = struct.unpack_from(f"<{ndim}Q", view, shape_start)
+        data_start = shape_start + 8 * ndim
+        count = int(np.prod(shape, dtype=np.int64))
+        return np.frombuffer(view, dtype=dtype, count=count, offset=data_start).reshape(shape).copy()
+    return pickle.loads(view[start:start + length])
@@ -1,8 +1,11 @@
 import importlib.util
 import json
+import math
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 PACKAGE_NAME = "adaptive_cognitive_framework"
 
@@ -128,3 +131,155 @@ def test_meta_state_tracks_novelty_and_dominant_type():
     assert meta_state["dominant_context_type"] == "text"
     assert meta_state["recent_context_novelty"] == 0.0
     assert meta_state["observation_log"][-1]["descriptor"] == "text"
+
+
+def test_process_batch_matches_sequential_processing():
+    contexts = [
+        "status is stable and clear",
+        3,
+        -1.5,
+        [1, 2, 3, 4],
+        [4, 3, 2, 1],
+        [0.5, 1.5, 2.5, 3.5],
+        (1, 2.5),
+        [],
+        ["a", None, 1],
+        {"signal": 42, "status": ""},
+        True,
+        None,
+        "status is stable and clear",
+        [2**70, 1],
+        7,
+    ]
+
+    batch_results = AdaptiveAgent().process_batch(contexts)
+    sequential_agent = AdaptiveAgent()
+    sequential_results = [sequential_agent.process(ctx) for ctx in contexts]
+
+    assert json.dumps(batch_results, default=str) == json.dumps(sequential_results, default=str)
+
+
+def test_process_batch_with_executors_matches_sequential_processing():
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    contexts = [
+        f"entry {index} looks stable" if index % 4 == 0 else
+        [index, index * 2, index % 3] if index % 4 == 1 else
+        {"id": index, "note": "" if index % 2 else "ok"} if index % 4 == 2 else
+        index / 7
+        for index in range(60)
+    ]
+    sequential_agent = AdaptiveAgent()
+    expected = json.dumps([sequential_agent.process(ctx) for ctx in contexts], default=str)
+
+    with ThreadPoolExecutor(max_workers=2) as threads:
+        threaded = AdaptiveAgent().process_batch(contexts, executor=threads, chunk_size=7)
+    with ProcessPoolExecutor(max_workers=2) as processes:
+        forked = AdaptiveAgent().process_batch(contexts, executor=processes, chunk_size=16)
+
+    assert json.dumps(threaded, default=str) == expected
+    assert json.dumps(forked, default=str) == expected
+
+
+def test_process_field_projection():
+    full_agent = AdaptiveAgent()
+    projected_agent = AdaptiveAgent()
+    contexts = ["a clear and stable signal", [3, 1, 2], {"k": None}]
+
+    for ctx in contexts:
+        full = full_agent.process(ctx)
+        projected = projected_agent.process(ctx, fields=("confidence", "recommendations"))
+        assert list(projected) == ["recommendations", "confidence"]
+        assert projected["recommendations"] == full["recommendations"]
+        assert projected["confidence"] == full["adaptation"]["confidence"]
+
+    assert projected_agent.state.report() == full_agent.state.report()
+
+    batch = AdaptiveAgent().process_batch(contexts, fields=["processed_context"])
+    assert batch[0]["processed_context"]["reversed"] == contexts[0][::-1]
+
+    with pytest.raises(ValueError):
+        AdaptiveAgent().process("x", fields=["nope"])
+
+
+def test_incremental_report_matches_full_recomputation():
+    import random
+    from statistics import mean
+
+    agent = AdaptiveAgent()
+    rng = random.Random(3)
+    for _ in range(200):
+        agent.process(rng.choice(["text", [1, 2], {"a": 1}, 2.5, None]))
+        state = agent.state
+        assert state.valence_trend() == mean(state.valence_trace)
+        non_zero = {key: value for key, value in state.context_stats.items() if value > 0}
+        assert state.dominant_context_type() == max(non_zero, key=non_zero.get)
+
+    state = agent.state
+    state.load_from_dict({"valence_trace": [1, 2], "context_stats": {"mapping": 2, "text": 2}})
+    assert state.valence_trend() == mean([1, 2])
+    assert state.dominant_context_type() == "text"
+
+
+def test_buffer_contexts_are_profiled_in_place():
+    from array import array
+
+    import numpy as np
+
+    values = np.random.default_rng(0).integers(0, 40, 5000)
+    agent = AdaptiveAgent()
+    as_list = agent.process(values.tolist())["processed_context"]
+
+    for context in (values, array("q", values.tolist()), memoryview(values)):
+        result = agent.process(context)
+        details = result["processed_context"]
+        assert result["meta_state"]["recent_context_descriptor"] == "sequence"
+        for key in ("length", "mean", "standard_deviation", "entropy"):
+            assert details[key] == as_list[key]
+        assert list(details["reversed"]) == as_list["reversed"]
+
+    constant = np.full(16, 3)
+    for context in (constant.tolist(), constant, array("q", constant.tolist()), memoryview(constant)):
+        entropy = agent.process(context)["processed_context"]["entropy"]
+        assert entropy == 0.0 and math.copysign(1.0, entropy) == 1.0
+
+    assert agent.process(values)["processed_context"]["reversed"].base is values
+    assert agent.state.history[-1] is values
+    assert agent.get_state_snapshot()["history"][-1] is values
+
+
+def test_snapshots_and_background_saves_are_consistent_during_processing(tmp_path):
+    import threading
+
+    agent = AdaptiveAgent()
+    stop = threading.Event()
+
+    def ingest():
+        step = 0
+        while not stop.is_set():
+            agent.process(["text", [step, step + 1], {"k": step}][step % 3])
+            step += 1
+
+    worker = threading.Thread(target=ingest)
+    worker.start()
+    try:
+        for _ in range(50):
+            snapshot = agent.get_state_snapshot()
+            history = snapshot["history"]
+            assert sum(snapshot["context_stats"].values()) == len(history)
+            if history:
+                assert snapshot["observation_log"][-1]["index"] == len(history)
+                assert snapshot["recent_contexts"] == history[-len(snapshot["recent_contexts"]):]
+
+        path = str(tmp_path / "state.snap")
+        frozen_length = len(agent.freeze_state().history)
+        future = agent.save_state(path, background=True)
+        future.result()
+    finally:
+        stop.set()
+        worker.join()
+
+    restored = AdaptiveAgent()
+    restored.load_state(path)
+    assert len(restored.state.history) >= frozen_length
+    assert sum(restored.state.context_stats.values()) == len(restored.state.history)
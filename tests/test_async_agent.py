@@ -0,0 +1,46 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from async_agent import AsyncAdaptiveAgent
+from core import AdaptiveAgent
+
+
+def test_concurrent_calls_are_coalesced_in_order():
+    contexts = [f"message {index}" if index % 3 else [index, index + 1] for index in range(40)]
+
+    async def scenario():
+        async with AsyncAdaptiveAgent(max_batch_size=16, max_latency=0.05) as front:
+            results = await asyncio.gather(*(front.process(ctx) for ctx in contexts))
+            return results, front.stats()
+
+    results, stats = asyncio.run(scenario())
+
+    sequential_agent = AdaptiveAgent()
+    expected = [sequential_agent.process(ctx) for ctx in contexts]
+    assert json.dumps(results, default=str) == json.dumps(expected, default=str)
+    assert stats["processed"] == len(contexts)
+    assert stats["largest_batch"] <= 16
+    assert stats["batches"] < len(contexts)
+
+
+def test_batch_failure_is_reported_to_callers():
+    class FailingAgent(AdaptiveAgent):
+        def process_batch(self, contexts):
+            raise RuntimeError("boom")
+
+    async def scenario():
+        front = AsyncAdaptiveAgent(FailingAgent(), max_latency=0)
+        try:
+            await front.process("anything")
+        finally:
+            await front.close()
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(scenario())
@@ -0,0 +1,45 @@
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from benchmarks import workloads
+from benchmarks.run import BenchmarkResult, compare, main, run_suite
+
+
+def test_workloads_are_deterministic():
+    assert workloads.mixed_stream(50, seed=3) == workloads.mixed_stream(50, seed=3)
+    assert len(workloads.large_sequence(1000)) == 1000
+    assert all(len(mapping) == 16 for mapping in workloads.wide_mappings(4, width=16))
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {"case": {"contexts_per_sec": 1000.0, "p50_ms": 1.0, "p99_ms": 2.0, "peak_kib": 100.0}}
+    faster = {"case": BenchmarkResult(contexts_per_sec=1500.0, p50_ms=0.5, p99_ms=1.0, peak_kib=90.0)}
+    slower = {"case": BenchmarkResult(contexts_per_sec=600.0, p50_ms=1.1, p99_ms=4.0, peak_kib=200.0)}
+
+    assert compare(faster, baseline, tolerance=0.2) == []
+    regressions = compare(slower, baseline, tolerance=0.2)
+    assert [line.split(":")[0] for line in regressions] == [
+        "case.contexts_per_sec",
+        "case.p99_ms",
+        "case.peak_kib",
+    ]
+
+
+def test_check_mode_fails_on_regression(tmp_path, capsys):
+    results = run_suite("quick", ["process_mixed"], rounds=1)
+    assert results["process_mixed"].contexts_per_sec > 0
+    assert results["process_mixed"].peak_kib > 0
+
+    baseline_path = tmp_path / "baseline.json"
+    assert main(["--case", "process_mixed", "--rounds", "1", "--baseline", str(baseline_path), "--update-baseline"]) == 0
+    baseline = json.loads(baseline_path.read_text())
+    baseline["profiles"]["quick"]["process_mixed"]["contexts_per_sec"] *= 100
+    baseline_path.write_text(json.dumps(baseline))
+
+    capsys.readouterr()
+    assert main(["--case", "process_mixed", "--rounds", "1", "--baseline", str(baseline_path), "--check"]) == 1
+    assert "process_mixed.contexts_per_sec" in capsys.readouterr().out
@@ -0,0 +1,68 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from cache import FeatureCache, content_key
+from core import AdaptiveAgent
+
+
+def test_content_key_distinguishes_types_and_order():
+    assert content_key("1") != content_key(1)
+    assert content_key(1) != content_key(1.0) != content_key(True)
+    assert content_key([1, 2]) != content_key((1, 2))
+    assert content_key({"a": 1, "b": 2}) != content_key({"b": 2, "a": 1})
+    assert content_key({"a": [1, "x"]}) == content_key({"a": [1, "x"]})
+    assert content_key(np.arange(3)) == content_key(np.arange(3))
+    assert content_key(np.arange(3)) != content_key(np.arange(3.0))
+    assert content_key({1, 2}) is None
+    assert content_key([object()]) is None
+
+
+def test_feature_cache_lru_counters():
+    cache = FeatureCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 1, "misses": 1, "evictions": 1}
+
+
+def test_cached_agent_matches_uncached_results():
+    contexts = ["status ok", {"mode": "auto", "level": ""}, [1, 2, 2], "status ok", 5, {1, 2}] * 3
+    plain_agent = AdaptiveAgent()
+    cached_agent = AdaptiveAgent(feature_cache_size=16)
+
+    expected = [plain_agent.process(ctx) for ctx in contexts]
+    single = [cached_agent.process(ctx) for ctx in contexts[:6]]
+    batch = cached_agent.process_batch(contexts[6:])
+    assert json.dumps(single + batch, default=str) == json.dumps(expected, default=str)
+
+    stats = cached_agent.feature_cache.stats()
+    assert stats["hits"] >= 10
+    assert stats["size"] == 4
+
+    # Results never alias cached containers.
+    batch[2]["processed_context"]["reversed"].append("mutated")
+    again = cached_agent.process([1, 2, 2])
+    assert "mutated" not in again["processed_context"]["reversed"]
+
+
+def test_cached_features_do_not_alias_the_callers_array():
+    for batch in (False, True):
+        agent = AdaptiveAgent(feature_cache_size=8)
+        values = np.arange(8)
+        if batch:
+            agent.process_batch([values])
+        else:
+            agent.process(values)
+        values[:] = 0
+
+        repeat = agent.process(np.arange(8))
+        assert agent.feature_cache.hits == 1
+        assert repeat["processed_context"]["reversed"].tolist() == list(range(7, -1, -1))
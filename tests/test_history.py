@@ -0,0 +1,117 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import AdaptiveAgent
+from history import SpillingHistory
+from introspection import IntrospectiveState
+
+
+def test_spilling_history_behaves_like_a_sequence(tmp_path):
+    store = SpillingHistory(tmp_path, hot_size=3, segment_size=4)
+    contexts = ["a", {"k": [1, 2]}, 3, [4.5], "b", None, (1, 2), "c", 9, "d", np.arange(3)]
+    store.extend(contexts)
+
+    assert len(store) == len(contexts)
+    assert len(store._hot) == 3
+    assert sorted(path.name for path in tmp_path.glob("segment-*.log")) == [
+        "segment-000000.log",
+        "segment-000001.log",
+    ]
+    assert store[0] == "a"
+    assert store[1] == {"k": [1, 2]}
+    assert store[6] == (1, 2)
+    assert store[-2] == "d"
+    assert store[2:5] == [3, [4.5], "b"]
+    assert list(store)[:-1] == contexts[:-1]
+    assert np.array_equal(store[-1], contexts[-1])
+
+    store.clear()
+    assert len(store) == 0
+    assert not list(tmp_path.glob("segment-*"))
+
+
+def test_agent_with_spilling_history_round_trips_state():
+    agent = AdaptiveAgent(
+        state_factory=lambda: IntrospectiveState(history=SpillingHistory(hot_size=2, segment_size=2))
+    )
+    contexts = ["one", [1, 2, 3], {"x": 1}, 4, "five", "six"]
+    for ctx in contexts:
+        agent.process(ctx)
+
+    assert isinstance(agent.state.history, SpillingHistory)
+    snapshot = agent.get_state_snapshot()
+    assert snapshot["history"] == contexts
+
+    restored = AdaptiveAgent(
+        state_factory=lambda: IntrospectiveState(history=SpillingHistory(hot_size=2))
+    )
+    restored.state.load_from_dict(snapshot)
+    assert isinstance(restored.state.history, SpillingHistory)
+    assert list(restored.state.history) == contexts
+
+    agent.reset_state()
+    assert isinstance(agent.state.history, SpillingHistory)
+    assert len(agent.state.history) == 0
+
+
+def test_interned_contexts_are_stored_once_in_memory_and_snapshots(tmp_path):
+    def interning():
+        return IntrospectiveState(intern_contexts=True)
+
+    agent = AdaptiveAgent(state_factory=interning)
+    plain = AdaptiveAgent()
+    contexts = [{"user": i % 3, "tags": ["a", "b"]} for i in range(30)] + ["hi", "hi", [1, 2], {3}]
+    results = [agent.process(ctx) for ctx in contexts]
+    assert results == [plain.process(ctx) for ctx in contexts]
+
+    history = agent.state.history
+    assert history == contexts
+    assert history[0] is history[3] is history[27]
+    assert history[30] is history[31]
+    assert agent.state.meta_context["last"] is history[-1]
+    snapshot = agent.get_state_snapshot()
+    assert snapshot["history"][0] is snapshot["history"][3]
+    assert snapshot == plain.get_state_snapshot()
+
+    path = tmp_path / "agent.snap"
+    agent.save_state(str(path), format="binary")
+
+    restored = AdaptiveAgent(state_factory=interning)
+    restored.load_state(str(path))
+    assert restored.state.history.distinct_records() == 6
+    assert list(restored.state.history) == contexts
+
+    from_json = AdaptiveAgent(state_factory=interning)
+    from_json.state.load_from_dict(snapshot)
+    assert from_json.state.history[1] is from_json.state.history[4]
+    assert from_json.state.recent_contexts[-2] is from_json.state.history[-2]
+
+
+def test_spilling_history_freezes_without_reading_the_log(monkeypatch):
+    store = SpillingHistory(hot_size=3, segment_size=4)
+    state = IntrospectiveState(history=store)
+    for index in range(23):
+        state.observe(f"ctx {index}")
+
+    def fail(*args):
+        raise AssertionError("history was read")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(SpillingHistory, "__iter__", fail)
+        patch.setattr(SpillingHistory, "_read_cold", fail)
+        windows = state.to_dict(include_history=False)
+        frozen = state.freeze()
+    assert "history" not in windows
+    assert state.freeze(include_history=False).history is None
+
+    for index in range(23, 30):
+        state.observe(f"ctx {index}")
+    store.clear()
+    assert len(frozen.history) == 23
+    assert list(frozen.history) == [f"ctx {index}" for index in range(23)]
+    assert frozen.history[-1] == "ctx 22"
@@ -0,0 +1,58 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import AdaptiveAgent
+from metrics import LatencyHistogram
+
+
+def test_metrics_do_not_change_results_and_count_stages():
+    contexts = ["hello world", [1, 2, 3], {"a": 1}, 4.5, "hello world"]
+    plain = AdaptiveAgent()
+    measured = AdaptiveAgent(collect_metrics=True, feature_cache_size=8)
+
+    expected = [plain.process(ctx) for ctx in contexts[:2]] + plain.process_batch(contexts[2:])
+    actual = [measured.process(ctx) for ctx in contexts[:2]] + measured.process_batch(contexts[2:])
+    assert json.dumps(actual, default=str) == json.dumps(expected, default=str)
+
+    metrics = measured.get_metrics()
+    assert metrics["cycles"] == len(contexts)
+    assert metrics["descriptors"] == {"text": 2, "sequence": 1, "mapping": 1, "numeric": 1}
+    for stage in ("observe", "adapt", "reflect", "report"):
+        assert metrics["stages"][stage]["count"] == len(contexts)
+    assert metrics["stages"]["extract"]["count"] == 1
+    assert metrics["stages"]["journal"]["count"] == 0
+    assert metrics["gauges"]["feature_cache"]["hits"] == 1
+
+
+def test_prometheus_export_and_disabled_agent():
+    agent = AdaptiveAgent(collect_metrics=True)
+    agent.process("ping")
+    agent.process("ping", fields=("confidence",))
+    text = agent.export_metrics()
+
+    assert '# TYPE acf_stage_duration_seconds histogram' in text
+    assert 'acf_stage_duration_seconds_count{stage="observe"} 2' in text
+    assert 'acf_stage_duration_seconds_count{stage="report"} 1' in text
+    assert 'acf_stage_duration_seconds_bucket{stage="adapt",le="+Inf"} 2' in text
+    assert 'acf_contexts_total{descriptor="text"} 2' in text
+
+    with pytest.raises(RuntimeError):
+        AdaptiveAgent().get_metrics()
+
+
+def test_histogram_quantiles_follow_buckets():
+    histogram = LatencyHistogram(buckets=(0.001, 0.01, 0.1))
+    for _ in range(98):
+        histogram.observe(0.0005)
+    histogram.observe(0.05)
+    histogram.observe(5.0)
+
+    assert histogram.counts == [98, 0, 1, 1]
+    assert 0.0 < histogram.quantile(0.5) <= 0.001
+    assert 0.01 < histogram.quantile(0.99) <= 0.1
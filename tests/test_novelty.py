@@ -0,0 +1,60 @@
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import AdaptiveAgent
+from introspection import IntrospectiveState
+from novelty import NoveltyWindow, simhash
+
+
+def _brute_force(window, descriptor):
+    if not window:
+        return 1.0
+    return round(max(0.0, 1.0 - window.count(descriptor) / len(window)), 4)
+
+
+def test_descriptor_window_matches_brute_force_for_large_windows():
+    rng = random.Random(5)
+    state = IntrospectiveState(novelty_window=1000)
+    descriptors = []
+    for _ in range(3000):
+        context = rng.choice(["text", [1], {"a": 1}, 3, None, True])
+        descriptor = state._describe_context(context)
+        expected = _brute_force(descriptors[-1000:], descriptor)
+        state.observe(context)
+        assert state.meta_context["last_novelty_score"] == expected
+        descriptors.append(descriptor)
+
+
+def test_content_mode_scores_same_type_different_content_as_novel():
+    window = NoveltyWindow(10, mode="content")
+    descriptor_window = NoveltyWindow(10)
+    for _ in range(5):
+        window.observe("text", "the sensor reports a stable signal")
+        descriptor_window.observe("text", "the sensor reports a stable signal")
+
+    assert window.score("text", "the sensor reports a stable signal") == 0.0
+    assert window.score("text", "queue latency exploded after the deploy") > 0.8
+    assert descriptor_window.score("text", "queue latency exploded after the deploy") == 0.0
+
+    base = list(range(1000))
+    assert bin(simhash(base) ^ simhash(base[:-10] + [5000])).count("1") < 16
+    assert simhash([1.5, 2.5]) == simhash((1.5, 2.5))
+
+
+def test_novelty_window_survives_save_and_load(tmp_path):
+    def factory():
+        return IntrospectiveState(novelty_window=50, novelty_mode="content")
+
+    contexts = [f"message {index % 7}" if index % 3 else [index, index % 5] for index in range(120)]
+    agent = AdaptiveAgent(factory)
+    agent.process_batch(contexts)
+    path = tmp_path / "state.json"
+    agent.save_state(str(path))
+
+    restored = AdaptiveAgent(factory)
+    restored.load_state(str(path))
+    assert restored.process("message 3") == agent.process("message 3")
@@ -1,7 +1,9 @@
+import io
 import json
 import os
 import tempfile
 import sys
+from contextlib import redirect_stdout
 from pathlib import Path
 
 # Simplify imports by just adding root to sys.path
@@ -9,6 +11,7 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
 from core import AdaptiveAgent
+from replay import main as replay_main
 
 def test_save_load_state():
     # 1. Initialize agent and process some inputs
@@ -71,3 +74,249 @@ def test_persistence_preserves_deque_attributes():
 
     finally:
         os.remove(tmp_path)
+
+def test_journal_restores_checkpoint_plus_tail(tmp_path):
+    journal_dir = tmp_path / "journal"
+    agent = AdaptiveAgent(journal_dir=str(journal_dir), checkpoint_interval=3)
+    contexts = ["alpha", [1, 2, 3], {"k": "v"}, 4.5, "beta", "gamma", [7, 8]]
+    for ctx in contexts:
+        agent.process(ctx)
+
+    # Seven contexts with an interval of three: the journal keeps every record
+    # after its header, and the latest checkpoint covers six without history.
+    journal_lines = (journal_dir / "journal.ndjson").read_text().splitlines()
+    assert len(journal_lines) == 1 + len(contexts)
+    checkpoint = json.loads((journal_dir / "checkpoint.json").read_text())
+    assert checkpoint["history_length"] == 6 and "history" not in checkpoint
+    assert agent.journal.pending == 1
+
+    restored = AdaptiveAgent()
+    restored.load_state(str(journal_dir))
+    assert restored.state.report() == agent.state.report()
+    assert restored.state.history == agent.state.history
+
+
+def test_journal_checkpoints_do_not_rewrite_the_history(tmp_path):
+    journal_dir = tmp_path / "journal"
+    agent = AdaptiveAgent(journal_dir=str(journal_dir), checkpoint_interval=10)
+    base_size = (journal_dir / "base.json").stat().st_size
+    checkpoint_sizes = set()
+    for step in range(200):
+        agent.process(f"context number {step}")
+        if (step + 1) % 10 == 0:
+            checkpoint_sizes.add((journal_dir / "checkpoint.json").stat().st_size)
+
+    assert (journal_dir / "base.json").stat().st_size == base_size
+    # Windows fill up after a few checkpoints; from then on the size is flat.
+    assert max(checkpoint_sizes) - min(checkpoint_sizes) < 2048
+    restored = AdaptiveAgent()
+    restored.load_state(str(journal_dir))
+    assert restored.get_state_snapshot() == agent.get_state_snapshot()
+
+
+def test_journal_ignores_files_from_another_generation(tmp_path):
+    journal_dir = tmp_path / "journal"
+    agent = AdaptiveAgent(journal_dir=str(journal_dir), checkpoint_interval=2)
+    for ctx in ["a", "b", "c", "d", "e"]:
+        agent.process(ctx)
+    stale_journal = (journal_dir / "journal.ndjson").read_bytes()
+    stale_checkpoint = (journal_dir / "checkpoint.json").read_bytes()
+
+    agent.reset_state()
+    agent.process("fresh")
+    expected = agent.get_state_snapshot()
+    agent.journal.close()
+    # Simulate a rebase interrupted after the new base was written.
+    (journal_dir / "checkpoint.json").write_bytes(stale_checkpoint)
+    resumed = AdaptiveAgent(journal_dir=str(journal_dir))
+    assert resumed.get_state_snapshot() == expected
+
+    (journal_dir / "journal.ndjson").write_bytes(stale_journal)
+    resumed = AdaptiveAgent(journal_dir=str(journal_dir))
+    assert list(resumed.state.history) == []
+    resumed.process("after")
+    reloaded = AdaptiveAgent()
+    reloaded.load_state(str(journal_dir))
+    assert list(reloaded.state.history) == ["after"]
+
+
+def test_journal_discards_torn_tail_and_resumes(tmp_path):
+    journal_dir = tmp_path / "journal"
+    agent = AdaptiveAgent(journal_dir=str(journal_dir), checkpoint_interval=100)
+    agent.process("first")
+    agent.process("second")
+    expected = agent.state.report()
+    agent.journal.close()
+
+    with open(journal_dir / "journal.ndjson", "a") as handle:
+        handle.write('{"i":3,"c":"thi')
+
+    resumed = AdaptiveAgent(journal_dir=str(journal_dir), checkpoint_interval=100)
+    assert resumed.state.report() == expected
+
+    resumed.process("third")
+    reloaded = AdaptiveAgent()
+    reloaded.load_state(str(journal_dir))
+    assert reloaded.state.history == ["first", "second", "third"]
+
+def test_binary_snapshot_round_trip_is_faithful_and_lazy(tmp_path):
+    import numpy as np
+    from snapshot import SnapshotHistory
+
+    agent = AdaptiveAgent()
+    contexts = ["text", [1, 2, 3], [0.5, 1.5], (1, "a"), {"k": [1, 2]}, np.arange(6).reshape(2, 3), 7, None]
+    for ctx in contexts:
+        agent.process(ctx)
+
+    path = str(tmp_path / "state.snap")
+    agent.save_state(path)
+
+    restored = AdaptiveAgent()
+    restored.load_state(path)
+    history = restored.state.history
+    assert isinstance(history, SnapshotHistory)
+    assert restored.state.report()["context_stats"] == agent.state.report()["context_stats"]
+    assert restored.state.emotional_valence == agent.state.emotional_valence
+    assert history[3] == (1, "a")
+    assert isinstance(history[5], np.ndarray) and np.array_equal(history[5], contexts[5])
+    assert [ctx for index, ctx in enumerate(history) if index != 5] == [
+        ctx for index, ctx in enumerate(contexts) if index != 5
+    ]
+
+    # Continue processing and overwrite the snapshot that is still mapped.
+    restored.process("after load")
+    restored.save_state(path)
+    reloaded = AdaptiveAgent()
+    reloaded.load_state(path)
+    assert len(reloaded.state.history) == len(contexts) + 1
+    assert reloaded.state.history[-1] == "after load"
+    assert reloaded.state.history[0] == "text"
+
+
+def test_binary_snapshot_stores_buffer_contexts_as_arrays(tmp_path):
+    import numpy as np
+
+    agent = AdaptiveAgent()
+    agent.process(memoryview(np.arange(6, dtype=np.int32)))
+    path = tmp_path / "buffers.snap"
+    agent.save_state(str(path))
+
+    restored = AdaptiveAgent()
+    restored.load_state(str(path))
+    assert np.array_equal(restored.state.history[0], np.arange(6, dtype=np.int32))
+    assert np.array_equal(restored.state.meta_context["last"], np.arange(6, dtype=np.int32))
+
+
+def test_state_at_restores_any_step_from_the_nearest_checkpoint(tmp_path):
+    contexts = ["good stable", [1, 2, 3], {"status": "error"}, 5, "fail", "useful"] * 7
+    agent = AdaptiveAgent(timeline_interval=8)
+    reference = AdaptiveAgent()
+    expected = [reference.get_state_snapshot()]
+    for ctx in contexts:
+        agent.process(ctx)
+        reference.process(ctx)
+        expected.append(reference.get_state_snapshot())
+
+    assert agent.timeline.steps == [8, 16, 24, 32, 40]
+    for step in range(len(contexts) + 1):
+        assert agent.state_at(step).to_dict() == expected[step]
+
+    state_path, index_path = tmp_path / "state.snap", tmp_path / "state.timeline"
+    agent.save_state(str(state_path))
+    agent.timeline.save(index_path)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        replay_main([str(state_path), "--step", "13", "--timeline", str(index_path)])
+    printed = json.loads(output.getvalue())
+    assert printed["adaptation_log"] == expected[13]["adaptation_log"]
+    assert printed["context_stats"] == expected[13]["context_stats"]
+
+
+def test_journal_restores_non_json_contexts_faithfully(tmp_path):
+    journal_dir = tmp_path / "journal"
+    agent = AdaptiveAgent(journal_dir=str(journal_dir), checkpoint_interval=3)
+    contexts = [{1, 2, 3}, (4, 5), b"raw", {"$pickle": "not really"}, {7: "int key"}, "text", (6,)]
+    for ctx in contexts:
+        agent.process(ctx)
+
+    restored = AdaptiveAgent()
+    restored.load_state(str(journal_dir))
+    assert restored.state.history == contexts
+    assert [type(ctx) for ctx in restored.state.history] == [type(ctx) for ctx in contexts]
+    assert restored.state.report() == agent.state.report()
+    assert restored.state.context_stats["sequence"] == 3
+
+
+def test_reloading_a_snapshot_keeps_the_history_lazy(tmp_path):
+    from snapshot import SnapshotHistory
+
+    agent = AdaptiveAgent()
+    contexts = ["plain", "lone \ud800 surrogate", [1, 2], "plain"]
+    for ctx in contexts:
+        agent.process(ctx)
+    first, second = tmp_path / "first.snap", tmp_path / "second.snap"
+    agent.save_state(str(first))
+    agent.process("later")
+    agent.save_state(str(second))
+
+    restored = AdaptiveAgent()
+    restored.load_state(str(first))
+    assert list(restored.state.history) == contexts
+    restored.load_state(str(second))
+    history = restored.state.history
+    assert isinstance(history, SnapshotHistory)
+    assert history._tail == []
+    assert list(history) == contexts + ["later"]
+
+
+def test_journal_stores_memoryview_contexts_and_rejects_before_mutating(tmp_path):
+    import threading
+
+    import numpy as np
+    import pytest
+
+    journal_dir = tmp_path / "journal"
+    agent = AdaptiveAgent(journal_dir=str(journal_dir), checkpoint_interval=2)
+    agent.process(memoryview(np.arange(6, dtype=np.int32)))
+    agent.process("text")
+    agent.process(memoryview(b"raw bytes"))
+
+    restored = AdaptiveAgent()
+    restored.load_state(str(journal_dir))
+    assert np.array_equal(restored.state.history[0], np.arange(6, dtype=np.int32))
+    assert bytes(restored.state.history[2]) == b"raw bytes"
+
+    before = agent.get_state_snapshot()
+    with pytest.raises(TypeError):
+        agent.process(threading.Lock())
+    with pytest.raises(TypeError):
+        agent.process_batch(["fine", threading.Lock()])
+    assert agent.get_state_snapshot() == before
+    restored = AdaptiveAgent()
+    restored.load_state(str(journal_dir))
+    assert len(restored.state.history) == len(agent.state.history) == 3
+
+
+def test_state_at_keeps_the_prefix_lazy_and_detached(tmp_path):
+    from history import PrefixedHistory, SpillingHistory
+    from introspection import IntrospectiveState
+
+    contexts = [f"context {index % 7}" for index in range(50)]
+    factories = [
+        lambda: IntrospectiveState(intern_contexts=True),
+        lambda: IntrospectiveState(history=SpillingHistory(tmp_path, hot_size=4, segment_size=8)),
+    ]
+    for factory in factories:
+        agent = AdaptiveAgent(state_factory=factory, timeline_interval=16)
+        reference = AdaptiveAgent()
+        for ctx in contexts[:37]:
+            reference.process(ctx)
+        for ctx in contexts:
+            agent.process(ctx)
+
+        state = agent.state_at(37)
+        assert isinstance(state.history, PrefixedHistory)
+        assert state.to_dict() == reference.get_state_snapshot()
+        state.observe("only in the copy")
+        assert len(agent.state.history) == len(contexts)
+        assert list(state.history) == contexts[:37] + ["only in the copy"]
@@ -0,0 +1,59 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import AdaptiveAgent
+from pool import AgentPool
+
+
+def test_pool_matches_per_stream_agents_and_preserves_order():
+    items = [
+        (f"sensor-{index % 3}", [index, index + 1] if index % 2 else f"reading {index}")
+        for index in range(30)
+    ]
+
+    with AgentPool(workers=2) as pool:
+        results = pool.process_many(items)
+        report = pool.report()
+        snapshots = pool.snapshot()
+
+    reference_agents = {}
+    expected = []
+    for stream_key, ctx in items:
+        agent = reference_agents.setdefault(stream_key, AdaptiveAgent())
+        expected.append(agent.process(ctx))
+
+    assert json.dumps(results, default=str) == json.dumps(expected, default=str)
+    assert report["streams"] == 3
+    assert report["history_length"] == len(items)
+    assert report["context_stats"]["text"] == 15
+    assert sum(shard["streams"] for shard in report["per_shard"]) == 3
+    assert snapshots["sensor-1"]["history"] == [ctx for key, ctx in items if key == "sensor-1"]
+
+
+class _Unpicklable:
+    def __reduce__(self):
+        return (_fail_on_load, ())
+
+
+def _fail_on_load():
+    raise RuntimeError("cannot rebuild context")
+
+
+def test_pool_errors_leave_no_stale_replies():
+    with AgentPool(workers=2) as pool:
+        keys = ["a", "b"]
+        while pool.shard_for(keys[0]) == pool.shard_for(keys[1]):
+            keys[1] += "b"
+        with pytest.raises(RuntimeError, match="cannot rebuild"):
+            pool.process_many([(keys[0], _Unpicklable()), (keys[1], "hello")])
+
+        result = pool.process(keys[1], "second")
+        assert result["meta_state"]["history_length"] == 2
+        assert result["meta_state"]["recent_context"] == "second"
+        assert pool.process(keys[0], "recovered")["meta_state"]["history_length"] == 1
@@ -0,0 +1,128 @@
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import AdaptiveAgent
+from metrics import PipelineMetrics
+from registry import AgentRegistry
+import snapshot
+
+
+def test_evicted_agents_rehydrate_with_identical_behavior(tmp_path):
+    contexts = ["alpha beta", [1, 2, 3], {"a": 1, "b": None}, 7.5, "beta gamma", None]
+    registry = AgentRegistry(tmp_path, capacity=2)
+    reference = {}
+
+    for step in range(30):
+        key = f"session-{step % 5}"
+        context = contexts[step % len(contexts)]
+        expected = reference.setdefault(key, AdaptiveAgent()).process(context)
+        assert registry.process(key, context) == expected
+
+    stats = registry.stats()
+    assert len(registry) == 2 and stats["resident"] == 2
+    assert stats["created"] == 5
+    assert stats["evictions"] == stats["rehydrated"] + 3
+    assert stats["evict_p99_seconds"] > 0
+    for key, agent in reference.items():
+        assert registry.get(key).state.report() == agent.state.report()
+
+
+def test_resident_hits_move_to_the_end_and_discard_forgets(tmp_path):
+    registry = AgentRegistry(tmp_path, capacity=2)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+
+    assert registry.resident_keys() == ["a", "c"]
+    assert "b" in registry and registry.path_for("b").exists()
+    assert registry.discard("b")
+    assert "b" not in registry
+    assert registry.stats()["hits"] == 1
+
+
+def test_close_spills_everything_and_exports_gauges(tmp_path):
+    metrics = PipelineMetrics()
+    with AgentRegistry(tmp_path, capacity=4, metrics=metrics) as registry:
+        registry.process("user", "hello there")
+        assert "acf_registry_resident 1" in metrics.to_prometheus()
+
+    assert len(registry) == 0
+    reopened = AgentRegistry(tmp_path)
+    assert list(reopened.get("user").state.history) == ["hello there"]
+    assert reopened.stats()["rehydrated"] == 1
+
+
+class _GatedAgent(AdaptiveAgent):
+    """Blocks in ``process`` until every gated agent has entered it."""
+
+    barrier = None
+
+    def process(self, context, **kwargs):
+        if self.barrier is not None:
+            self.barrier.wait(timeout=10)
+        return super().process(context, **kwargs)
+
+
+def test_sessions_process_concurrently_and_busy_agents_are_not_evicted(tmp_path):
+    registry = AgentRegistry(tmp_path, _GatedAgent, capacity=1)
+    _GatedAgent.barrier = threading.Barrier(2)
+    try:
+        results = {}
+        threads = [
+            threading.Thread(target=lambda key=key: results.setdefault(key, registry.process(key, key)))
+            for key in ("a", "b")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=20)
+    finally:
+        _GatedAgent.barrier = None
+
+    assert sorted(results) == ["a", "b"]
+    assert len(registry) == 1
+    for key in ("a", "b"):
+        assert list(registry.get(key).state.history) == [key]
+
+
+def test_evict_refuses_an_agent_in_use(tmp_path):
+    registry = AgentRegistry(tmp_path, capacity=2)
+    registry._acquire("a")
+    assert not registry.evict("a")
+    registry._release("a")
+    assert registry.evict("a")
+
+
+@pytest.mark.skipif(resource is None or not os.path.isdir("/proc/self/fd"), reason="needs RLIMIT_NOFILE and /proc")
+def test_rehydrated_agents_do_not_pin_one_descriptor_each(tmp_path):
+    baseline = len(os.listdir("/proc/self/fd"))
+    limit = baseline + snapshot.MAX_OPEN_MAPS + 64
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    capacity = limit
+    with AgentRegistry(tmp_path, capacity=capacity) as registry:
+        for index in range(capacity):
+            registry.process(index, f"context {index}")
+
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(limit, hard), hard))
+    try:
+        registry = AgentRegistry(tmp_path, capacity=capacity)
+        for index in range(capacity):
+            registry.process(index, f"again {index}")
+        assert registry.stats()["rehydrated"] == capacity
+        assert len(os.listdir("/proc/self/fd")) <= baseline + snapshot.MAX_OPEN_MAPS + 8
+        assert list(registry.get(0).state.history) == ["context 0", "again 0"]
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
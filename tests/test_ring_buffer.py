@@ -0,0 +1,77 @@
+import pickle
+import random
+import sys
+from collections import deque
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import AdaptiveAgent
+from introspection import IntrospectiveState
+from ring_buffer import ObservationLog, RingBuffer
+
+
+def test_ring_buffer_behaves_like_a_bounded_deque():
+    rng = random.Random(0)
+    ring, expected = RingBuffer(7), deque(maxlen=7)
+    for _ in range(100):
+        value = rng.uniform(-5, 5)
+        evicted = expected[0] if len(expected) == expected.maxlen else None
+        assert ring.push(value) == evicted
+        expected.append(value)
+        assert list(ring) == list(expected)
+        assert len(ring) == len(expected)
+        assert ring[0] == expected[0] and ring[-1] == expected[-1]
+        assert ring.ordered().tolist() == list(expected)
+
+    with pytest.raises(IndexError):
+        ring[7]
+    assert list(pickle.loads(pickle.dumps(ring))) == list(expected)
+
+
+def test_observation_log_round_trips_records_as_dicts():
+    observations = [
+        {"index": index, "descriptor": descriptor, "size": index * 3, "novelty_score": index / 10}
+        for index, descriptor in enumerate(["text", "sequence", "custom-kind", "text"], start=1)
+    ]
+    log = ObservationLog(3, observations)
+
+    assert list(log) == observations[1:]
+    assert log[-1] == observations[-1]
+    assert list(pickle.loads(pickle.dumps(log))) == observations[1:]
+
+
+def test_state_windows_serialize_as_plain_lists():
+    agent = AdaptiveAgent()
+    for context in ["alpha", [1, 2, 3], {"a": 1}, 4.5, "beta", None, "gamma"]:
+        agent.process(context)
+    data = agent.state.to_dict()
+
+    assert len(data["observation_log"]) == IntrospectiveState.HISTORY_WINDOW
+    assert data["observation_log"][-1] == agent.state.meta_context["last_observation"]
+    assert all(type(value) is float for value in data["valence_trace"])
+
+    restored = IntrospectiveState()
+    restored.load_from_dict(data)
+    assert restored.report() == agent.state.report()
+    with pytest.raises(AttributeError):
+        restored.unexpected = True
+
+
+def test_configurable_windows_stay_compact():
+    agent = AdaptiveAgent(state_factory=lambda: IntrospectiveState(window=256))
+    agent.process_batch([f"context {index}" for index in range(600)])
+    state = agent.state
+
+    assert len(state.observation_log) == len(state.valence_trace) == len(state.adaptation_log) == 256
+    assert state.novelty.size == 256
+    # 8 bytes per valence and 26 per observation record, however many rows.
+    assert state.valence_trace._data.nbytes + state.observation_log._data.nbytes == 256 * (8 + 26)
+
+    restored = state.empty_like()
+    restored.load_from_dict(state.to_dict())
+    assert restored.window == 256
+    assert restored.report() == state.report()
@@ -0,0 +1,75 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import AdaptiveAgent
+from server import create_app
+
+
+def _expected(contexts):
+    agent = AdaptiveAgent()
+    return json.loads(json.dumps([agent.process(ctx) for ctx in contexts], default=str))
+
+
+def test_process_batch_and_snapshot_per_session():
+    contexts = ["hello", [1, 2, 3], {"status": "ok"}, 4.5, "hello again"]
+    with TestClient(create_app(max_batch_size=2)) as client:
+        first = client.post("/sessions/a/process", content=json.dumps(contexts[0]))
+        assert first.status_code == 200
+
+        body = "\n".join(json.dumps(ctx) for ctx in contexts[1:]) + "\n"
+        response = client.post(
+            "/sessions/a/batch", content=body, headers={"content-type": "application/x-ndjson"}
+        )
+        streamed = [json.loads(line) for line in response.text.splitlines()]
+        assert [first.json()] + streamed == _expected(contexts)
+
+        other = client.post("/sessions/b/process", content=json.dumps("solo")).json()
+        assert other["meta_state"]["history_length"] == 1
+
+        snapshot = client.get("/sessions/a/snapshot").json()
+        assert len(snapshot["history"]) == len(contexts)
+        assert sorted(client.get("/sessions").json()["sessions"]) == ["a", "b"]
+
+        metrics = client.get("/metrics").text
+        assert 'acf_stage_duration_seconds_count{stage="observe"} 6' in metrics
+        assert "acf_server_sessions 2" in metrics
+
+        assert client.delete("/sessions/b").status_code == 200
+        assert client.get("/sessions/b/snapshot").status_code == 404
+
+
+def test_invalid_bodies_are_rejected():
+    with TestClient(create_app()) as client:
+        assert client.post("/sessions/a/process", content="{not json").status_code == 400
+        lines = client.post("/sessions/a/batch", content='"ok"\n{broken\n').text.splitlines()
+        assert "error" in json.loads(lines[-1])
+
+
+class _FailingAgent(AdaptiveAgent):
+    def process_batch(self, contexts, **kwargs):
+        if "boom" in contexts:
+            raise RuntimeError("boom")
+        return super().process_batch(contexts, **kwargs)
+
+
+def test_failed_contexts_are_reported_inside_the_stream():
+    with TestClient(create_app(_FailingAgent, max_batch_size=1)) as client:
+        body = '"ok"\n"boom"\n"after"\n'
+        lines = [json.loads(line) for line in client.post("/sessions/a/batch", content=body).text.splitlines()]
+        assert lines[1] == {"error": "RuntimeError: boom"}
+        assert [line["meta_state"]["recent_context"] for line in (lines[0], lines[2])] == ["ok", "after"]
+
+        metrics = client.get("/metrics").text
+        assert 'acf_stage_duration_seconds_count{stage="observe"} 2' in metrics
+        assert "acf_async_queue" not in metrics
@@ -2,7 +2,15 @@ import json
 import os
 import tempfile
 
-from simulation import load_inputs_from_file, parse_context, summarize_results
+import pytest
+
+from simulation import (
+    iter_inputs_from_file,
+    load_inputs_from_file,
+    parse_context,
+    run_demo,
+    summarize_results,
+)
 
 
 def test_parse_context_json_and_text():
@@ -63,3 +71,129 @@ def test_summarize_results_handles_empty_and_populated_inputs():
         "final_history_length": 2,
         "average_confidence": 0.6,
     }
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_iter_inputs_streams_json_array_across_chunks(use_mmap):
+    contexts = ["hello", {"k": "v", "nested": [1.5, None, True]}, 3, "é" * 40]
+    with tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".json") as tmp:
+        json.dump(contexts, tmp, indent=2)
+        tmp_path = tmp.name
+
+    try:
+        stream = iter_inputs_from_file(tmp_path, chunk_size=5, use_mmap=use_mmap)
+        assert next(stream) == "hello"
+        assert list(stream) == contexts[1:]
+    finally:
+        os.remove(tmp_path)
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+@pytest.mark.parametrize("chunk_size", range(1, 9))
+def test_iter_inputs_refills_numbers_cut_at_a_chunk_boundary(chunk_size, use_mmap):
+    with tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".json") as tmp:
+        tmp.write("[\n2.5, 1e5, 1e-3, -0.25E+2, 12345, 7]\n")
+        tmp_path = tmp.name
+
+    try:
+        expected = load_inputs_from_file(tmp_path)
+        assert expected == [2.5, 1e5, 1e-3, -25.0, 12345, 7]
+        assert list(iter_inputs_from_file(tmp_path, chunk_size=chunk_size, use_mmap=use_mmap)) == expected
+    finally:
+        os.remove(tmp_path)
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_iter_inputs_matches_eager_loader_for_newline_files(use_mmap):
+    with tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".txt") as tmp:
+        tmp.write('[1, 2]\n')
+        tmp.write('plain\n\n')
+        tmp.write('{"x": 1}\n')
+        tmp_path = tmp.name
+
+    try:
+        expected = load_inputs_from_file(tmp_path)
+        assert list(iter_inputs_from_file(tmp_path, use_mmap=use_mmap)) == expected
+    finally:
+        os.remove(tmp_path)
+
+
+def test_iter_inputs_rejects_unterminated_array():
+    with tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".json") as tmp:
+        tmp.write('[\n"a",\n"b"\n')
+        tmp_path = tmp.name
+
+    try:
+        stream = iter_inputs_from_file(tmp_path)
+        assert next(stream) == "a"
+        with pytest.raises(ValueError):
+            list(stream)
+    finally:
+        os.remove(tmp_path)
+
+
+def test_parallel_runs_match_serial_output_and_state(tmp_path, capsys):
+    contexts = [
+        {"user": f"u{index % 3}", "text": "good stable" if index % 4 else "error"}
+        if index % 5
+        else [index, index + 1]
+        for index in range(40)
+    ]
+
+    def run(name, **kwargs):
+        path = tmp_path / f"{name}.json"
+        run_demo(iter(contexts), save_state=str(path), batch_size=16, **kwargs)
+        captured = capsys.readouterr()
+        assert ("ctx/s" in captured.err) == kwargs.get("progress", False)
+        return captured.out.replace(str(path), "STATE"), path.read_text()
+
+    assert run("parallel", workers=2, progress=True) == run("serial")
+    streamed, saved = run("streams", stream_key="user")
+    assert run("pooled", stream_key="user", workers=2) == (streamed, saved)
+    assert [stream["key"] for stream in json.loads(saved)["streams"]] == ["u0", "u1", "u2", None]
+
+
+def test_parallel_runs_accept_memoryview_contexts(capsys):
+    import numpy as np
+
+    contexts = [
+        memoryview(np.arange(index, index + 6, dtype=np.int32)) if index % 3 else f"text {index}"
+        for index in range(24)
+    ]
+    serial = run_demo(contexts, quiet=True)
+    assert run_demo(contexts, workers=2, batch_size=8, quiet=True) == serial
+    streams = run_demo(contexts, stream_key="user", quiet=True)
+    assert run_demo(contexts, stream_key="user", workers=2, quiet=True) == streams
+    capsys.readouterr()
+
+
+def test_stream_states_keep_keys_that_stringify_alike(tmp_path, capsys):
+    contexts = [{"id": 1}, {"id": "1"}, {"id": None}, {"id": "None"}, {"id": 1}, "no key"]
+    path = tmp_path / "streams.json"
+    run_demo(contexts, stream_key="id", save_state=str(path), quiet=True)
+
+    streams = {repr(stream["key"]): stream["state"] for stream in json.loads(path.read_text())["streams"]}
+    assert sorted(streams) == sorted(["1", "'1'", "None", "'None'"])
+    assert len(streams["1"]["history"]) == 2
+    assert len(streams["None"]["history"]) == 2
+    assert len(streams["'1'"]["history"]) == len(streams["'None'"]["history"]) == 1
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+@pytest.mark.parametrize(
+    "first_line",
+    ["[INFO] service started", "[2024-01-01] boot", "[1] started", '["a", oops'],
+)
+def test_iter_inputs_treats_bracketed_log_lines_as_newline_entries(first_line, use_mmap):
+    with tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".log") as tmp:
+        tmp.write(first_line + "\n")
+        tmp.write('{"x": 1}\n')
+        tmp.write("[WARN] disk low\n")
+        tmp_path = tmp.name
+
+    try:
+        expected = load_inputs_from_file(tmp_path)
+        assert expected[0] == first_line
+        assert list(iter_inputs_from_file(tmp_path, chunk_size=4, use_mmap=use_mmap)) == expected
+    finally:
+        os.remove(tmp_path)
@@ -0,0 +1,109 @@
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import AdaptiveAgent
+from sketches import ChunkedSequence, HyperLogLog, SketchConfig, StreamProfile, mix64
+
+
+def _entropy(values):
+    _, counts = np.unique(values, return_counts=True)
+    probabilities = counts / counts.sum()
+    return float(-(probabilities * np.log2(probabilities)).sum())
+
+
+def test_stream_profile_is_exact_below_capacity():
+    values = np.random.default_rng(0).integers(0, 500, 100_000)
+    summary = StreamProfile(SketchConfig(chunk_size=4096)).add_all(values).summary()
+
+    assert summary["length"] == values.size
+    assert math.isclose(summary["mean"], values.mean(), rel_tol=1e-12)
+    assert math.isclose(summary["standard_deviation"], values.std(), rel_tol=1e-9)
+    assert summary["distinct_estimate"] == np.unique(values).size
+    assert math.isclose(summary["entropy"], _entropy(values), rel_tol=1e-9)
+
+
+def test_stream_profile_stays_within_error_bounds_once_sketched():
+    rng = np.random.default_rng(1)
+    config = SketchConfig(capacity=2048, chunk_size=8192)
+    for values in (rng.normal(3, 2, 400_000), rng.zipf(1.3, 400_000), rng.integers(0, 50_000, 400_000)):
+        profile = StreamProfile(config).add_all(values)
+        summary = profile.summary()
+
+        assert not profile.frequencies.exact
+        assert abs(summary["distinct_estimate"] / np.unique(values).size - 1) < 0.05
+        assert abs(summary["entropy"] / _entropy(values) - 1) < 0.05
+        assert math.isclose(summary["mean"], values.mean(), rel_tol=1e-9)
+        assert profile.frequencies.sampled <= config.capacity
+
+
+def test_quantiles_track_the_exact_percentiles():
+    values = np.random.default_rng(2).normal(0, 1, 300_000)
+    quantiles = StreamProfile().add_all(values).summary()["quantiles"]
+
+    for name, q in (("p01", 1), ("p25", 25), ("p50", 50), ("p75", 75), ("p99", 99)):
+        assert abs(quantiles[name] - np.percentile(values, q)) < 0.02
+
+
+def test_hyperloglog_precision_follows_the_error_bound():
+    assert HyperLogLog(0.01).precision == 14
+    sketch = HyperLogLog(0.02)
+    sketch.add(mix64(np.arange(200_000, dtype=np.uint64)))
+    assert abs(sketch.estimate() / 200_000 - 1) < 0.05
+
+
+def test_non_numeric_items_are_profiled_by_representation():
+    summary = StreamProfile().add_all(iter(["a", "b", "b", "c"] * 1000)).summary()
+
+    assert summary["mean"] is None and summary["quantiles"] is None
+    assert summary["distinct_estimate"] == 3
+    assert math.isclose(summary["entropy"], 1.5)
+
+
+def test_agent_sketches_long_sequences_only_when_enabled():
+    values = np.random.default_rng(3).random(5000)
+    config = SketchConfig(min_length=1000, chunk_size=512)
+    approximate = AdaptiveAgent(approximate_stats=config)
+    exact = AdaptiveAgent()
+
+    details = approximate.process(values)["adaptation"]["details"]
+    assert details["approximate"] is True
+    assert details["transformation"] == "sketch/statistics"
+    assert details["distinct_estimate"] == 5000
+    assert np.array_equal(details["reversed"], values[::-1])
+    assert "approximate" not in exact.process(values)["adaptation"]["details"]
+    assert "approximate" not in approximate.process([1.0, 2.0])["adaptation"]["details"]
+
+    batch = approximate.process_batch([values.tolist(), [1, 2, 3]])
+    assert batch[0]["adaptation"]["details"]["approximate"] is True
+    assert "approximate" not in batch[1]["adaptation"]["details"]
+
+
+def test_chunked_sequences_are_consumed_once_and_persist_their_profile(tmp_path):
+    consumed = []
+
+    def chunks():
+        rng = np.random.default_rng(4)
+        for index in range(8):
+            consumed.append(index)
+            yield rng.integers(0, 100, 10_000)
+
+    agent = AdaptiveAgent()
+    result = agent.process(ChunkedSequence(chunks()))
+    details = result["adaptation"]["details"]
+
+    assert consumed == list(range(8))
+    assert agent.state.context_stats["sequence"] == 1
+    assert details["length"] == 80_000 and details["distinct_estimate"] == 100
+    assert "reversed" not in details
+
+    path = str(tmp_path / "state.snap")
+    agent.save_state(path)
+    restored = AdaptiveAgent()
+    restored.load_state(path)
+    assert len(restored.state.history[-1]) == 80_000
@@ -0,0 +1,63 @@
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from adaptation import AdaptiveLoop
+from text_kernel import TextKernel
+
+
+def _reference(text):
+    tokens = text.split()
+    normalized = [token.strip(".,!?;:'\"").lower() for token in tokens]
+    normalized = [token for token in normalized if token]
+    positive = sum(token in AdaptiveLoop.POSITIVE_MARKERS for token in normalized)
+    negative = sum(token in AdaptiveLoop.NEGATIVE_MARKERS for token in normalized)
+    return len(tokens), len(normalized), len(set(normalized)), positive - negative
+
+
+def test_kernel_matches_per_token_normalization():
+    rng = random.Random(3)
+    words = sorted(AdaptiveLoop.POSITIVE_MARKERS | AdaptiveLoop.NEGATIVE_MARKERS)
+    words += ["ΟΔΟΣ", "İstanbul", "Straße", "Great!", "ERROR.", "...", "'", "signal"]
+    kernel = TextKernel(AdaptiveLoop.POSITIVE_MARKERS, AdaptiveLoop.NEGATIVE_MARKERS)
+    for _ in range(500):
+        size = rng.choice([0, 1, 8, TextKernel.LONG_DOCUMENT + 50])
+        text = "".join(
+            rng.choice(words) + rng.choice(["", ".", "?", '"']) + rng.choice([" ", "\n", "　"])
+            for _ in range(size)
+        )
+        assert tuple(kernel.count(text)) == _reference(text)
+
+
+def test_vocabulary_is_shared_across_documents_and_bounded():
+    kernel = TextKernel({"good"}, {"bad"}, vocabulary_limit=4)
+    first, second = kernel.count_batch(["Good, good bad!", "GOOD."])
+
+    assert first == (3, 3, 2, 1)
+    assert second == (1, 1, 1, 1)
+    assert kernel.vocabulary["Good,"] is kernel.vocabulary["GOOD."]
+    for word in ("a", "b", "c", "d", "e"):
+        kernel.count(word)
+    assert len(kernel.vocabulary) <= 4
+
+
+def test_batch_text_features_match_single_extraction():
+    loop = AdaptiveLoop(None)
+    texts = ["Great progress, stable results.", "", "!!", "error error fail", "Useful; clear."]
+    batch = loop.extract_batch(texts + [3, [1, 2]])
+
+    for text, features in zip(texts, batch):
+        single = loop.extract_features(text)
+        assert features.details == single.details
+        assert features.signals == single.signals
+
+
+def test_agents_share_one_vocabulary():
+    first, second = AdaptiveLoop(None), AdaptiveLoop(None)
+    first.extract_features("Shared vocabulary words")
+
+    assert first.text_kernel is second.text_kernel
+    assert "vocabulary" in second.text_kernel.vocabulary
@@ -0,0 +1,61 @@
+import csv
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from core import AdaptiveAgent
+from simulation import ResultSummarizer, run_demo, summarize_results
+from writers import COLUMNS, open_writer
+
+CONTEXTS = ["good stable", [1, 2, 3], {"status": "error"}, 5, "fail", "useful"] * 4
+
+
+def _reference_results():
+    agent = AdaptiveAgent()
+    return [agent.process(ctx) for ctx in CONTEXTS]
+
+
+def test_structured_outputs_match_full_results(tmp_path, capsys):
+    results = _reference_results()
+    expected_summary = summarize_results(results)
+
+    for name in ("steps.ndjson", "steps.csv", "columns"):
+        summary = run_demo(iter(CONTEXTS), output=str(tmp_path / name))
+        assert summary == expected_summary
+    assert "Step 1" not in capsys.readouterr().out
+
+    lines = (tmp_path / "steps.ndjson").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"step": step, "input": ctx, **json.loads(json.dumps(result, default=str))}
+        for step, (ctx, result) in enumerate(zip(CONTEXTS, results), start=1)
+    ]
+
+    with open(tmp_path / "steps.csv", newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    assert list(rows[0]) == list(COLUMNS)
+    assert [row["adaptation_summary"] for row in rows] == [r["adaptation_summary"] for r in results]
+
+    confidence = np.load(tmp_path / "columns" / "confidence.npy")
+    history = np.load(tmp_path / "columns" / "history_length.npy")
+    assert confidence.tolist() == [r["adaptation"]["confidence"] for r in results]
+    assert history.tolist() == list(range(1, len(CONTEXTS) + 1))
+
+
+def test_quiet_mode_prints_only_the_incremental_summary(capsys):
+    summary = run_demo(iter(CONTEXTS), quiet=True)
+
+    assert json.loads(capsys.readouterr().out) == summary
+    assert summary == summarize_results(iter(_reference_results()))
+    summarizer = ResultSummarizer()
+    assert summarizer.summary() == summarize_results([])
+
+
+def test_open_writer_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ValueError, match="parquet"):
+        open_writer(tmp_path / "out", "parquet")
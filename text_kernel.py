@@ -0,0 +1,96 @@
+"""Single-pass text feature kernel.
+
+:class:`TextKernel` computes the textual signals behind
+:meth:`adaptation.AdaptiveLoop._text_features` -- token count, unique
+normalized tokens and the positive/negative marker balance -- with one
+``split`` and C-level passes over the tokens, matching a per-token
+``strip``/``lower`` loop exactly.  Normalizing a raw token
+(stripping punctuation, lower-casing) goes through a vocabulary table shared
+by every document the kernel sees, so each distinct raw token is normalized
+once and its interned result is reused by later documents and batches.
+:func:`shared_kernel` hands out one kernel per marker set, so all agents in a
+process share a single bounded vocabulary.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import Counter
+from functools import lru_cache
+from itertools import repeat
+from typing import Iterable, List, NamedTuple
+
+
+class TextCounts(NamedTuple):
+    """Token statistics of one document."""
+
+    token_count: int
+    normalized_count: int
+    unique_tokens: int
+    sentiment_hint: int
+
+
+class _Vocabulary(dict):
+    """Raw token -> interned normalized token, filled on first lookup."""
+
+    def __init__(self, strip_chars: str, limit: int) -> None:
+        super().__init__()
+        self.strip_chars = strip_chars
+        self.limit = limit
+
+    def __missing__(self, token: str) -> str:
+        if len(self) >= self.limit:
+            self.clear()
+        normalized = self[token] = sys.intern(token.strip(self.strip_chars).lower())
+        return normalized
+
+
+class TextKernel:
+    """Tokenize, normalize and score marker words in a single pass per document."""
+
+    STRIP_CHARS = ".,!?;:'\""
+    # Above this many tokens one Counter pass beats separate set and marker scans.
+    LONG_DOCUMENT = 256
+
+    def __init__(
+        self,
+        positive_markers: Iterable[str],
+        negative_markers: Iterable[str],
+        *,
+        vocabulary_limit: int = 1 << 17,
+    ) -> None:
+        positive, negative = frozenset(positive_markers), frozenset(negative_markers)
+        self._marker_weights = {
+            marker: (marker in positive) - (marker in negative) for marker in positive | negative
+        }
+        self._markers = frozenset(self._marker_weights)
+        self.vocabulary = _Vocabulary(self.STRIP_CHARS, vocabulary_limit)
+
+    def count(self, text: str) -> TextCounts:
+        """Return the token statistics of ``text``."""
+
+        tokens = text.split()
+        normalized = list(map(self.vocabulary.__getitem__, tokens))
+        weights = self._marker_weights
+        if len(normalized) > self.LONG_DOCUMENT:
+            counts = Counter(normalized)
+            empty = counts.pop("", 0)
+            sentiment = sum(counts[marker] * weights[marker] for marker in self._markers.intersection(counts))
+            return TextCounts(len(tokens), len(normalized) - empty, len(counts), sentiment)
+
+        distinct = set(normalized)
+        empty = normalized.count("") if "" in distinct else 0
+        sentiment = 0 if self._markers.isdisjoint(distinct) else sum(map(weights.get, normalized, repeat(0)))
+        return TextCounts(len(tokens), len(normalized) - empty, len(distinct) - (empty > 0), sentiment)
+
+    def count_batch(self, texts: Iterable[str]) -> List[TextCounts]:
+        """Count several documents against the shared vocabulary."""
+
+        return list(map(self.count, texts))
+
+
+@lru_cache(maxsize=None)
+def shared_kernel(positive_markers: frozenset, negative_markers: frozenset) -> TextKernel:
+    """Return the process-wide kernel for these marker sets."""
+
+    return TextKernel(positive_markers, negative_markers)
@@ -0,0 +1,105 @@
+"""Checkpoint index for restoring the state at any earlier step.
+
+A :class:`CheckpointIndex` records a lightweight checkpoint of the
+introspective state every ``interval`` processed contexts:
+:meth:`IntrospectiveState.to_dict` without the history, i.e. only the
+fixed-size windows and counters.  The history itself is append-only, so the
+state after step ``n`` is the nearest checkpoint at or before ``n``, the
+history prefix up to that checkpoint, and the remaining (at most
+``interval - 1``) contexts replayed through the adaptive loop; see
+:meth:`core.AdaptiveAgent.state_at`.
+
+Indexes can be saved next to a state file and loaded again, e.g. by the
+``replay.py`` command-line tool.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+class CheckpointIndex:
+    """Window checkpoints of one state, keyed by history length."""
+
+    def __init__(self, interval: int = 1000) -> None:
+        if interval < 1:
+            raise ValueError("interval must be positive")
+        self.interval = interval
+        self.steps: List[int] = []
+        self._checkpoints: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(interval={self.interval}, checkpoints={len(self)})"
+
+    def maybe_record(self, state) -> None:
+        """Checkpoint ``state`` if its history length is a multiple of the interval."""
+
+        step = len(state.history)
+        if step % self.interval == 0 and step > (self.steps[-1] if self.steps else 0):
+            self.record(state)
+
+    def record(self, state) -> None:
+        """Checkpoint ``state`` at its current history length.
+
+        Checkpoints at or after that length are dropped first, so the index
+        stays ordered after the history was replaced.
+        """
+
+        step = len(state.history)
+        del self.steps[bisect_right(self.steps, step - 1):]
+        del self._checkpoints[len(self.steps):]
+        self.steps.append(step)
+        self._checkpoints.append(state.to_dict(include_history=False))
+
+    def rebase(self, state) -> None:
+        """Forget every checkpoint and start over from ``state``."""
+
+        self.steps.clear()
+        self._checkpoints.clear()
+        if len(state.history):
+            self.record(state)
+
+    def nearest(self, step: int) -> Tuple[int, Dict[str, Any]]:
+        """Return the latest checkpoint at or before ``step`` as ``(step, data)``.
+
+        Without one, ``(0, {})`` stands for the empty initial state.  The
+        returned data is a fresh shallow copy that may be passed to
+        :meth:`IntrospectiveState.load_from_dict`.
+        """
+
+        position = bisect_right(self.steps, step) - 1
+        if position < 0:
+            return 0, {}
+        data = dict(self._checkpoints[position])
+        data["meta_context"] = dict(data["meta_context"])
+        return self.steps[position], data
+
+    def save(self, filepath: str | os.PathLike) -> None:
+        """Write the index to ``filepath`` atomically."""
+
+        target = Path(filepath)
+        temporary = target.with_name(target.name + ".tmp")
+        payload = {"interval": self.interval, "steps": self.steps, "checkpoints": self._checkpoints}
+        with open(temporary, "wb") as handle:
+            pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, target)
+
+    @classmethod
+    def load(cls, filepath: str | os.PathLike) -> "CheckpointIndex":
+        """Read an index written by :meth:`save`."""
+
+        with open(filepath, "rb") as handle:
+            payload = pickle.load(handle)
+        index = cls(payload["interval"])
+        index.steps = list(payload["steps"])
+        index._checkpoints = list(payload["checkpoints"])
+        return index
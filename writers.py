@@ -0,0 +1,214 @@
+"""Buffered structured writers for simulation results.
+
+The verbose step printing of :func:`simulation.run_demo` is meant for
+people; these writers are meant for files.  Each writer takes
+``(step, context, result)`` triples and streams them out through large
+buffers, so a long replay is bound by processing speed rather than by
+terminal I/O, and nothing is retained per step:
+
+- :class:`NDJSONWriter` – one compact JSON object per step with the full
+  result.
+- :class:`CSVWriter` – one row of :data:`COLUMNS` per step.
+- :class:`NpyColumnsWriter` – a directory with one ``.npy`` file per numeric
+  column, appended in fixed-size chunks and finalized on close.
+
+:func:`open_writer` picks a writer from the path suffix.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+BUFFER_SIZE = 1 << 20
+
+# Flattened per-step record written by the columnar writers.
+COLUMNS = (
+    "step",
+    "descriptor",
+    "adaptation_summary",
+    "confidence",
+    "novelty",
+    "emotional_valence",
+    "valence_trend",
+    "history_length",
+)
+NUMERIC_COLUMNS = {
+    "step": "q",
+    "confidence": "d",
+    "novelty": "d",
+    "emotional_valence": "d",
+    "valence_trend": "d",
+    "history_length": "q",
+}
+# Result fields (see ``AdaptiveAgent.process(fields=...)``) the columns are built from.
+COLUMN_FIELDS = frozenset({"adaptation_summary", "confidence", "meta_state"})
+
+
+def flatten_result(step: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the :data:`COLUMNS` record of one result.
+
+    Works on full results and on results projected to
+    :data:`COLUMN_FIELDS`.
+    """
+
+    meta = result.get("meta_state") or {}
+    confidence = result.get("confidence")
+    if confidence is None and result.get("adaptation"):
+        confidence = result["adaptation"].get("confidence")
+    return {
+        "step": step,
+        "descriptor": meta.get("recent_context_descriptor"),
+        "adaptation_summary": result.get("adaptation_summary"),
+        "confidence": confidence,
+        "novelty": meta.get("recent_context_novelty"),
+        "emotional_valence": meta.get("emotional_valence"),
+        "valence_trend": meta.get("valence_trend"),
+        "history_length": meta.get("history_length"),
+    }
+
+
+class _Writer(ABC):
+    """Context-manager plumbing shared by the writers."""
+
+    # Result fields the writer reads; ``None`` means the full result.
+    FIELDS: Optional[frozenset] = COLUMN_FIELDS
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @abstractmethod
+    def write(self, step: int, context: Any, result: Dict[str, Any]) -> None:
+        """Write one processed step."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and release the output."""
+
+
+class NDJSONWriter(_Writer):
+    """One ``{"step", "input", **result}`` JSON object per line."""
+
+    FIELDS = None
+
+    def __init__(self, filepath: str | os.PathLike, *, buffer_size: int = BUFFER_SIZE) -> None:
+        self._handle = open(filepath, "w", encoding="utf-8", buffering=buffer_size)
+        self._encoder = json.JSONEncoder(default=str, separators=(",", ":"))
+
+    def write(self, step: int, context: Any, result: Dict[str, Any]) -> None:
+        self._handle.write(self._encoder.encode({"step": step, "input": context, **result}))
+        self._handle.write("\n")
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class CSVWriter(_Writer):
+    """A header row followed by one :data:`COLUMNS` row per step."""
+
+    def __init__(self, filepath: str | os.PathLike, *, buffer_size: int = BUFFER_SIZE) -> None:
+        self._handle = open(filepath, "w", encoding="utf-8", newline="", buffering=buffer_size)
+        self._writer = csv.writer(self._handle)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, step: int, context: Any, result: Dict[str, Any]) -> None:
+        record = flatten_result(step, result)
+        self._writer.writerow([record[column] for column in COLUMNS])
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class _NpyColumn:
+    """A 1-D ``.npy`` file appended to in chunks; the header is fixed on close."""
+
+    # Room for any uint64 length, so the header never grows.
+    HEADER_SIZE = 128
+    CHUNK = 1 << 16
+
+    def __init__(self, filepath: Path, typecode: str) -> None:
+        self.typecode = typecode
+        self.dtype = np.dtype("<f8" if typecode == "d" else "<i8")
+        self.length = 0
+        self._pending = array(typecode)
+        self._handle = open(filepath, "w+b")
+        self._handle.write(self._header())
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            value = float("nan") if self.typecode == "d" else 0
+        self._pending.append(value)
+        if len(self._pending) >= self.CHUNK:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+        self._handle.seek(0)
+        self._handle.write(self._header())
+        self._handle.close()
+
+    def _flush(self) -> None:
+        self._handle.write(np.frombuffer(self._pending, dtype=self._pending.typecode).astype(self.dtype).tobytes())
+        self.length += len(self._pending)
+        self._pending = array(self.typecode)
+
+    def _header(self) -> bytes:
+        description = {"descr": self.dtype.str, "fortran_order": False, "shape": (self.length,)}
+        text = repr(description).encode("latin1")
+        prefix = b"\x93NUMPY\x01\x00"
+        padding = self.HEADER_SIZE - len(prefix) - 2 - len(text) - 1
+        return prefix + (self.HEADER_SIZE - len(prefix) - 2).to_bytes(2, "little") + text + b" " * padding + b"\n"
+
+
+class NpyColumnsWriter(_Writer):
+    """A directory of ``<column>.npy`` files, one per numeric column.
+
+    Missing values are stored as ``NaN`` (floats) or ``0`` (integers).
+    Load a column with ``numpy.load(directory / "confidence.npy")``.
+    """
+
+    def __init__(self, directory: str | os.PathLike) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._columns = {
+            name: _NpyColumn(self.directory / f"{name}.npy", typecode)
+            for name, typecode in NUMERIC_COLUMNS.items()
+        }
+
+    def write(self, step: int, context: Any, result: Dict[str, Any]) -> None:
+        record = flatten_result(step, result)
+        for name, column in self._columns.items():
+            column.append(record[name])
+
+    def close(self) -> None:
+        for column in self._columns.values():
+            column.close()
+
+
+WRITERS = {"ndjson": NDJSONWriter, "csv": CSVWriter, "npy": NpyColumnsWriter}
+
+
+def open_writer(path: str | os.PathLike, format: Optional[str] = None) -> _Writer:
+    """Open the writer for ``format``, inferred from ``path`` when omitted.
+
+    ``.csv`` selects CSV, ``.ndjson``/``.jsonl`` NDJSON, and anything else
+    (typically a directory name) the ``.npy`` columns.
+    """
+
+    if format is None:
+        suffix = Path(path).suffix.lower()
+        format = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(suffix, "npy")
+    writer_class = WRITERS.get(format)
+    if writer_class is None:
+        raise ValueError(f"Unknown output format: {format!r}; choose from {sorted(WRITERS)}")
+    return writer_class(path)